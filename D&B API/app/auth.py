@@ -1,124 +1,287 @@
-"""Authentication module for D&B API"""
+"""
+Authentication module for D&B API
 
+D&B tokens are valid for 24 hours. ``TokenManager`` keeps the current one
+for the process:
+
+- Requests that find no valid token share a single refresh instead of each
+  authenticating (every rejected attempt counts toward the account lockout).
+- ``start()``, run from the app lifespan, fetches a token before the first
+  request and then renews it in the background ``RENEW_AHEAD`` of expiry,
+  so requests normally never wait for authentication at all.
+- With the host-shared token store (``token_store.py``) one worker
+  authenticates for the whole host and the others use its token, and failed
+  attempts are counted host-wide.
+
+Only D&B rejecting the credentials (401/403) counts as a failed attempt;
+connection errors, timeouts and outages do not. The count is cleared by a
+successful authentication and lapses ``auth_failure_cooldown`` seconds after
+the last rejection, so a lockout guard tripped by a bad password that has
+since been fixed does not outlive it.
+"""
+
+import asyncio
+import contextvars
 import logging
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from app.config import settings
-from app.exceptions import DNBAuthenticationError, DNBTokenExpiredError
+from app.exceptions import (
+    DNBAPIError,
+    DNBAuthenticationError,
+    DNBCredentialsRejectedError,
+    DNBDeadlineExceededError,
+)
 from app.utils import build_transaction_detail
 from app.mock_data import get_mock_auth_response
 
 logger = logging.getLogger(__name__)
 
+# A token is treated as expired this long before D&B expires it
+EXPIRY_BUFFER = timedelta(minutes=5)
+# Background renewal happens this long before expiry, ahead of the buffer
+RENEW_AHEAD = timedelta(minutes=15)
+# Seconds between background renewal attempts after a failure
+RENEW_RETRY_INTERVAL = 60.0
+AUTH_TIMEOUT = 30.0
+# How often a worker waiting on another worker's refresh checks the token store
+LOCK_POLL_INTERVAL = 0.1
+
 
 class TokenManager:
     """Manages D&B authentication tokens"""
-    
+
     def __init__(self):
         self._token: Optional[str] = None
         self._token_expiry: Optional[datetime] = None
         self._failed_attempts: int = 0
+        self._last_failed_at: float = 0.0
         self._max_failed_attempts: int = 3
-    
-    @property
-    def token(self) -> str:
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._renewal_task: Optional[asyncio.Task] = None
+
+    async def get_token(self) -> str:
         """Get current valid token, refresh if needed"""
         if self._is_token_valid():
             return self._token
-        
+
         # Token expired or doesn't exist, get new one
-        return self._refresh_token()
-    
+        return await self.refresh()
+
     def _is_token_valid(self) -> bool:
         """Check if current token is still valid"""
         if not self._token or not self._token_expiry:
             return False
-        
+
         # Check if token has expired (with 5 minute buffer)
-        buffer = timedelta(minutes=5)
-        return datetime.now(timezone.utc) < (self._token_expiry - buffer)
-    
-    def _refresh_token(self) -> str:
+        return datetime.now(timezone.utc) < (self._token_expiry - EXPIRY_BUFFER)
+
+    async def refresh(self) -> str:
+        """Obtain a new token; concurrent callers share one authentication call"""
+        from app import deadline
+
+        task = self._refresh_task
+        if task is None or task.done():
+            # Outside the caller's context, so one request's budget cannot cut
+            # short a refresh that other requests are waiting on
+            task = asyncio.create_task(self._refresh_token(), context=contextvars.Context())
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._refresh_task = task
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DNBDeadlineExceededError("Request budget exhausted waiting for a D&B token")
+
+    async def _refresh_token(self) -> str:
         """Refresh authentication token"""
-        if self._failed_attempts >= self._max_failed_attempts:
+        from app.token_store import get_token_store
+
+        store = get_token_store()
+        if store is not None:
+            return await self._refresh_shared(store)
+
+        self._check_lockout(self._failures())
+        try:
+            token = await self._request_token()
+        except DNBCredentialsRejectedError:
+            self._failed_attempts += 1
+            self._last_failed_at = time.time()
+            raise
+        self._failed_attempts = 0
+        return self._use(token, time.time() + settings.token_refresh_interval)
+
+    async def _refresh_shared(self, store) -> str:
+        """Take a token another worker has renewed, or renew it for the host under the store's lock"""
+        rejected = self._token
+        account = f"{settings.dnb_username}@{settings.dnb_auth_url}"
+        give_up_at = time.monotonic() + AUTH_TIMEOUT + 5
+        while True:
+            token, expires_at, self._failed_attempts = await asyncio.to_thread(store.read, account)
+            if self._usable(token, expires_at, rejected):
+                return self._use(token, expires_at)
+            self._check_lockout(self._failed_attempts)
+            if await asyncio.to_thread(store.try_lock, AUTH_TIMEOUT + 5):
+                # Another worker may have saved a token just before the lock was free
+                token, expires_at, _ = await asyncio.to_thread(store.read, account)
+                if self._usable(token, expires_at, rejected):
+                    await asyncio.to_thread(store.release)
+                    return self._use(token, expires_at)
+                break
+            if time.monotonic() >= give_up_at:
+                raise DNBAuthenticationError("Timed out waiting for another worker to authenticate")
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+        try:
+            token = await self._request_token()
+        except DNBCredentialsRejectedError:
+            self._failed_attempts = await asyncio.to_thread(store.record_failure)
+            self._last_failed_at = time.time()
+            raise
+        except BaseException:
+            await asyncio.to_thread(store.release)
+            raise
+        expires_at = time.time() + settings.token_refresh_interval
+        await asyncio.to_thread(store.save, account, token, expires_at)
+        self._failed_attempts = 0
+        return self._use(token, expires_at)
+
+    @staticmethod
+    def _usable(token: Optional[str], expires_at: Optional[float], rejected: Optional[str]) -> bool:
+        """A stored token is usable if it is not the one being replaced and is not about to expire"""
+        return bool(token) and token != rejected and expires_at - EXPIRY_BUFFER.total_seconds() > time.time()
+
+    def _use(self, token: str, expires_at: float) -> str:
+        self._token = token
+        self._token_expiry = datetime.fromtimestamp(expires_at, timezone.utc)
+        return token
+
+    def _failures(self) -> int:
+        """Consecutive rejected attempts, or 0 once the last is ``auth_failure_cooldown`` old"""
+        if time.time() - self._last_failed_at >= settings.auth_failure_cooldown:
+            return 0
+        return self._failed_attempts
+
+    def _check_lockout(self, failed_attempts: int):
+        if failed_attempts >= self._max_failed_attempts:
             raise DNBAuthenticationError(
                 "Account locked due to multiple failed authentication attempts. "
                 "Please contact D&B support."
             )
-        
+
+    async def _request_token(self) -> str:
+        """Make one authentication attempt (mock or D&B)"""
         try:
             logger.info("Requesting new authentication token")
-            
+
             if settings.use_mock_data:
                 # Use mock authentication
                 response_data = get_mock_auth_response(success=True)
-                
-                if response_data.get("AuthenticationDetail"):
-                    self._token = response_data["AuthenticationDetail"]["Token"]
-                    self._token_expiry = datetime.now(timezone.utc) + timedelta(
-                        seconds=settings.token_refresh_interval
-                    )
-                    self._failed_attempts = 0
-                    logger.info("Successfully obtained mock authentication token")
-                    return self._token
-                else:
+                if not response_data.get("AuthenticationDetail"):
                     raise DNBAuthenticationError("Mock authentication failed")
-            
+                token = response_data["AuthenticationDetail"]["Token"]
             else:
-                # Real D&B authentication would go here
-                # This will be implemented when you get credentials
-                import httpx
-                
-                headers = {
-                    "x-dnb-user": settings.dnb_username,
-                    "x-dnb-pwd": settings.dnb_password,
-                    "Content-Type": "application/json"
-                }
-                
-                body = {
-                    "TransactionDetail": build_transaction_detail()
-                }
-                
-                with httpx.Client() as client:
-                    response = client.post(
-                        settings.dnb_auth_url,
-                        headers=headers,
-                        json=body,
-                        timeout=30.0
-                    )
-                    
-                    if response.status_code == 200:
-                        # Extract token from Authorization header
-                        token = response.headers.get("Authorization")
-                        if token:
-                            self._token = token
-                            self._token_expiry = datetime.now(timezone.utc) + timedelta(
-                                seconds=settings.token_refresh_interval
-                            )
-                            self._failed_attempts = 0
-                            logger.info("Successfully obtained authentication token")
-                            return self._token
-                    
-                    # Authentication failed
-                    self._failed_attempts += 1
-                    raise DNBAuthenticationError(
-                        f"Authentication failed with status {response.status_code}"
-                    )
-        
+                token = await self._authenticate()
+
+        except DNBAuthenticationError as e:
+            logger.error(f"Authentication error: {e.message}")
+            raise
         except Exception as e:
-            self._failed_attempts += 1
             logger.error(f"Authentication error: {str(e)}")
             raise DNBAuthenticationError(f"Failed to obtain authentication token: {str(e)}")
-    
-    def invalidate_token(self):
+
+        logger.info("Successfully obtained authentication token")
+        return token
+
+    async def _authenticate(self) -> str:
+        """Call the D&B authentication endpoint and return the token"""
+        from app.http_pool import get_http_client
+
+        headers = {
+            "x-dnb-user": settings.dnb_username,
+            "x-dnb-pwd": settings.dnb_password,
+            "Content-Type": "application/json"
+        }
+
+        body = {
+            "TransactionDetail": build_transaction_detail()
+        }
+
+        response = await get_http_client().post(
+            settings.dnb_auth_url,
+            headers=headers,
+            json=body,
+            timeout=AUTH_TIMEOUT
+        )
+
+        if response.status_code in (401, 403):
+            raise DNBCredentialsRejectedError(f"Authentication rejected with status {response.status_code}")
+        # Token is returned in the Authorization header
+        token = response.headers.get("Authorization") if response.status_code == 200 else None
+        if not token:
+            raise DNBAuthenticationError(f"Authentication failed with status {response.status_code}")
+        return token
+
+    def _renew_in(self) -> float:
+        """Seconds until the current token should be renewed in the background"""
+        if not self._token_expiry:
+            return 0.0
+        ahead = min(RENEW_AHEAD, timedelta(seconds=settings.token_refresh_interval / 2))
+        return max(0.0, (self._token_expiry - ahead - datetime.now(timezone.utc)).total_seconds())
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self._renew_in())
+            if self._failures() >= self._max_failed_attempts - 1:
+                # Leave the last attempt before the lockout to a request
+                await asyncio.sleep(RENEW_RETRY_INTERVAL)
+                continue
+            try:
+                await self.refresh()
+            except DNBAPIError as e:
+                logger.warning(f"Background token renewal failed: {e.message}")
+                await asyncio.sleep(RENEW_RETRY_INTERVAL)
+
+    async def start(self):
+        """Obtain a token and keep renewing it in the background (app startup)"""
+        try:
+            await self.refresh()
+        except DNBAPIError as e:
+            logger.warning(f"No authentication token at startup, will retry: {e.message}")
+        self._renewal_task = asyncio.create_task(self._renew())
+
+    async def stop(self):
+        """Stop background renewal (app shutdown)"""
+        if self._renewal_task is not None:
+            self._renewal_task.cancel()
+            try:
+                await self._renewal_task
+            except asyncio.CancelledError:
+                pass
+            self._renewal_task = None
+
+    def invalidate_token(self, token: Optional[str] = None):
         """Invalidate current token (force refresh on next request)"""
+        if token is not None and token != self._token:
+            # Already replaced since the caller used it
+            return
         logger.info("Invalidating current token")
+        from app.token_store import get_token_store
+
+        store = get_token_store()
+        if store is not None and self._token is not None:
+            store.clear(self._token)
         self._token = None
         self._token_expiry = None
-    
+
     def reset_failed_attempts(self):
         """Reset failed authentication attempts counter"""
+        from app.token_store import get_token_store
+
+        store = get_token_store()
+        if store is not None:
+            store.reset_failures()
         self._failed_attempts = 0
 
 
@@ -0,0 +1,116 @@
+"""
+Batch enrichment of many DUNS
+
+``stream_batch`` fetches every requested product for every DUNS in a batch
+and yields one NDJSON line per (DUNS, product) as it completes, then a
+summary line. Repeated DUNS are fetched once, and a product that contains
+another requested one (``SUBSUMED_BY``) is fetched first, so the other is
+served from the cache. Items go through the same
+``DNBClient`` calls as the single-DUNS routes, so they share the product
+cache, retries and the host-wide rate limit (``rate_limit.py``).
+
+At most ``batch_concurrency`` items are in flight at a time, so a large
+batch waits its turn here rather than flooding the rate limiter's queue
+(which fails calls that would queue longer than ``rate_limit_max_wait``).
+A failed item is reported on its own line; it does not fail the batch.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from app.config import settings
+from app.dnb_client import dnb_client
+from app.exceptions import DNBAPIError, DNBValidationError
+from app.product_cache import ANALYTICS, FINANCIALS, SUBSUMED_BY, cache_status
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(line: Dict[str, Any]) -> bytes:
+    return json.dumps(line, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def plan_batch(duns: List[str], products: List[str]) -> Tuple[List[str], List[str]]:
+    """The batch's distinct DUNS in request order, and product codes with those containing others first"""
+    unique_duns = list(dict.fromkeys(d.strip().replace("-", "") for d in duns if d.strip()))
+    unique_products = list(dict.fromkeys(p.strip().upper() for p in products if p.strip()))
+    if not unique_duns:
+        raise DNBValidationError("Provide at least one DUNS")
+    if not unique_products:
+        raise DNBValidationError("Provide at least one product")
+    if len(unique_duns) > settings.batch_max_duns:
+        raise DNBValidationError(f"At most {settings.batch_max_duns} DUNS per batch")
+    containers = {container for product in unique_products for container, _ in SUBSUMED_BY.get(product, [])}
+    unique_products.sort(key=lambda product: product not in containers)
+    return unique_duns, unique_products
+
+
+async def _enrich(duns: str, product: str) -> Dict[str, Any]:
+    """One product for one DUNS, as a result line"""
+    try:
+        if product == FINANCIALS:
+            data = await dnb_client.get_financial_statements(duns)
+        elif product == ANALYTICS:
+            data = await dnb_client.get_analytics(duns)
+        else:
+            data = await dnb_client.get_company_profile(duns, product_code=product)
+    except DNBAPIError as e:
+        return {"duns": duns, "product": product, "status": "error",
+                "error": {"error_code": e.error_code, "message": e.message}}
+    except Exception as e:
+        logger.error(f"Unexpected error enriching {duns} {product}: {str(e)}")
+        return {"duns": duns, "product": product, "status": "error",
+                "error": {"error_code": None, "message": str(e)}}
+    return {"duns": duns, "product": product, "status": "ok", "cache": cache_status(), "data": data}
+
+
+async def stream_batch(duns: List[str], products: List[str], requested: int) -> AsyncIterator[bytes]:
+    """NDJSON: one line per DUNS and product as it completes, then a summary"""
+    started = time.perf_counter()
+    items = iter([(d, p) for p in products for d in duns])
+    total = len(duns) * len(products)
+    results: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    # Set once a DUNS's product that contains another requested product is fetched
+    fetched = {
+        (d, container): asyncio.Event()
+        for product in products for container, _ in SUBSUMED_BY.get(product, []) if container in products
+        for d in duns
+    }
+
+    async def work():
+        # Workers share one iterator, so each item is taken exactly once. Containing
+        # products come first, so a wait here is only ever on an item already taken
+        for item_duns, product in items:
+            for container, _ in SUBSUMED_BY.get(product, []):
+                if (item_duns, container) in fetched:
+                    await fetched[item_duns, container].wait()
+            await results.put(await _enrich(item_duns, product))
+            if (item_duns, product) in fetched:
+                fetched[item_duns, product].set()
+
+    workers = [asyncio.create_task(work()) for _ in range(min(settings.batch_concurrency, total))]
+    counts = {"ok": 0, "errors": 0, "cache_hits": 0}
+    try:
+        for _ in range(total):
+            line = await results.get()
+            if line["status"] == "ok":
+                counts["ok"] += 1
+                counts["cache_hits"] += line["cache"] == "HIT"
+            else:
+                counts["errors"] += 1
+            yield _encode(line)
+    finally:
+        # The client went away or the stream failed: stop fetching
+        for worker in workers:
+            worker.cancel()
+    yield _encode({"summary": {
+        "requested": requested,
+        "duns": len(duns),
+        "products": products,
+        "items": total,
+        **counts,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }})
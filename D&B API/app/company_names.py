@@ -0,0 +1,75 @@
+"""
+Canonical company names for search caching
+
+Batch files spell the same company many ways: "Gorman Manufacturing Co.,
+Inc.", "GORMAN MANUFACTURING COMPANY INC", "Gorman  Manufacturing Company,
+Incorporated". ``canonical_company_name`` reduces them all to one form, so a
+search cached under one spelling answers the others:
+
+1. Unicode compatibility forms and accents are folded ("Société" -> "societe"),
+   then case is folded.
+2. "&" becomes "and"; dots and apostrophes are dropped ("L.L.C." -> "llc",
+   "O'Brien" -> "obrien"); any other punctuation separates words.
+3. Legal-form words at the end of the name are reduced to one abbreviation
+   each ("Company, Incorporated" -> "co inc"). They are kept rather than
+   dropped, as "Acme Ltd" and "Acme Inc" can be different companies.
+4. Whitespace is collapsed.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+# Multi-word legal forms, longest first, matched at the end of the name
+LEGAL_PHRASES: List[Tuple[Tuple[str, ...], str]] = [
+    (("public", "limited", "company"), "plc"),
+    (("limited", "liability", "company"), "llc"),
+    (("limited", "liability", "partnership"), "llp"),
+    (("limited", "partnership"), "lp"),
+]
+
+LEGAL_WORDS: Dict[str, str] = {
+    "company": "co",
+    "corporation": "corp",
+    "incorporated": "inc",
+    "limited": "ltd",
+    "ltd": "ltd",
+    "llc": "llc",
+    "llp": "llp",
+    "plc": "plc",
+    "gmbh": "gmbh",
+    "co": "co",
+    "corp": "corp",
+    "inc": "inc",
+    "lp": "lp",
+}
+
+_DROPPED = re.compile(r"[.'’`]")
+_SEPARATORS = re.compile(r"[^\w]+")
+
+
+def _fold(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def canonical_company_name(name: str) -> str:
+    """One spelling for all the ways of writing a company name"""
+    text = _fold(name).replace("&", " and ")
+    text = _DROPPED.sub("", text)
+    words = [word for word in _SEPARATORS.split(text.replace("_", " ")) if word]
+
+    # Legal forms, working back from the end of the name
+    suffix: List[str] = []
+    while words:
+        for phrase, abbreviation in LEGAL_PHRASES:
+            if tuple(words[-len(phrase):]) == phrase and len(words) > len(phrase):
+                del words[-len(phrase):]
+                suffix.append(abbreviation)
+                break
+        else:
+            if len(words) > 1 and words[-1] in LEGAL_WORDS:
+                suffix.append(LEGAL_WORDS[words.pop()])
+                continue
+            break
+    return " ".join(words + suffix[::-1])
@@ -1,7 +1,10 @@
 """Configuration management for D&B API service"""
 
+import os
+import tempfile
+
 from pydantic_settings import BaseSettings
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -13,9 +16,16 @@ class Settings(BaseSettings):
     dnb_environment: Literal["sandbox", "production"] = "sandbox"
     dnb_api_version: str = "5.0"
     dnb_auth_version: str = "2.0"
+    dnb_api_base_url: Optional[str] = None  # Override, e.g. a local stand-in server
     
-    # Mock Mode
+    # Mock Mode: a synthetic D&B answers in-process (see app/synthetic.py)
     use_mock_data: bool = True
+    mock_seed: int = 0  # same seed, same company for every DUNS
+    mock_latency: str = ""  # ms, e.g. "lognormal:900:0.4"; fixed, uniform, normal, lognormal or exp
+    mock_error_rate: float = 0.0  # fraction of calls answered 503
+    mock_throttle_rate: float = 0.0  # fraction of calls answered 429
+    mock_qps: int = 0  # calls per second above which calls are answered 429; 0 for no ceiling
+    mock_not_found_rate: float = 0.0  # fraction of DUNS that do not exist (404)
     
     # API Configuration
     api_title: str = "D&B Direct 2.0 API Service"
@@ -29,9 +39,44 @@ class Settings(BaseSettings):
     
     # Token Management
     token_refresh_interval: int = 86400  # 24 hours in seconds
+    auth_failure_cooldown: int = 900  # seconds after the last credential rejection before the count lapses
+    # Token shared by all workers on the host (SQLite, in a directory private to this user);
+    # "off" keeps one per process
+    token_store_path: str = os.path.join(tempfile.gettempdir(), f"dnb-api-{os.getuid()}", "token.db")
+    
+    # Pooled HTTP client shared by all D&B calls in a worker
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # seconds an idle connection is kept open
+    http2: bool = False  # needs the h2 package: pip install 'httpx[http2]'
+    
+    # Retries of 429s, 5xx and connection errors (see app/retry.py)
+    retry_attempts: int = 3  # attempts per call, including the first
+    retry_base_delay: float = 0.5  # seconds
+    retry_max_delay: float = 20.0  # longest wait, Retry-After included
+    retry_budget_ratio: float = 0.2  # retries allowed per call made in the last 10 s
+    retry_budget_reserve: float = 10.0  # retries allowed per 10 s regardless of traffic
     
-    # Rate Limiting
+    # Rate Limiting (see app/rate_limit.py)
     rate_limit_qps: int = 10  # Queries per second
+    rate_limit_burst: Optional[int] = None  # calls that may go at once; defaults to rate_limit_qps
+    rate_limit_max_wait: float = 30.0  # longest a call queues for a slot
+    # Schedule shared by all workers on the host (SQLite); "off" limits each worker separately
+    rate_limit_path: str = os.path.join(tempfile.gettempdir(), "dnb-api-ratelimit.db")
+    
+    # Batch enrichment (POST /api/v1/companies/batch, see app/batch.py)
+    batch_max_duns: int = 10000
+    batch_concurrency: int = 20  # items in flight per batch
+    
+    # Product cache store shared by all workers on the host when redis_url is unset (SQLite, WAL mode);
+    # "off" keeps a product cache per worker
+    shared_cache_path: str = os.path.join(tempfile.gettempdir(), "dnb-api-cache.db")
+    shared_cache_max_mb: int = 256
+    
+    # Upstream cassettes: record D&B traffic, or replay it offline
+    cassette_mode: Literal["off", "record", "replay"] = "off"
+    cassette_path: str = "cassettes/dnb-{pid}.jsonl.gz"
+    cassette_latency_scale: float = 1.0  # 0 replays without the recorded latency
     
     # Logging
     log_level: str = "INFO"
@@ -39,16 +84,41 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: str = "*"
     
-    # Redis (Optional)
-    redis_url: Optional[str] = None
+    # Product cache (see app/product_cache.py): on Redis when redis_url is set, else per process
+    redis_url: Optional[str] = None  # e.g. redis://localhost:6379/0; needs the redis package
+    # Seconds each product is cached, by product code; 0 turns caching off for a product
+    product_cache_ttls: Dict[str, int] = {
+        "DCP_STD": 86400,
+        "DCP_PREM": 86400,
+        "FINANCIALS": 604800,
+        "ANALYTICS": 21600,
+        "MATCH": 86400  # company search results
+    }
+    product_cache_ttl: int = 86400  # other product codes
+    product_cache_max_entries: int = 10000  # in-process cache only
+    product_cache_timeout: float = 0.5  # seconds for a Redis command before falling back to D&B
     
     @property
     def dnb_base_url(self) -> str:
         """Get D&B base URL based on environment"""
+        if self.dnb_api_base_url:
+            return self.dnb_api_base_url.rstrip("/")
         if self.dnb_environment == "sandbox":
             return "https://direct.dnb.com"
         return "https://direct.dnb.com"
     
+    @property
+    def upstream_namespace(self) -> str:
+        """Which D&B answers: the synthetic one (by seed) or the one at the base URL; keeps their cached data apart"""
+        return f"mock-{self.mock_seed}" if self.use_mock_data else self.dnb_base_url
+    
+    def upstream_path(self, path: str) -> str:
+        """A host-shared file for the D&B that answers: mock mode gets its own, e.g. dnb-api-cache-mock.db"""
+        if not self.use_mock_data or path.lower() in ("", "off", "false", "none"):
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}-mock{ext}"
+    
     @property
     def dnb_auth_url(self) -> str:
         """Get D&B authentication URL"""
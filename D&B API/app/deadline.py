@@ -0,0 +1,111 @@
+"""
+Per-request latency budgets
+
+A caller (such as the backend's KYC profile) can send ``X-Request-Budget-Ms``
+or the ``budget_ms`` query parameter to say how long it is prepared to wait.
+``DeadlineMiddleware`` turns that into a deadline for the request: D&B
+request and token timeouts, retries and cache waits are capped by what is
+left of it, and once it has passed the request is abandoned with a 504
+(``DL001``) instead of tying up a worker for a caller that has given up.
+
+Requests without a budget keep the client's own timeouts.
+"""
+
+import asyncio
+import json
+import time
+from contextvars import ContextVar
+from typing import Optional
+from urllib.parse import parse_qs
+
+HEADER = "X-Request-Budget-Ms"
+QUERY_PARAM = "budget_ms"
+
+# The middleware waits this much past the budget, so the capped D&B timeout
+# normally answers first with a DNBDeadlineExceededError (504, DL001)
+GRACE = 0.25
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget, or ``None`` without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def timeout(default: float) -> float:
+    """A client timeout capped by the remaining budget"""
+    left = remaining()
+    return default if left is None else min(default, left)
+
+
+def check(operation: str = "request") -> None:
+    """Raise ``DNBDeadlineExceededError`` if the budget is already spent"""
+    if remaining() == 0.0:
+        from app.exceptions import DNBDeadlineExceededError
+
+        raise DNBDeadlineExceededError(f"Request budget exhausted before D&B {operation}")
+
+
+def _budget_ms(scope) -> Optional[float]:
+    for name, value in scope.get("headers") or []:
+        if name.decode("latin-1").lower() == HEADER.lower():
+            return float(value)
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if QUERY_PARAM in query:
+        return float(query[QUERY_PARAM][0])
+    return None
+
+
+class DeadlineMiddleware:
+    """Sets the request deadline and answers 504 if the app overruns it"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        try:
+            budget_ms = _budget_ms(scope)
+        except ValueError:
+            budget_ms = None
+        if budget_ms is None:
+            return await self.app(scope, receive, send)
+
+        token = _deadline.set(time.monotonic() + budget_ms / 1000)
+        started = False
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(self.app(scope, receive, tracking_send), timeout=budget_ms / 1000 + GRACE)
+        except asyncio.TimeoutError:
+            if started:
+                # Part of the response has gone out; stopping is all we can do
+                return
+            from app.utils import get_iso_timestamp
+
+            body = json.dumps({
+                "error": {
+                    "error_code": "DL001",
+                    "message": f"Request budget of {budget_ms:g} ms exceeded",
+                    "severity": "Error"
+                },
+                "timestamp": get_iso_timestamp()
+            }).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            _deadline.reset(token)
@@ -1,5 +1,6 @@
 """D&B API Client"""
 
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 
@@ -7,32 +8,31 @@ from app.config import settings
 from app.auth import token_manager
 from app.exceptions import (
     DNBAPIError,
+    DNBDeadlineExceededError,
     DNBNotFoundError,
     DNBServiceUnavailableError,
-    DNBRateLimitError
-)
-from app.mock_data import (
-    get_mock_company_search_response,
-    get_mock_company_profile,
-    get_mock_financial_statements,
-    get_mock_analytics
+    DNBRateLimitError,
+    DNBTimeoutError,
+    DNBTokenExpiredError
 )
+from app.company_names import canonical_company_name
+from app.product_cache import ANALYTICS, FINANCIALS, MATCH, get_product_cache
+from app.retry import call_with_retries, parse_retry_after
 from app.utils import build_transaction_detail
 
 logger = logging.getLogger(__name__)
 
 
 class DNBClient:
-    """Client for D&B Direct 2.0 API"""
+    """Client for D&B Direct 2.0 API (in mock mode, the synthetic D&B in app/synthetic.py)"""
     
     def __init__(self):
         self.base_url = settings.dnb_base_url
         self.api_version = settings.dnb_api_version
-        self.use_mock = settings.use_mock_data
     
-    def _get_headers(self) -> Dict[str, str]:
+    async def _get_headers(self) -> Dict[str, str]:
         """Get headers for D&B API requests"""
-        token = token_manager.token
+        token = await token_manager.get_token()
         return {
             "Authorization": token,
             "Content-Type": "application/json",
@@ -46,45 +46,80 @@ class DNBClient:
         params: Optional[Dict[str, Any]] = None,
         json_data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Make HTTP request to D&B API"""
-        
-        if self.use_mock:
-            # Return mock data - actual implementation would be in specific methods
-            logger.info(f"Mock mode: {method} {endpoint}")
-            return {}
-        
-        # Real API call would go here when credentials are available
+        """Make HTTP request to D&B API (rate limited and retried; callers cache through the product cache)"""
+        return await self._send_with_retries(method, endpoint, params, json_data)
+    
+    async def _send_with_retries(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Send a request, retrying 429s, 5xx, connection errors and expired tokens"""
+        return await call_with_retries(
+            lambda: self._send(method, endpoint, params, json_data),
+            f"{method} {endpoint}"
+        )
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Send one request to the D&B API and map error statuses"""
         import httpx
+        from app import deadline
+        from app.http_pool import get_http_client
+        from app.rate_limit import get_rate_limiter
         
+        deadline.check(f"{method} {endpoint}")
         url = f"{self.base_url}{endpoint}"
-        headers = self._get_headers()
+        headers = await self._get_headers()
+        limiter = get_rate_limiter()
+        await limiter.acquire()
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    params=params,
-                    json=json_data,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 401:
-                    # Token expired, invalidate and retry
-                    token_manager.invalidate_token()
-                    raise DNBAPIError("Authentication token expired", "SC001")
-                elif response.status_code == 404:
-                    raise DNBNotFoundError("Resource not found")
-                elif response.status_code == 429:
-                    raise DNBRateLimitError("Rate limit exceeded")
-                elif response.status_code >= 500:
-                    raise DNBServiceUnavailableError("D&B service unavailable")
+            response = await get_http_client().request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json_data,
+                timeout=deadline.timeout(30.0)
+            )
+            
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 401:
+                # Token expired, invalidate and retry
+                token_manager.invalidate_token(headers["Authorization"])
+                raise DNBTokenExpiredError("Authentication token expired")
+            elif response.status_code == 404:
+                raise DNBNotFoundError("Resource not found")
+            elif response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                pause = 1.0 if retry_after is None else retry_after
+                if limiter.path is None:
+                    limiter.pause(pause)
                 else:
-                    raise DNBAPIError(f"API request failed with status {response.status_code}")
-        
+                    # A write to the shared schedule can wait on other workers: keep it off the event loop
+                    await asyncio.to_thread(limiter.pause, pause)
+                raise DNBRateLimitError("Rate limit exceeded", retry_after)
+            elif response.status_code >= 500:
+                raise DNBServiceUnavailableError(
+                    "D&B service unavailable", parse_retry_after(response.headers.get("Retry-After"))
+                )
+            else:
+                raise DNBAPIError(f"API request failed with status {response.status_code}")
+        
+        except httpx.TimeoutException as e:
+            if deadline.remaining() == 0.0:
+                raise DNBDeadlineExceededError(f"Request budget exhausted during {method} {endpoint}")
+            logger.error(f"Request timed out: {str(e)}")
+            raise DNBTimeoutError(f"D&B API request timed out: {str(e)}")
         except httpx.RequestError as e:
             logger.error(f"Request error: {str(e)}")
             raise DNBServiceUnavailableError(f"Failed to connect to D&B API: {str(e)}")
@@ -96,14 +131,10 @@ class DNBClient:
         territory_name: Optional[str] = None,
         match_type: str = "Advanced"
     ) -> Dict[str, Any]:
-        """Search for companies and get D-U-N-S numbers"""
+        """Search for companies and get D-U-N-S numbers (cached by canonical name)"""
         
         logger.info(f"Searching for company: {subject_name}")
         
-        if self.use_mock:
-            return get_mock_company_search_response(subject_name)
-        
-        # Real API call
         endpoint = f"/V{self.api_version}/organizations"
         params = {
             "CountryISOAlpha2Code": country_iso_code,
@@ -115,7 +146,16 @@ class DNBClient:
         if territory_name:
             params["TerritoryName"] = territory_name
         
-        return await self._make_request("GET", endpoint, params=params)
+        # Spellings of the same name share one cached match
+        search = ":".join([
+            country_iso_code.upper(),
+            (territory_name or "").upper(),
+            match_type.lower(),
+            canonical_company_name(subject_name)
+        ])
+        return await get_product_cache().get_or_fetch(
+            MATCH, search, lambda: self._make_request("GET", endpoint, params=params)
+        )
     
     async def get_company_profile(
         self,
@@ -126,36 +166,30 @@ class DNBClient:
         
         logger.info(f"Getting company profile for D-U-N-S: {duns}")
         
-        if self.use_mock:
-            return get_mock_company_profile(duns)
-        
-        # Real API call
         endpoint = f"/V{self.api_version}/organizations/{duns}/products/{product_code}"
-        return await self._make_request("GET", endpoint)
+        return await get_product_cache().get_or_fetch(
+            product_code, duns, lambda: self._make_request("GET", endpoint)
+        )
     
     async def get_financial_statements(self, duns: str) -> Dict[str, Any]:
         """Get financial statements for a company"""
         
         logger.info(f"Getting financial statements for D-U-N-S: {duns}")
         
-        if self.use_mock:
-            return get_mock_financial_statements(duns)
-        
-        # Real API call would use appropriate endpoint
         endpoint = f"/V{self.api_version}/organizations/{duns}/financials"
-        return await self._make_request("GET", endpoint)
+        return await get_product_cache().get_or_fetch(
+            FINANCIALS, duns, lambda: self._make_request("GET", endpoint)
+        )
     
     async def get_analytics(self, duns: str) -> Dict[str, Any]:
         """Get predictive analytics and risk scores"""
         
         logger.info(f"Getting analytics for D-U-N-S: {duns}")
         
-        if self.use_mock:
-            return get_mock_analytics(duns)
-        
-        # Real API call would use appropriate endpoint
         endpoint = f"/V{self.api_version}/organizations/{duns}/analytics"
-        return await self._make_request("GET", endpoint)
+        return await get_product_cache().get_or_fetch(
+            ANALYTICS, duns, lambda: self._make_request("GET", endpoint)
+        )
 
 
 # Global client instance
@@ -19,6 +19,10 @@ class DNBAuthenticationError(DNBAPIError):
         super().__init__(message, error_code)
 
 
+class DNBCredentialsRejectedError(DNBAuthenticationError):
+    """Exception raised when D&B rejects the service's credentials (401/403); counts toward the lockout"""
+
+
 class DNBTokenExpiredError(DNBAPIError):
     """Exception raised when authentication token expires"""
     
@@ -29,15 +33,21 @@ class DNBTokenExpiredError(DNBAPIError):
 class DNBRateLimitError(DNBAPIError):
     """Exception raised when rate limit is exceeded"""
     
-    def __init__(self, message: str = "Rate limit exceeded"):
+    def __init__(self, message: str = "Rate limit exceeded", retry_after: Optional[float] = None):
         super().__init__(message, "RL001")
+        self.retry_after = retry_after
 
 
 class DNBServiceUnavailableError(DNBAPIError):
     """Exception raised when D&B service is unavailable"""
     
-    def __init__(self, message: str = "D&B service is currently unavailable"):
+    def __init__(self, message: str = "D&B service is currently unavailable", retry_after: Optional[float] = None):
         super().__init__(message, "SU001")
+        self.retry_after = retry_after
+
+
+class DNBTimeoutError(DNBServiceUnavailableError):
+    """Exception raised when D&B does not answer in time"""
 
 
 class DNBNotFoundError(DNBAPIError):
@@ -52,3 +62,10 @@ class DNBValidationError(DNBAPIError):
     
     def __init__(self, message: str = "Validation error"):
         super().__init__(message, "VE001")
+
+
+class DNBDeadlineExceededError(DNBAPIError):
+    """Exception raised when the caller's request budget runs out"""
+    
+    def __init__(self, message: str = "Request budget exceeded"):
+        super().__init__(message, "DL001")
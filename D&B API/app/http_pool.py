@@ -0,0 +1,63 @@
+"""
+Pooled HTTP client for D&B
+
+Every D&B call in a worker (authentication included) goes through one
+``httpx.AsyncClient``, opened in the app lifespan. Connections to D&B are
+kept alive and reused instead of paying a TCP and TLS handshake per request.
+Pool size and keep-alive come from ``settings.http_*``. ``http2`` multiplexes
+requests over fewer connections, and needs the ``h2`` package
+(``pip install 'httpx[http2]'``). In mock mode the client's transport is the
+synthetic D&B (``synthetic.py``) instead of the network.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def _create() -> "httpx.AsyncClient":
+    import httpx
+    from app.cassette import cassette_transport
+
+    http2 = settings.http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP2=true needs the h2 package (pip install 'httpx[http2]'); using HTTP/1.1")
+            http2 = False
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry
+    )
+    if settings.use_mock_data:
+        from app.synthetic import mock_transport
+
+        return httpx.AsyncClient(transport=mock_transport())
+    # A cassette transport replaces the client's own, so it gets the pool options too
+    return httpx.AsyncClient(limits=limits, http2=http2, transport=cassette_transport(limits=limits, http2=http2))
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """This worker's pooled client, opened on first use if the lifespan has not opened it"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create()
+    return _client
+
+
+async def close_http_client():
+    """Close the pooled client and its connections (app shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
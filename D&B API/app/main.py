@@ -1,16 +1,21 @@
 """FastAPI application for D&B Direct 2.0 API"""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from app.auth import token_manager
 from app.config import settings
 from app.dnb_client import dnb_client
+from app.http_pool import close_http_client, get_http_client
+from app.product_cache import HEADER as CACHE_HEADER, cache_status, close_product_cache
 from app.models import (
+    BatchEnrichmentRequest,
     CompanySearchRequest,
     HealthCheckResponse,
     ErrorResponse,
@@ -19,10 +24,13 @@ from app.models import (
 from app.exceptions import (
     DNBAPIError,
     DNBAuthenticationError,
+    DNBDeadlineExceededError,
     DNBNotFoundError,
     DNBRateLimitError,
-    DNBServiceUnavailableError
+    DNBServiceUnavailableError,
+    DNBValidationError
 )
+from app.deadline import DeadlineMiddleware
 from app.utils import get_iso_timestamp
 
 # Configure logging
@@ -39,7 +47,13 @@ async def lifespan(app: FastAPI):
     logger.info("Starting D&B API Service")
     logger.info(f"Mock mode: {settings.use_mock_data}")
     logger.info(f"Environment: {settings.dnb_environment}")
+    # One pooled HTTP client per worker, then a token before the first request
+    get_http_client()
+    await token_manager.start()
     yield
+    await token_manager.stop()
+    await close_http_client()
+    await close_product_cache()
     logger.info("Shutting down D&B API Service")
 
 
@@ -53,6 +67,9 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# X-Request-Budget-Ms / budget_ms: abandon the request with a 504 once it is spent
+app.add_middleware(DeadlineMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -96,6 +113,22 @@ async def not_found_error_handler(request, exc: DNBNotFoundError):
     )
 
 
+@app.exception_handler(DNBValidationError)
+async def validation_error_handler(request, exc: DNBValidationError):
+    """Handle invalid requests"""
+    return JSONResponse(
+        status_code=400,
+        content={
+            "error": {
+                "error_code": exc.error_code,
+                "message": exc.message,
+                "severity": "Error"
+            },
+            "timestamp": get_iso_timestamp()
+        }
+    )
+
+
 @app.exception_handler(DNBRateLimitError)
 async def rate_limit_error_handler(request, exc: DNBRateLimitError):
     """Handle rate limit errors"""
@@ -128,6 +161,22 @@ async def service_unavailable_error_handler(request, exc: DNBServiceUnavailableE
     )
 
 
+@app.exception_handler(DNBDeadlineExceededError)
+async def deadline_exceeded_error_handler(request, exc: DNBDeadlineExceededError):
+    """Handle exhausted request budgets"""
+    return JSONResponse(
+        status_code=504,
+        content={
+            "error": {
+                "error_code": exc.error_code,
+                "message": exc.message,
+                "severity": "Error"
+            },
+            "timestamp": get_iso_timestamp()
+        }
+    )
+
+
 @app.exception_handler(DNBAPIError)
 async def api_error_handler(request, exc: DNBAPIError):
     """Handle general API errors"""
@@ -164,6 +213,7 @@ async def health_check():
 # Company search endpoint
 @app.get("/api/v1/companies/search", tags=["Companies"])
 async def search_companies(
+    response: Response,
     subject_name: str = Query(..., description="Company name to search for"),
     country_iso_code: str = Query("US", description="ISO Alpha-2 country code"),
     territory_name: str | None = Query(None, description="State/territory code"),
@@ -173,7 +223,9 @@ async def search_companies(
     Search for companies and retrieve D-U-N-S numbers
     
     This endpoint performs a company match/search operation to find D-U-N-S numbers
-    for companies matching the search criteria.
+    for companies matching the search criteria. Results are cached by canonical
+    name, so "Gorman Manufacturing Co., Inc." and "GORMAN MANUFACTURING COMPANY INC"
+    share one D&B call.
     
     **Example:**
     ```
@@ -187,6 +239,7 @@ async def search_companies(
             territory_name=territory_name,
             match_type=match_type
         )
+        response.headers[CACHE_HEADER] = cache_status()
         return result
     except DNBAPIError as e:
         raise
@@ -199,6 +252,7 @@ async def search_companies(
 @app.get("/api/v1/companies/{duns}/profile", tags=["Companies"])
 async def get_company_profile(
     duns: str,
+    response: Response,
     product_code: str = Query("DCP_STD", description="Product code (DCP_STD, DCP_PREM)")
 ):
     """
@@ -217,6 +271,7 @@ async def get_company_profile(
     """
     try:
         result = await dnb_client.get_company_profile(duns=duns, product_code=product_code)
+        response.headers[CACHE_HEADER] = cache_status()
         return result
     except DNBAPIError as e:
         raise
@@ -227,7 +282,7 @@ async def get_company_profile(
 
 # Financial statements endpoint
 @app.get("/api/v1/companies/{duns}/financials", tags=["Financials"])
-async def get_financial_statements(duns: str):
+async def get_financial_statements(duns: str, response: Response):
     """
     Get financial statements
     
@@ -240,6 +295,7 @@ async def get_financial_statements(duns: str):
     """
     try:
         result = await dnb_client.get_financial_statements(duns=duns)
+        response.headers[CACHE_HEADER] = cache_status()
         return result
     except DNBAPIError as e:
         raise
@@ -250,7 +306,7 @@ async def get_financial_statements(duns: str):
 
 # Analytics endpoint
 @app.get("/api/v1/companies/{duns}/analytics", tags=["Analytics"])
-async def get_analytics(duns: str):
+async def get_analytics(duns: str, response: Response):
     """
     Get predictive analytics and risk scores
     
@@ -263,6 +319,7 @@ async def get_analytics(duns: str):
     """
     try:
         result = await dnb_client.get_analytics(duns=duns)
+        response.headers[CACHE_HEADER] = cache_status()
         return result
     except DNBAPIError as e:
         raise
@@ -271,6 +328,54 @@ async def get_analytics(duns: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Batch enrichment endpoint
+@app.post("/api/v1/companies/batch", tags=["Companies"])
+async def enrich_companies(request: BatchEnrichmentRequest):
+    """
+    Fetch products for many D-U-N-S numbers in one request
+    
+    Streams NDJSON: one line per DUNS and product as it completes, with
+    `status` `ok` (and `cache`, `data`) or `error` (and `error`), then a
+    `summary` line. Repeated DUNS are fetched once; items share the product
+    cache and the D&B rate limit, and a failed item does not fail the batch.
+    
+    **Example:**
+    ```
+    POST /api/v1/companies/batch
+    {"duns": ["804735132"], "products": ["DCP_STD", "FINANCIALS", "ANALYTICS"]}
+    ```
+    """
+    from app.batch import plan_batch, stream_batch
+    
+    duns, products = plan_batch(request.duns, request.products)
+    return StreamingResponse(
+        stream_batch(duns, products, requested=len(request.duns)),
+        media_type="application/x-ndjson"
+    )
+
+
+# Service statistics
+@app.get("/api/v1/stats", tags=["Health"])
+async def get_stats():
+    """
+    Rate limiter, retry and product cache statistics for this worker
+    
+    Shows calls queued for a D&B rate limit slot, wait times, the host-wide
+    backlog, how many retries the retry budget has allowed or refused, and
+    product cache hits and misses.
+    """
+    from app.product_cache import get_product_cache
+    from app.rate_limit import get_rate_limiter
+    from app.retry import get_retry_budget
+    
+    budget = get_retry_budget()
+    return {
+        "rate_limit": await asyncio.to_thread(get_rate_limiter().snapshot),
+        "retry_budget": {"retries": budget.retries, "refused": budget.refused},
+        "product_cache": get_product_cache().snapshot()
+    }
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -223,6 +223,27 @@ class AnalyticsResponse(BaseModel):
     PredictiveIndicators: Optional[list[PredictiveIndicator]] = None
 
 
+# ============================================================================
+# Batch Enrichment Models
+# ============================================================================
+
+class BatchEnrichmentRequest(BaseModel):
+    """Request model for batch DUNS enrichment"""
+    duns: list[str] = Field(..., description="D-U-N-S numbers; repeats are fetched once")
+    products: list[str] = Field(
+        default=["DCP_STD"],
+        description="Products for every DUNS: profile product codes (DCP_STD, DCP_PREM), FINANCIALS, ANALYTICS"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "duns": ["804735132", "060902413"],
+                "products": ["DCP_STD", "FINANCIALS", "ANALYTICS"]
+            }
+        }
+
+
 # ============================================================================
 # Health Check Model
 # ============================================================================
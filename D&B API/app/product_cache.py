@@ -0,0 +1,292 @@
+"""
+Cache of D&B products by DUNS
+
+D&B bills per call, and company profiles, financial statements and analytics
+change slowly. ``ProductCache`` keeps each product fetched for a DUNS for a
+TTL chosen per product code (``settings.product_cache_ttls``; 0 turns
+caching off for a product). It is the only cache in front of D&B calls, so
+the product's TTL alone decides how fresh an entry is.
+
+- With ``redis_url`` set, entries live on a Redis-protocol server shared by
+  every worker on every host. Needs the ``redis`` package.
+- Otherwise they live in the host's shared SQLite cache (``shared_cache.py``),
+  where a miss is fetched by one worker while the host's others wait for it.
+- With that off too (``shared_cache_path`` of ``off``), each worker keeps its
+  own in-process cache of up to ``product_cache_max_entries`` entries.
+
+A cache failure never fails a request: the product is fetched from D&B
+instead, and an unreachable Redis is left alone for ``REDIS_RETRY_INTERVAL``
+seconds. ``cache_status()`` says whether the request's last lookup was a
+``HIT``, ``MISS`` or ``BYPASS``; the routes return it as ``X-Cache``.
+
+Company searches are cached the same way, as the ``MATCH`` product keyed by
+the search rather than a DUNS: country, territory, match type and canonical
+company name (see ``company_names.py``).
+
+Some products contain others: a premium profile (``DCP_PREM``) holds every
+field of the standard one (``DCP_STD``). ``SUBSUMED_BY`` lists, for a
+product, the products it can be projected from, so a standard profile is
+served from a cached premium one without calling D&B.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Product codes for the D&B calls that are not requested by product code
+FINANCIALS = "FINANCIALS"
+ANALYTICS = "ANALYTICS"
+# Company search results, keyed by country, territory, match type and canonical name
+MATCH = "MATCH"
+
+# Seconds to stop using Redis after it fails
+REDIS_RETRY_INTERVAL = 10.0
+
+HEADER = "X-Cache"
+
+# Organization fields of a standard company profile (DCP_STD)
+STANDARD_PROFILE_FIELDS = frozenset({
+    "DUNSNumber",
+    "OrganizationName",
+    "PrimaryAddress",
+    "Telecommunication",
+    "EmployeeQuantity",
+    "OperatingStatusText",
+    "StartDate",
+    "BusinessDescription"
+})
+
+
+def premium_to_standard(premium: Dict[str, Any]) -> Dict[str, Any]:
+    """A DCP_STD profile response from a DCP_PREM one: the premium-only fields dropped"""
+    response = premium["OrderProductResponse"]
+    detail = response["OrderProductResponseDetail"]
+    product = dict(detail["Product"])
+    product["Organization"] = {
+        field: value for field, value in product["Organization"].items() if field in STANDARD_PROFILE_FIELDS
+    }
+    if "DNBProductID" in product:
+        product["DNBProductID"] = "DCP_STD"
+    return {"OrderProductResponse": {**response, "OrderProductResponseDetail": {**detail, "Product": product}}}
+
+
+# Product -> the products that contain it, each with how to project it out of them
+SUBSUMED_BY: Dict[str, List[Tuple[str, Callable[[Dict[str, Any]], Dict[str, Any]]]]] = {
+    "DCP_STD": [("DCP_PREM", premium_to_standard)]
+}
+
+_status: ContextVar[Optional[str]] = ContextVar("product_cache_status", default=None)
+
+
+def cache_status() -> str:
+    """``HIT``, ``MISS`` or ``BYPASS`` for the current request's last product lookup"""
+    return _status.get() or "BYPASS"
+
+
+class MemoryBackend:
+    """Per-process entries with expiry, least recently used evicted first"""
+
+    name = "memory"
+    coalesces = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisBackend:
+    """Entries on a Redis-protocol server, expired by the server"""
+
+    name = "redis"
+    coalesces = False
+
+    def __init__(self, url: str, timeout: float):
+        import redis.asyncio as redis
+
+        self.redis = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.redis.get(key)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        # One round trip for a product and the products that contain it
+        return await self.redis.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.redis.set(key, value, ex=ttl)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class SharedBackend:
+    """Entries in the host's shared SQLite cache, seen by every worker on the host"""
+
+    name = "shared"
+    # Misses go through the cache's lease, so one worker on the host fetches each
+    coalesces = True
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.cache.get, key)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await asyncio.to_thread(lambda: [self.cache.get(key) for key in keys])
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await asyncio.to_thread(self.cache.set, key, value, ttl)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+        # Falls back to ``fetch`` itself when the database fails
+        return await self.cache.get_or_fetch(key, fetch, ttl)
+
+    async def close(self):
+        pass
+
+
+class ProductCache:
+    """D&B products by product code and DUNS, each product with its own TTL"""
+
+    def __init__(self, backend, ttls: Dict[str, int], default_ttl: int):
+        self.backend = backend
+        self.ttls = {code.upper(): ttl for code, ttl in ttls.items()}
+        self.default_ttl = default_ttl
+        self.stats = {"hits": 0, "projected": 0, "misses": 0, "bypassed": 0, "errors": 0}
+        self._down_until = 0.0
+
+    def ttl(self, product: str) -> int:
+        return self.ttls.get(product.upper(), self.default_ttl)
+
+    @staticmethod
+    def key(product: str, duns: str) -> str:
+        # ``duns`` is the search for MATCH. Mock and real D&B data never share a key
+        return f"dnb:{settings.upstream_namespace}:v{settings.dnb_api_version}:{product.upper()}:{duns}"
+
+    def _failed(self, action: str, error: Exception):
+        self.stats["errors"] += 1
+        self._down_until = time.monotonic() + REDIS_RETRY_INTERVAL
+        logger.warning(f"Product cache {action} failed, using D&B directly for {REDIS_RETRY_INTERVAL:.0f} s: {error}")
+
+    async def get(self, product: str, duns: str) -> Optional[Any]:
+        """The cached product, or ``None``; cache errors count as a miss"""
+        cached, _ = await self._lookup(product, duns)
+        return cached
+
+    async def _lookup(self, product: str, duns: str) -> Tuple[Optional[Any], bool]:
+        """The cached product, else its projection from a cached product containing it; and whether projected"""
+        if time.monotonic() < self._down_until:
+            return None, False
+        product = product.upper()
+        containers = SUBSUMED_BY.get(product, [])
+        try:
+            found = await self.backend.get_many(
+                [self.key(product, duns)] + [self.key(container, duns) for container, _ in containers]
+            )
+        except Exception as e:
+            self._failed("read", e)
+            return None, False
+        if found[0] is not None:
+            return json.loads(found[0]), False
+        for (container, project), cached in zip(containers, found[1:]):
+            if cached is None:
+                continue
+            try:
+                return project(json.loads(cached)), True
+            except (KeyError, TypeError, AttributeError) as e:
+                logger.warning(f"Cannot project {product} from cached {container} for {duns}: {e!r}")
+        return None, False
+
+    async def set(self, product: str, duns: str, value: Any):
+        ttl = self.ttl(product)
+        if ttl <= 0 or time.monotonic() < self._down_until:
+            return
+        try:
+            await self.backend.set(
+                self.key(product, duns), json.dumps(value, separators=(",", ":")).encode("utf-8"), ttl
+            )
+        except Exception as e:
+            self._failed("write", e)
+
+    async def get_or_fetch(self, product: str, duns: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached product, or fetch and cache it"""
+        if self.ttl(product) <= 0:
+            self.stats["bypassed"] += 1
+            _status.set("BYPASS")
+            return await fetch()
+
+        cached, projected = await self._lookup(product, duns)
+        if cached is not None:
+            self.stats["projected" if projected else "hits"] += 1
+            _status.set("HIT")
+            return cached
+
+        self.stats["misses"] += 1
+        _status.set("MISS")
+        if self.backend.coalesces and time.monotonic() >= self._down_until:
+            return await self.backend.get_or_fetch(self.key(product, duns), fetch, self.ttl(product))
+        value = await fetch()
+        await self.set(product, duns, value)
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": self.backend.name, "ttls": self.ttls, "default_ttl": self.default_ttl, **self.stats}
+
+
+_cache: Optional[ProductCache] = None
+
+
+def get_product_cache() -> ProductCache:
+    """The product cache: on Redis when ``redis_url`` is set, else in the host's shared cache, else in this process"""
+    global _cache
+    if _cache is None:
+        from app.shared_cache import get_shared_cache
+
+        shared = get_shared_cache()
+        if settings.redis_url:
+            backend = RedisBackend(settings.redis_url, settings.product_cache_timeout)
+        elif shared is not None:
+            backend = SharedBackend(shared)
+        else:
+            backend = MemoryBackend(settings.product_cache_max_entries)
+        _cache = ProductCache(backend, settings.product_cache_ttls, settings.product_cache_ttl)
+    return _cache
+
+
+async def close_product_cache():
+    """Close the cache's Redis connections (app shutdown)"""
+    global _cache
+    if _cache is not None:
+        await _cache.backend.close()
+        _cache = None
@@ -0,0 +1,184 @@
+"""
+D&B request rate limit shared by all workers on the host
+
+``settings.rate_limit_qps`` is D&B's ceiling for the account. Before each
+call to D&B, ``RateLimiter.acquire`` books the next free slot in a schedule
+kept in a small SQLite database (WAL mode), so every worker on the host books
+from the same schedule. A call over the ceiling waits for its slot instead of
+drawing a 429. Up to ``rate_limit_burst`` calls may go at once after a quiet
+spell. The schedule is the generic cell rate algorithm (GCRA): one
+"theoretical arrival time" per limit, moved on by ``1 / qps`` per call.
+
+A call only books a slot it can wait for: at most ``rate_limit_max_wait``
+seconds and never past the request's budget (``deadline.py``). Otherwise it
+fails at once, with a 429 (RL001) or a 504 (DL001) when the budget is what
+ran out. A 429 from D&B pauses the schedule for its ``Retry-After``.
+
+A ``rate_limit_path`` of ``off`` keeps the schedule per worker. Counts of
+queued calls and wait times are in ``/api/v1/stats``.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.exceptions import DNBDeadlineExceededError, DNBRateLimitError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS limits (
+    name TEXT PRIMARY KEY,
+    tat REAL NOT NULL
+);
+"""
+
+
+class RateLimiter:
+    """Books calls onto a schedule of at most ``qps`` per second, with bursts of ``burst``"""
+
+    def __init__(self, qps: float, burst: int, path: Optional[str] = None, name: str = "dnb"):
+        self.interval = 1.0 / qps
+        # How far ahead of the schedule a call may go, which is what allows a burst
+        self.tolerance = (max(burst, 1) - 1) * self.interval
+        self.path = path
+        self.name = name
+        self._tat = 0.0
+        self._local = threading.local()
+        self.queued = 0
+        self.stats: Dict[str, Any] = {
+            "acquired": 0, "waited": 0, "rejected": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0
+        }
+        if path is not None:
+            conn = self._conn()
+            conn.executescript(SCHEMA)
+            conn.execute("INSERT OR IGNORE INTO limits (name, tat) VALUES (?, 0)", (name,))
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; transactions are managed explicitly"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _schedule(self, tat: float, now: float, max_wait: float) -> Tuple[float, float, bool]:
+        """The new arrival time, the wait and whether the call may book it"""
+        tat = max(tat, now)
+        wait = max(0.0, tat - self.tolerance - now)
+        if wait > max_wait:
+            return tat, wait, False
+        return tat + self.interval, wait, True
+
+    def _book_shared(self, now: float, max_wait: float) -> Tuple[float, bool]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tat = conn.execute("SELECT tat FROM limits WHERE name = ?", (self.name,)).fetchone()[0]
+            tat, wait, booked = self._schedule(tat, now, max_wait)
+            if booked:
+                conn.execute("UPDATE limits SET tat = ? WHERE name = ?", (tat, self.name))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait, booked
+
+    def book(self, max_wait: float) -> Tuple[float, bool]:
+        """Book the next free slot if it is at most ``max_wait`` away; returns (seconds until it, booked)"""
+        now = time.time()
+        if self.path is not None:
+            try:
+                return self._book_shared(now, max_wait)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared rate limit unavailable, limiting this worker only: {e}")
+        self._tat, wait, booked = self._schedule(self._tat, now, max_wait)
+        return wait, booked
+
+    def pause(self, seconds: float):
+        """
+        Book nothing for ``seconds``, e.g. after D&B answered 429
+
+        Writes the shared schedule, so async callers run it with
+        ``asyncio.to_thread`` when ``path`` is set, as ``acquire`` does.
+        """
+        tat = time.time() + seconds + self.tolerance
+        self._tat = max(self._tat, tat)
+        if self.path is not None:
+            try:
+                self._conn().execute("UPDATE limits SET tat = MAX(tat, ?) WHERE name = ?", (tat, self.name))
+            except sqlite3.Error as e:
+                logger.warning(f"Could not pause the shared rate limit: {e}")
+
+    async def acquire(self):
+        """Wait for a slot under the rate limit, or fail if none is free in time"""
+        from app import deadline
+
+        left = deadline.remaining()
+        max_wait = settings.rate_limit_max_wait if left is None else min(left, settings.rate_limit_max_wait)
+        if self.path is None:
+            wait, booked = self.book(max_wait)
+        else:
+            wait, booked = await asyncio.to_thread(self.book, max_wait)
+        if not booked:
+            self.stats["rejected"] += 1
+            if left is not None and left < settings.rate_limit_max_wait:
+                raise DNBDeadlineExceededError(
+                    f"Request budget exhausted: next D&B rate limit slot is {wait:.1f} s away"
+                )
+            raise DNBRateLimitError(f"D&B rate limit queue is full: next slot is {wait:.1f} s away", wait)
+
+        self.stats["acquired"] += 1
+        if wait > 0:
+            self.stats["waited"] += 1
+            self.stats["wait_seconds_total"] += wait
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], wait)
+            self.queued += 1
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.queued -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Limits, this worker's queue and wait times, and the host-wide backlog"""
+        tat = self._tat
+        if self.path is not None:
+            try:
+                tat = self._conn().execute("SELECT tat FROM limits WHERE name = ?", (self.name,)).fetchone()[0]
+            except sqlite3.Error:
+                pass
+        waited = self.stats["waited"]
+        return {
+            "qps": round(1.0 / self.interval, 3),
+            "burst": round(self.tolerance / self.interval) + 1,
+            "shared": self.path is not None,
+            "queued": self.queued,
+            # Seconds until a call made now would go
+            "backlog_seconds": round(max(0.0, tat - self.tolerance - time.time()), 3),
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats.items()},
+            "wait_seconds_avg": round(self.stats["wait_seconds_total"] / waited, 3) if waited else 0.0,
+        }
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The D&B rate limiter (shared by the host's workers unless ``rate_limit_path`` is ``off``)"""
+    global _limiter
+    if _limiter is None:
+        path = settings.rate_limit_path
+        if path.lower() in ("", "off", "false", "none"):
+            path = None
+        # Mock calls keep a schedule of their own, so they never spend the real D&B's
+        _limiter = RateLimiter(
+            settings.rate_limit_qps, settings.rate_limit_burst or settings.rate_limit_qps, path,
+            name=f"dnb:{settings.upstream_namespace}"
+        )
+    return _limiter
@@ -0,0 +1,546 @@
+"""
+Synthetic D&B for mock mode
+
+``SyntheticDNB`` makes up a company for any DUNS: name, address, size,
+five years of financial statements and risk scores, all derived from one
+another (a premium profile's revenue is the latest year's in the financials,
+analytics follow margins, leverage and growth). Everything is a function of
+``mock_seed`` and the DUNS, so a DUNS always gets the same company, and
+generating a record costs microseconds: a company's draws are words of one
+SHAKE-128 digest instead of calls to a seeded random number generator, and
+the last few thousand companies are kept for their other products.
+
+In mock mode (``use_mock_data``) the pooled HTTP client (``http_pool.py``)
+sends D&B requests to ``MockDNB`` instead of the network, so mock requests go
+through the same caches, rate limiter and retries as real ones. ``MockDNB``
+adds what D&B does under load, configured through ``settings.mock_*``:
+latency drawn from a distribution, 503s, 429s (at random, and above a QPS
+ceiling) and DUNS that do not exist.
+
+Search candidates are named after the query; their profiles are generated
+from their DUNS like any other. 804735132 is Gorman Manufacturing, D&B's
+test company.
+
+Generate records in bulk, e.g. to check generation speed::
+
+    python -m app.synthetic --count 1000000 --out companies.ndjson
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import random
+import re
+import struct
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+LATEST_FISCAL_YEAR = 2024
+SCORE_DATE = "2025-03-31"
+# Operating margin in each fiscal year relative to the company's own, latest first
+MARGIN_DRIFT = (1.0, 0.94, 1.07, 0.97, 1.04)
+
+NAME_PREFIXES = [
+    "ATLAS", "BEACON", "CEDAR", "CRESCENT", "DELTA", "ECHO", "EVERGREEN", "FALCON", "GRANITE", "HARBOR",
+    "HORIZON", "IRONWOOD", "JUNIPER", "KEYSTONE", "LIBERTY", "MERIDIAN", "NORTHWIND", "OAKRIDGE", "PINNACLE",
+    "QUANTUM", "REDWOOD", "SILVERLINE", "SUMMIT", "TRIDENT", "UNION", "VANGUARD", "WESTFIELD", "ZENITH",
+    "ALPINE", "BRIGHTWATER", "COPPERFIELD", "DOVER", "EASTGATE", "FAIRVIEW", "GOLDCREST", "HIGHLAND",
+]
+NAME_MIDDLES = [
+    "RIVER", "STAR", "BRIDGE", "NORTH", "SOUTH", "WEST", "EAST", "STONE", "OAK", "PINE", "BLUE", "GREEN",
+    "GOLDEN", "ROYAL", "UNITED", "GLOBAL", "NATIONAL", "CITY", "COUNTY", "VALLEY", "LAKE", "COAST", "PEAK",
+    "FIRST", "PREMIER", "ADVANCED", "INTEGRATED", "PRECISION", "STANDARD", "CONTINENTAL", "METRO", "BAY",
+]
+NAME_CORES = [
+    "MANUFACTURING", "LOGISTICS", "HOLDINGS", "SYSTEMS", "FOODS", "ENGINEERING", "TECHNOLOGIES", "SUPPLY",
+    "CONSTRUCTION", "ENERGY", "PHARMACEUTICALS", "FREIGHT", "RETAIL", "CAPITAL", "MEDIA", "HEALTHCARE",
+    "MATERIALS", "ELECTRONICS", "PACKAGING", "AGRICULTURE", "CONSULTING", "INDUSTRIES", "TEXTILES", "MARINE",
+]
+LEGAL_FORMS = {"US": ["INC.", "CORP.", "LLC", "CO.", "COMPANY, INC."], "GB": ["LIMITED", "LTD", "PLC", "LLP"]}
+STREETS = ["MARKET ST", "HIGH ST", "MAIN ST", "KING ST", "STATION RD", "PARK AVE", "CHURCH LN", "MILL RD",
+           "OAK AVE", "BRIDGE ST", "WATER ST", "VICTORIA RD", "ELM ST", "COMMERCE DR", "INDUSTRIAL WAY"]
+TOWNS = {
+    "US": [("SAN FRANCISCO", "CA", "941"), ("CHICAGO", "IL", "606"), ("NEW YORK", "NY", "100"),
+           ("AUSTIN", "TX", "787"), ("SEATTLE", "WA", "981"), ("BOSTON", "MA", "021"), ("DENVER", "CO", "802"),
+           ("ATLANTA", "GA", "303"), ("MIAMI", "FL", "331"), ("COLUMBUS", "OH", "432")],
+    "GB": [("LONDON", None, "EC1"), ("MANCHESTER", None, "M1"), ("BIRMINGHAM", None, "B1"),
+           ("LEEDS", None, "LS1"), ("BRISTOL", None, "BS1"), ("GLASGOW", None, "G1"), ("CARDIFF", None, "CF1")],
+}
+CURRENCIES = {"US": "USD", "GB": "GBP"}
+# Business description and industry risk by the name's core word
+INDUSTRIES = {
+    "MANUFACTURING": ("Manufacturer of precision metal components and assemblies.", "Medium"),
+    "LOGISTICS": ("Provider of freight forwarding and warehousing services.", "Medium"),
+    "HOLDINGS": ("Holding company with interests in industrial and service businesses.", "Low"),
+    "SYSTEMS": ("Developer of enterprise software and IT systems.", "Medium"),
+    "FOODS": ("Producer and distributor of packaged foods.", "Low"),
+    "ENGINEERING": ("Provider of civil and mechanical engineering services.", "Medium"),
+    "TECHNOLOGIES": ("Developer of technology products and services.", "High"),
+    "SUPPLY": ("Wholesale distributor of industrial supplies.", "Medium"),
+    "CONSTRUCTION": ("General contractor for commercial construction.", "High"),
+    "ENERGY": ("Producer and supplier of energy.", "High"),
+    "PHARMACEUTICALS": ("Developer and manufacturer of pharmaceutical products.", "Medium"),
+    "FREIGHT": ("Provider of road and rail freight services.", "Medium"),
+    "RETAIL": ("Operator of retail stores.", "High"),
+    "CAPITAL": ("Provider of commercial finance and leasing.", "High"),
+    "MEDIA": ("Publisher and broadcaster of media content.", "High"),
+    "HEALTHCARE": ("Provider of healthcare services.", "Low"),
+    "MATERIALS": ("Producer of construction and industrial materials.", "Medium"),
+    "ELECTRONICS": ("Manufacturer of electronic components.", "Medium"),
+    "PACKAGING": ("Manufacturer of packaging products.", "Low"),
+    "AGRICULTURE": ("Grower and distributor of agricultural products.", "Medium"),
+    "CONSULTING": ("Provider of management consulting services.", "Low"),
+    "INDUSTRIES": ("Diversified industrial manufacturer.", "Medium"),
+    "TEXTILES": ("Manufacturer of textiles and apparel.", "High"),
+    "MARINE": ("Provider of marine transport and services.", "High"),
+}
+EXCHANGES = {"US": ["NASDAQ", "NYSE"], "GB": ["LSE"]}
+
+# D&B's test company, as in the D&B Direct 2.0 documentation
+KNOWN = {
+    "804735132": {
+        "name": "GORMAN MANUFACTURING COMPANY, INC.", "street": "492 KOLLER ST", "town": "SAN FRANCISCO",
+        "territory": "CA", "postcode": "94110", "country": "US", "phone": "4155551234", "core": "MANUFACTURING"
+    }
+}
+
+
+def _draws(seed: int, kind: str, key: str) -> Callable[[], float]:
+    """Up to 40 deterministic uniform draws in [0, 1): 32-bit words of a SHAKE-128 digest"""
+    digest = hashlib.shake_128(f"{seed}|{kind}|{key}".encode()).digest(160)
+    return iter([word * 2.3283064365386963e-10 for word in struct.unpack(">40I", digest)]).__next__
+
+
+# Transaction IDs are unique per process without the cost of a uuid4 per record
+_TRANSACTION_PREFIX = "%08x-%04x-4%03x-%04x-" % (
+    random.getrandbits(32), random.getrandbits(16), random.getrandbits(12), random.getrandbits(16) | 0x8000
+)
+_transaction_numbers = itertools.count()
+_timestamp: Tuple[int, str] = (0, "")
+
+
+def _transaction() -> Dict[str, str]:
+    global _timestamp
+    now = int(time.time())
+    if _timestamp[0] != now:
+        _timestamp = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+    return {
+        "ApplicationTransactionID": "REST",
+        "ServiceTransactionID": f"{_TRANSACTION_PREFIX}{next(_transaction_numbers) % (1 << 48):012x}",
+        "TransactionTimestamp": _timestamp[1]
+    }
+
+
+def _success() -> Dict[str, str]:
+    return {"ResultID": "CM000", "ResultText": "Success"}
+
+
+def _risk_level(score: float, low: float, high: float) -> str:
+    """Risk level for a score where higher is safer, ``low`` and ``high`` bounding the middle band"""
+    if score >= high:
+        return "Low"
+    if score >= (low + high) / 2:
+        return "Low-Medium"
+    if score >= low:
+        return "Medium"
+    return "High"
+
+
+@lru_cache(maxsize=4096)
+def _company(seed: int, duns: str) -> Dict[str, Any]:
+    u = _draws(seed, "company", duns)
+    known = KNOWN.get(duns)
+    country = known["country"] if known else ("US" if u() < 0.7 else "GB")
+    core = known["core"] if known else NAME_CORES[int(u() * len(NAME_CORES))]
+    towns = TOWNS[country]
+    town, territory, postcode = towns[int(u() * len(towns))]
+    forms = LEGAL_FORMS[country]
+    revenue = 10 ** (5.5 + 4 * u())
+    company = {
+        "duns": duns,
+        "country": country,
+        "core": core,
+        "name": (f"{NAME_PREFIXES[int(u() * len(NAME_PREFIXES))]} {NAME_MIDDLES[int(u() * len(NAME_MIDDLES))]} "
+                 f"{core} {forms[int(u() * len(forms))]}"),
+        "street": f"{int(u() * 999) + 1} {STREETS[int(u() * len(STREETS))]}",
+        "town": town,
+        "territory": territory,
+        "postcode": f"{postcode}{int(u() * 100):02d}" if country == "US" else f"{postcode} {int(u() * 9) + 1}AB",
+        "phone": f"{int(u() * 800) + 200}{int(u() * 10000000):07d}",
+        "start_date": f"{1900 + int(u() * (LATEST_FISCAL_YEAR - 1902))}-{int(u() * 12) + 1:02d}-01",
+        "revenue": revenue,
+        "employees": max(1, int(revenue / (80e3 + 320e3 * u()))),
+        "gross_margin": 0.15 + 0.45 * u(),
+        "operating_margin": -0.08 + 0.33 * u(),
+        "asset_turnover": 0.6 + 1.9 * u(),
+        "leverage": 0.15 + 0.7 * u(),
+        "growth": (-0.12 + 0.37 * u(), -0.12 + 0.37 * u(), -0.12 + 0.37 * u(), -0.12 + 0.37 * u()),
+        "listed": revenue > 5e8 and u() < 1 / 3,
+        "exchange": EXCHANGES[country][int(u() * len(EXCHANGES[country]))],
+        "status": "Active" if u() >= 0.02 else "Out of Business",
+    }
+    if known:
+        company.update({k: v for k, v in known.items() if k != "core"})
+    return company
+
+
+class SyntheticDNB:
+    """Deterministic, internally consistent D&B records for any DUNS"""
+
+    def __init__(self, seed: int = 0, not_found_rate: float = 0.0):
+        self.seed = seed
+        self.not_found_rate = not_found_rate
+
+    def exists(self, duns: str) -> bool:
+        """Whether the DUNS is a company (``not_found_rate`` of them are not)"""
+        if not (duns.isdigit() and len(duns) == 9):
+            return False
+        if duns in KNOWN or not self.not_found_rate:
+            return True
+        return _draws(self.seed, "exists", duns)() >= self.not_found_rate
+
+    def company(self, duns: str) -> Dict[str, Any]:
+        """The facts every record for the DUNS is built from (shared: do not modify)"""
+        return _company(self.seed, duns)
+
+    def _organization(self, company: Dict[str, Any]) -> Dict[str, Any]:
+        address = {
+            "StreetAddressLine": [{"LineText": company["street"]}],
+            "PrimaryTownName": company["town"],
+            "CountryISOAlpha2Code": company["country"],
+            "PostalCode": company["postcode"],
+        }
+        if company["territory"]:
+            address["TerritoryAbbreviatedName"] = company["territory"]
+        return {
+            "DUNSNumber": company["duns"],
+            "OrganizationName": {"OrganizationPrimaryName": [{"OrganizationName": company["name"]}]},
+            "PrimaryAddress": address,
+        }
+
+    def _statements(self, company: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Five fiscal years, latest first"""
+        # Amounts to the cent as round(x * 100) / 100: round(x, 2) costs several times more
+        statements = []
+        currency = CURRENCIES[company["country"]]
+        revenue = company["revenue"]
+        gross_margin = company["gross_margin"]
+        operating_margin = company["operating_margin"]
+        asset_turnover = company["asset_turnover"]
+        leverage = company["leverage"]
+        for age in range(5):
+            operating = revenue * operating_margin * MARGIN_DRIFT[age]
+            assets = revenue / asset_turnover
+            liabilities = assets * leverage
+            year = LATEST_FISCAL_YEAR - age
+            statements.append({
+                "StatementDate": f"{year}-12-31",
+                "Currency": currency,
+                "FiscalYear": year,
+                "BalanceSheet": {
+                    "TotalAssets": round(assets * 100) / 100,
+                    "TotalLiabilities": round(liabilities * 100) / 100,
+                    "NetWorth": round((assets - liabilities) * 100) / 100,
+                    "CurrentAssets": round(assets * 0.45 * 100) / 100,
+                    "CurrentLiabilities": round(liabilities * 0.4 * 100) / 100
+                },
+                "IncomeStatement": {
+                    "Revenue": round(revenue * 100) / 100,
+                    "GrossProfit": round(revenue * gross_margin * 100) / 100,
+                    "OperatingIncome": round(operating * 100) / 100,
+                    "NetIncome": round(operating * 0.75 * 100) / 100,
+                    "EBITDA": round((operating + assets * 0.05) * 100) / 100
+                }
+            })
+            if age < 4:
+                revenue /= 1 + company["growth"][age]
+        return statements
+
+    def profile(self, duns: str, product_code: str = "DCP_STD") -> Dict[str, Any]:
+        """Company profile response; DCP_PREM adds revenue, listing and the latest financial summary"""
+        company = self.company(duns)
+        organization = self._organization(company)
+        organization.update({
+            "Telecommunication": [{"TelecommunicationNumber": company["phone"],
+                                   "TelecommunicationNumberType": "Telephone"}],
+            "EmployeeQuantity": company["employees"],
+            "BusinessDescription": INDUSTRIES[company["core"]][0],
+            "OperatingStatusText": company["status"],
+            "StartDate": company["start_date"],
+        })
+        if product_code.upper() == "DCP_PREM":
+            latest = self._statements(company)[0]
+            organization["SalesRevenueAmount"] = latest["IncomeStatement"]["Revenue"]
+            if company["listed"]:
+                organization["StockExchangeDetails"] = {
+                    "StockExchangeName": company["exchange"],
+                    "StockTickerSymbol": company["name"].replace(" ", "")[:4]
+                }
+            organization["FinancialStatement"] = [{
+                "StatementDate": latest["StatementDate"],
+                "Currency": latest["Currency"],
+                "Revenue": latest["IncomeStatement"]["Revenue"],
+                "NetIncome": latest["IncomeStatement"]["NetIncome"],
+                "TotalAssets": latest["BalanceSheet"]["TotalAssets"]
+            }]
+        return {"OrderProductResponse": {
+            "TransactionDetail": _transaction(),
+            "TransactionResult": _success(),
+            "OrderProductResponseDetail": {"InquiryDetail": {"DUNSNumber": duns},
+                                           "Product": {"Organization": organization}}
+        }}
+
+    def financials(self, duns: str) -> Dict[str, Any]:
+        """Financial statements response"""
+        return {"TransactionDetail": _transaction(), "TransactionResult": _success(), "DUNSNumber": duns,
+                "FinancialStatements": self._statements(self.company(duns))}
+
+    def analytics(self, duns: str) -> Dict[str, Any]:
+        """Risk scores and predictive indicators, following margins, leverage and growth"""
+        company = self.company(duns)
+        growth = company["growth"][0]
+        # 0 (distressed) to 1 (healthy)
+        health = min(1.0, max(0.0, 0.5 + company["operating_margin"] * 2 - (company["leverage"] - 0.5) + growth))
+        if company["status"] != "Active":
+            health = 0.0
+        credit = max(1, min(100, round(health * 99) + 1))
+        stress = round(1001 + health * 874)
+        delinquency = max(1, min(100, round(health * 90 + 5)))
+        return {
+            "TransactionDetail": _transaction(),
+            "TransactionResult": _success(),
+            "DUNSNumber": duns,
+            "RiskScores": [
+                {"ScoreType": "Commercial Credit Score", "ScoreValue": credit, "ScoreDate": SCORE_DATE,
+                 "RiskLevel": _risk_level(credit, 40, 80),
+                 "ScoreDescription": "Score ranges from 1-100, with higher scores indicating lower risk"},
+                {"ScoreType": "Financial Stress Score", "ScoreValue": stress, "ScoreDate": SCORE_DATE,
+                 "RiskLevel": _risk_level(stress, 1300, 1600),
+                 "ScoreDescription": "Score ranges from 1001-1875, with higher scores indicating lower financial stress"},
+                {"ScoreType": "Delinquency Score", "ScoreValue": delinquency, "ScoreDate": SCORE_DATE,
+                 "RiskLevel": _risk_level(delinquency, 40, 80),
+                 "ScoreDescription": "Probability of severe delinquency in next 12 months"},
+            ],
+            "PredictiveIndicators": [
+                {"IndicatorType": "Payment Trend",
+                 "IndicatorValue": "Improving" if health > 0.7 else "Stable" if health > 0.35 else "Deteriorating",
+                 "IndicatorDescription": "Payment behavior over the past 12 months"},
+                {"IndicatorType": "Industry Risk", "IndicatorValue": INDUSTRIES[company["core"]][1],
+                 "IndicatorDescription": "Volatility of the company's industry"},
+                {"IndicatorType": "Growth Indicator", "IndicatorValue": round(growth * 1000) / 10,
+                 "IndicatorDescription": "Year-over-year revenue growth percentage"},
+            ]
+        }
+
+    def match(self, name: str, country: str = "US", territory: Optional[str] = None) -> Dict[str, Any]:
+        """Company search response: one to five candidates, the best named after the query"""
+        from app.company_names import canonical_company_name
+
+        u = _draws(self.seed, "match", f"{country.upper()}|{canonical_company_name(name)}")
+        if "GORMAN" in name.upper():
+            candidates = ["804735132"]
+        else:
+            candidates = []
+        while len(candidates) < 1 + int(u() * 5):
+            candidates.append(f"{int(u() * 900000000) + 100000000}")
+        results = []
+        for rank, duns in enumerate(candidates):
+            organization = self._organization(self.company(duns))
+            if rank == 0 and duns not in KNOWN:
+                organization["OrganizationName"]["OrganizationPrimaryName"][0]["OrganizationName"] = name.upper()
+            confidence = max(10 - rank * 2 - int(u() * 2), 1)
+            grade = "A" if confidence >= 8 else "B" if confidence >= 5 else "C"
+            organization["MatchQualityInformation"] = {"ConfidenceCode": confidence, "MatchGradeText": grade}
+            results.append({"Organization": organization, "MatchGrade": grade, "ConfidenceCode": confidence})
+        return {"MatchResponse": {"TransactionDetail": _transaction(), "TransactionResult": _success(),
+                                  "MatchCandidate": results}}
+
+
+class LatencyDistribution:
+    """
+    Latency in milliseconds from a spec ``kind:arg[:arg]`` (as in the perf stand-ins)
+
+    ``fixed:50``, ``uniform:20:120``, ``normal:80:15``, ``lognormal:900:0.4``
+    (median and sigma) or ``exp:60`` (mean); empty for none.
+    """
+
+    ARGS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+
+    def __init__(self, spec: str):
+        kind, *args = (spec or "fixed:0").split(":")
+        if kind not in self.ARGS or len(args) != self.ARGS[kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.kind = kind
+        self.args = [float(arg) for arg in args]
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency in seconds"""
+        a, b = (self.args + [0.0])[:2]
+        if self.kind == "fixed":
+            ms = a
+        elif self.kind == "uniform":
+            ms = rng.uniform(a, b)
+        elif self.kind == "normal":
+            ms = rng.gauss(a, b)
+        elif self.kind == "lognormal":
+            ms = rng.lognormvariate(math.log(max(a, 1e-3)), b)
+        else:
+            ms = rng.expovariate(1.0 / a) if a > 0 else 0.0
+        return max(ms, 0.0) / 1000.0
+
+
+ROUTES = [
+    (re.compile(r"^/V[^/]+/organizations$"), "match"),
+    (re.compile(r"^/V[^/]+/organizations/([^/]+)/products/([^/]+)$"), "profile"),
+    (re.compile(r"^/V[^/]+/organizations/([^/]+)/financials$"), "financials"),
+    (re.compile(r"^/V[^/]+/organizations/([^/]+)/analytics$"), "analytics"),
+]
+
+
+class MockDNB:
+    """Answers D&B requests from ``SyntheticDNB``, with latency, errors and 429s like the real service"""
+
+    def __init__(
+        self,
+        generator: SyntheticDNB,
+        latency: LatencyDistribution,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        qps: int = 0,
+        seed: Optional[int] = None
+    ):
+        self.generator = generator
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.qps = qps
+        self.rng = random.Random(seed)
+        self._calls: Deque[float] = deque()
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "not_found": 0}
+
+    def _over_qps(self) -> bool:
+        if not self.qps:
+            return False
+        now = time.monotonic()
+        while self._calls and now - self._calls[0] >= 1.0:
+            self._calls.popleft()
+        if len(self._calls) >= self.qps:
+            return True
+        self._calls.append(now)
+        return False
+
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        """Status and body for a D&B GET, without the injected misbehaviour"""
+        for pattern, kind in ROUTES:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if kind == "match":
+                return 200, self.generator.match(
+                    params.get("SubjectName", ""), params.get("CountryISOAlpha2Code", "US"), params.get("TerritoryName")
+                )
+            duns = match.group(1)
+            if not self.generator.exists(duns):
+                self.stats["not_found"] += 1
+                return 404, {"error": "DUNS not found"}
+            if kind == "profile":
+                return 200, self.generator.profile(duns, match.group(2))
+            return 200, getattr(self.generator, kind)(duns)
+        return 404, {"error": "Unknown endpoint"}
+
+    async def handle(self, request) -> Any:
+        """``httpx.MockTransport`` handler"""
+        import httpx
+
+        self.stats["requests"] += 1
+        if self._over_qps() or (self.throttle_rate and self.rng.random() < self.throttle_rate):
+            self.stats["throttled"] += 1
+            return httpx.Response(429, json={"error": "Too Many Requests"}, headers={"Retry-After": "1"})
+        await asyncio.sleep(self.latency.sample(self.rng))
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return httpx.Response(503, json={"error": "Injected upstream failure"})
+        status, body = self.respond(request.url.path, dict(request.url.params))
+        return httpx.Response(status, json=body)
+
+
+_generator: Optional[SyntheticDNB] = None
+_mock: Optional[MockDNB] = None
+
+
+def get_generator() -> SyntheticDNB:
+    """The synthetic D&B data generator for ``settings.mock_seed``"""
+    global _generator
+    if _generator is None:
+        _generator = SyntheticDNB(settings.mock_seed, settings.mock_not_found_rate)
+    return _generator
+
+
+def get_mock_dnb() -> MockDNB:
+    """The in-process D&B that mock mode sends requests to"""
+    global _mock
+    if _mock is None:
+        _mock = MockDNB(
+            get_generator(),
+            LatencyDistribution(settings.mock_latency),
+            error_rate=settings.mock_error_rate,
+            throttle_rate=settings.mock_throttle_rate,
+            qps=settings.mock_qps,
+            seed=settings.mock_seed
+        )
+    return _mock
+
+
+def mock_transport():
+    """An httpx transport answering D&B requests from ``MockDNB``"""
+    import httpx
+
+    return httpx.MockTransport(get_mock_dnb().handle)
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Generate synthetic D&B records")
+    parser.add_argument("--count", type=int, default=100000, help="number of DUNS")
+    parser.add_argument("--start", type=int, default=100000000, help="first DUNS")
+    parser.add_argument("--products", default="DCP_PREM,FINANCIALS,ANALYTICS",
+                        help="comma-separated: DCP_STD, DCP_PREM, FINANCIALS, ANALYTICS")
+    parser.add_argument("--seed", type=int, default=settings.mock_seed)
+    parser.add_argument("--out", help="write NDJSON here (default: generate only, to time it)")
+    args = parser.parse_args()
+
+    generator = SyntheticDNB(args.seed)
+    products = [p.strip().upper() for p in args.products.split(",") if p.strip()]
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    started = time.perf_counter()
+    records = 0
+    try:
+        for number in range(args.start, args.start + args.count):
+            duns = f"{number:09d}"
+            for product in products:
+                if product == "FINANCIALS":
+                    record = generator.financials(duns)
+                elif product == "ANALYTICS":
+                    record = generator.analytics(duns)
+                else:
+                    record = generator.profile(duns, product)
+                if out is not None:
+                    out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                records += 1
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(f"{records} records in {elapsed:.1f} s ({records / elapsed:,.0f} records/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Host-local D&B token store shared by all workers
+
+Without it every worker process authenticates on its own, and failed
+attempts from several workers add up toward D&B's account lockout. The
+store keeps one token, its expiry and a host-wide count of consecutive
+rejected attempts in a small SQLite database (WAL mode). The count lapses
+once no attempt has been rejected for ``auth_failure_cooldown`` seconds. A worker that needs a
+new token takes the refresh lock; the others wait for it and then use the
+token it saved.
+
+Configured through ``settings.token_store_path``; a path of ``off`` keeps
+tokens per process. The file holds a live credential. By default it lives in
+a directory of the temp dir that only the service's user can open. It is
+created readable by its owner only, before SQLite opens it, so the ``-wal``
+and ``-shm`` files SQLite adds get the same mode. A file, or a directory,
+belonging to another user is refused, and tokens are then kept per process.
+"""
+
+import logging
+import os
+import sqlite3
+import stat
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS token (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    account TEXT,
+    token TEXT,
+    expires_at REAL,
+    failed_attempts INTEGER NOT NULL DEFAULT 0,
+    last_failed_at REAL,
+    lock_owner TEXT,
+    lock_expires_at REAL
+);
+INSERT OR IGNORE INTO token (id) VALUES (1);
+"""
+
+
+class TokenStore:
+    """The current token and refresh lock, shared by every worker on the host"""
+
+    def __init__(self, path: str, failure_cooldown: float):
+        self.path = path
+        self.failure_cooldown = failure_cooldown
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        _prepare(path)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        # Stores created before failures lapsed: their count has no time, so it lapses now
+        if not any(row[1] == "last_failed_at" for row in conn.execute("PRAGMA table_info(token)")):
+            conn.execute("ALTER TABLE token ADD COLUMN last_failed_at REAL")
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; transactions are managed explicitly"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def read(self, account: str) -> Tuple[Optional[str], Optional[float], int]:
+        """The stored token for ``account``, its expiry (epoch seconds) and the failed attempt count"""
+        stored_account, token, expires_at, failed_attempts = self._conn().execute(
+            "SELECT account, token, expires_at, "
+            "CASE WHEN last_failed_at > ? THEN failed_attempts ELSE 0 END FROM token WHERE id = 1",
+            (time.time() - self.failure_cooldown,)
+        ).fetchone()
+        if stored_account != account:
+            return None, None, failed_attempts
+        return token, expires_at, failed_attempts
+
+    def try_lock(self, timeout: float) -> bool:
+        """Claim the right to refresh; fails while another worker's lock is live"""
+        now = time.time()
+        cursor = self._conn().execute(
+            "UPDATE token SET lock_owner = ?, lock_expires_at = ? "
+            "WHERE id = 1 AND (lock_owner IS NULL OR lock_owner = ? OR lock_expires_at <= ?)",
+            (self.owner, now + timeout, self.owner, now)
+        )
+        return cursor.rowcount == 1
+
+    def save(self, account: str, token: str, expires_at: float) -> None:
+        """Store a new token, clear the failure count and release the lock"""
+        self._conn().execute(
+            "UPDATE token SET account = ?, token = ?, expires_at = ?, failed_attempts = 0, "
+            "lock_owner = NULL, lock_expires_at = NULL WHERE id = 1",
+            (account, token, expires_at)
+        )
+
+    def record_failure(self) -> int:
+        """Count a rejected attempt and release the lock; returns the new count"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE token SET failed_attempts = "
+                "CASE WHEN last_failed_at > ? THEN failed_attempts + 1 ELSE 1 END, "
+                "last_failed_at = ?, lock_owner = NULL, lock_expires_at = NULL WHERE id = 1",
+                (now - self.failure_cooldown, now)
+            )
+            count = conn.execute("SELECT failed_attempts FROM token WHERE id = 1").fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def release(self) -> None:
+        self._conn().execute(
+            "UPDATE token SET lock_owner = NULL, lock_expires_at = NULL WHERE id = 1 AND lock_owner = ?", (self.owner,)
+        )
+
+    def clear(self, token: str) -> None:
+        """Forget the stored token if it is still ``token`` (D&B has rejected it)"""
+        self._conn().execute("UPDATE token SET token = NULL, expires_at = NULL WHERE id = 1 AND token = ?", (token,))
+
+    def reset_failures(self) -> None:
+        self._conn().execute("UPDATE token SET failed_attempts = 0 WHERE id = 1")
+
+
+def _check_owner(path: str, st: os.stat_result) -> None:
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user (uid {st.st_uid})")
+
+
+def _prepare(path: str) -> None:
+    """Create the database file, and its directory, private to this user; refuse anyone else's"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    # Root's directories (/tmp included) are fine; another user's could have files swapped under us
+    if st.st_uid != 0:
+        _check_owner(directory, st)
+
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | os.O_NOFOLLOW, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        os.close(fd)
+
+    for name in (path, f"{path}-wal", f"{path}-shm"):
+        try:
+            st = os.lstat(name)
+        except FileNotFoundError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            raise PermissionError(f"{name} is not a regular file")
+        _check_owner(name, st)
+        if stat.S_IMODE(st.st_mode) & 0o077:
+            os.chmod(name, 0o600)
+
+
+_store: Optional[TokenStore] = None
+_store_loaded = False
+
+
+def get_token_store() -> Optional[TokenStore]:
+    """The host-shared token store, or ``None`` when ``token_store_path`` is ``off`` or in mock mode"""
+    global _store, _store_loaded
+    if not _store_loaded:
+        from app.config import settings
+
+        _store_loaded = True
+        # Mock tokens cost nothing to make, and must never replace a real one
+        if not settings.use_mock_data and settings.token_store_path.lower() not in ("", "off", "false", "none"):
+            try:
+                _store = TokenStore(settings.token_store_path, settings.auth_failure_cooldown)
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Token store unavailable, keeping tokens per process: {e}")
+    return _store
@@ -3,7 +3,6 @@
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
-import time
 from functools import wraps
 
 
@@ -49,23 +48,15 @@ def parse_dnb_error_code(error_code: str) -> Dict[str, Any]:
     })
 
 
-def retry_with_backoff(max_retries: int = 3, backoff_factor: float = 2.0):
-    """Decorator to retry function with exponential backoff"""
+def retry_with_backoff(max_retries: int = 3):
+    """Decorator to retry an async function on retryable D&B errors (see ``app.retry``)"""
     
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            retries = 0
-            while retries < max_retries:
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    retries += 1
-                    if retries >= max_retries:
-                        raise
-                    wait_time = backoff_factor ** retries
-                    time.sleep(wait_time)
-            return None
+            from app.retry import call_with_retries
+            
+            return await call_with_retries(lambda: func(*args, **kwargs), func.__name__, max_retries)
         return wrapper
     return decorator
 
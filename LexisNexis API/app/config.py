@@ -18,7 +18,16 @@ class Settings(BaseSettings):
     
     # SOAP Configuration
     soap_timeout: int = 30  # seconds
-    soap_retry_attempts: int = 3
+    soap_retry_attempts: int = 3  # attempts per call, including the first (see app/retry.py)
+    retry_base_delay: float = 0.5  # seconds
+    retry_max_delay: float = 20.0
+    retry_budget_ratio: float = 0.2  # retries allowed per call made in the last 10 s
+    retry_budget_reserve: float = 10.0  # retries allowed per 10 s regardless of traffic
+    
+    # Upstream cassettes: record Bridger traffic, or replay it offline
+    cassette_mode: Literal["off", "record", "replay"] = "off"
+    cassette_path: str = "cassettes/bridger-{pid}.jsonl.gz"
+    cassette_latency_scale: float = 1.0  # 0 replays without the recorded latency
     
     # API Configuration
     api_title: str = "LexisNexis Bridger XG Sanctions API"
@@ -52,3 +52,10 @@ class ValidationError(LexisNexisAPIError):
     
     def __init__(self, message: str = "Input validation failed"):
         super().__init__(message, "VALIDATION_ERROR")
+
+
+class DeadlineExceededError(LexisNexisAPIError):
+    """Exception raised when the caller's request budget runs out"""
+    
+    def __init__(self, message: str = "Request budget exceeded"):
+        super().__init__(message, "DEADLINE_EXCEEDED")
@@ -1,5 +1,6 @@
 """FastAPI application for LexisNexis Bridger XG SOAP-to-REST API"""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -9,7 +10,9 @@ from fastapi.responses import JSONResponse
 
 from app.config import settings
 from app.routes import router
-from app.exceptions import LexisNexisAPIError
+from app.providers.bridger_soap import bridger_client
+from app.deadline import DeadlineMiddleware
+from app.exceptions import DeadlineExceededError, LexisNexisAPIError
 from app.utils import get_iso_timestamp
 
 # Configure logging
@@ -20,6 +23,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _log_warm_up_failure(task: asyncio.Task) -> None:
+    """Report a failed WSDL warm-up; the first request will retry it"""
+    if not task.cancelled() and task.exception():
+        logger.warning(f"SOAP client warm-up failed: {task.exception()}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
@@ -28,8 +37,17 @@ async def lifespan(app: FastAPI):
     logger.info(f"Mock mode: {settings.use_mock_data}")
     logger.info(f"Environment: {settings.bridger_environment}")
     
+    # Load the WSDL in the background so the port binds immediately
+    warm_up = None
+    if not settings.use_mock_data:
+        warm_up = asyncio.create_task(asyncio.to_thread(bridger_client.warm_up))
+        warm_up.add_done_callback(_log_warm_up_failure)
+    
     yield
     
+    if warm_up and not warm_up.done():
+        warm_up.cancel()
+    
     # Shutdown
     logger.info("Shutting down LexisNexis Bridger XG API Service")
 
@@ -44,6 +62,9 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# X-Request-Budget-Ms / budget_ms: abandon the request with a 504 once it is spent
+app.add_middleware(DeadlineMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -55,6 +76,22 @@ app.add_middleware(
 
 
 # Exception handlers
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    """Handle exhausted request budgets"""
+    return JSONResponse(
+        status_code=504,
+        content={
+            "error": {
+                "error_code": exc.error_code,
+                "message": exc.message,
+                "severity": "ERROR"
+            },
+            "timestamp": get_iso_timestamp()
+        }
+    )
+
+
 @app.exception_handler(LexisNexisAPIError)
 async def lexisnexis_exception_handler(request: Request, exc: LexisNexisAPIError):
     """Handle LexisNexis API exceptions"""
@@ -97,7 +134,7 @@ async def health_check():
         "version": settings.api_version,
         "timestamp": get_iso_timestamp(),
         "mock_mode": settings.use_mock_data,
-        "soap_available": True if settings.use_mock_data else False  # Would check SOAP connection in real mode
+        "soap_available": True if settings.use_mock_data else bridger_client.client is not None
     }
 
 
@@ -6,11 +6,14 @@ All other files are vendor-agnostic and can work with any provider
 """
 
 import logging
+import threading
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from app import deadline
 from app.config import settings
 from app.exceptions import (
+    DeadlineExceededError,
     SOAPConnectionError,
     SOAPAuthenticationError,
     SOAPTimeoutError,
@@ -35,7 +38,8 @@ from app.mock_data import (
     get_mock_monitoring_alert,
     get_mock_screening_lists
 )
-from app.models import RiskLevel
+from app.models import RiskLevel, ScreeningResult
+from app.retry import call_with_retries, retry_after_hook
 
 logger = logging.getLogger(__name__)
 
@@ -55,9 +59,21 @@ class BridgerSOAPClient:
         self.timeout = settings.soap_timeout
         self.use_mock = settings.use_mock_data
         self.client = None
-        
+        # The WSDL is fetched and parsed on first use (or by warm_up), never at import
+        self._client_lock = threading.Lock()
+    
+    def _soap(self):
+        """Return the zeep client, initializing it on first use"""
+        if self.client is None:
+            with self._client_lock:
+                if self.client is None:
+                    self._initialize_soap_client()
+        return self.client
+    
+    def warm_up(self) -> None:
+        """Fetch and parse the WSDL ahead of the first screening request"""
         if not self.use_mock:
-            self._initialize_soap_client()
+            self._soap()
     
     def _initialize_soap_client(self):
         """Initialize SOAP client with zeep"""
@@ -66,10 +82,14 @@ class BridgerSOAPClient:
             from zeep.transports import Transport
             from requests import Session
             from requests.auth import HTTPBasicAuth
+            from app.cassette import mount_cassette
             
             # Create session with authentication
             session = Session()
             session.auth = HTTPBasicAuth(self.username, self.password)
+            mount_cassette(session)
+            # Lets a retry wait for Bridger's Retry-After (see app.retry)
+            session.hooks["response"].append(retry_after_hook)
             
             # Create transport with timeout
             transport = Transport(session=session, timeout=self.timeout)
@@ -83,6 +103,20 @@ class BridgerSOAPClient:
             logger.error(f"Failed to initialize SOAP client: {str(e)}")
             raise InvalidWSDLError(f"Failed to initialize SOAP client: {str(e)}")
     
+    async def _call(self, operation: str, *args) -> Any:
+        """
+        Run a SOAP operation in a worker thread
+        
+        zeep is synchronous; running it off the event loop keeps other requests
+        moving, and lets the request give up when its budget runs out. 429s,
+        5xx and connection errors are retried (see ``app.retry``), after
+        Bridger's ``Retry-After`` when it sends one.
+        """
+        def call():
+            return getattr(self._soap().service, operation)(*args)
+        
+        return await call_with_retries(lambda: deadline.run_blocking(operation, call), operation)
+    
     async def screen_person(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Screen a person via SOAP
@@ -117,24 +151,15 @@ class BridgerSOAPClient:
             # ⚠️ Method name depends on your WSDL
             # Common names: RunSearch, Search, Screening, SubmitSearch
             
-            soap_request = {
-                "FullName": sanitize_input(payload.get("fullName")),
-                "FirstName": sanitize_input(payload.get("firstName")),
-                "LastName": sanitize_input(payload.get("lastName")),
-                "DOB": format_soap_date(payload.get("dob")),
-                "Nationality": payload.get("nationality"),
-                "Country": payload.get("country"),
-                "ReferenceId": payload.get("referenceId")
-            }
-            
-            # Remove None values
-            soap_request = {k: v for k, v in soap_request.items() if v is not None}
+            soap_request = self._person_soap_request(payload)
             
             # Make SOAP call
-            response = self.client.service.RunSearch(soap_request)
+            response = await self._call("RunSearch", soap_request)
             
-            return response
+            return self._to_dict(response, "ScreeningResponse")
             
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             logger.error(f"SOAP person screening failed: {str(e)}")
             raise ScreeningError(f"Person screening failed: {str(e)}")
@@ -157,19 +182,14 @@ class BridgerSOAPClient:
         
         # Real SOAP call
         try:
-            soap_request = {
-                "EntityName": sanitize_input(payload.get("entityName")),
-                "Country": payload.get("country"),
-                "RegistrationNumber": payload.get("registrationNumber"),
-                "ReferenceId": payload.get("referenceId")
-            }
-            
-            soap_request = {k: v for k, v in soap_request.items() if v is not None}
+            soap_request = self._entity_soap_request(payload)
             
-            response = self.client.service.RunEntitySearch(soap_request)
+            response = await self._call("RunEntitySearch", soap_request)
             
-            return response
+            return self._to_dict(response, "ScreeningResponse")
             
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             logger.error(f"SOAP entity screening failed: {str(e)}")
             raise ScreeningError(f"Entity screening failed: {str(e)}")
@@ -183,8 +203,14 @@ class BridgerSOAPClient:
         
         # Real SOAP batch call
         try:
-            response = self.client.service.BatchScreen(payload)
-            return response
+            soap_request = {
+                "Persons": [self._person_soap_request(p) for p in payload.get("persons") or []],
+                "Entities": [self._entity_soap_request(e) for e in payload.get("entities") or []]
+            }
+            response = await self._call("BatchScreen", soap_request)
+            return self._to_dict(response, "BatchScreeningResponse")
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             logger.error(f"SOAP batch screening failed: {str(e)}")
             raise ScreeningError(f"Batch screening failed: {str(e)}")
@@ -195,25 +221,72 @@ class BridgerSOAPClient:
             return get_mock_screening_lists()
         
         try:
-            response = self.client.service.GetAvailableLists()
-            return response
+            response = await self._call("GetAvailableLists")
+            return self._to_dict(response) or []
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get screening lists: {str(e)}")
             return []
     
+    # ========================================================================
+    # SOAP Request/Response Helpers
+    # ========================================================================
+    
+    def _person_soap_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a person screening payload onto the Bridger search request"""
+        soap_request = {
+            "FullName": sanitize_input(payload.get("fullName")),
+            "FirstName": sanitize_input(payload.get("firstName")),
+            "LastName": sanitize_input(payload.get("lastName")),
+            "DOB": format_soap_date(payload.get("dob")),
+            "Nationality": payload.get("nationality"),
+            "Country": payload.get("country"),
+            "ReferenceId": payload.get("referenceId")
+        }
+        
+        # Remove None values
+        return {k: v for k, v in soap_request.items() if v is not None}
+    
+    def _entity_soap_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an entity screening payload onto the Bridger entity search request"""
+        soap_request = {
+            "EntityName": sanitize_input(payload.get("entityName")),
+            "Country": payload.get("country"),
+            "RegistrationNumber": payload.get("registrationNumber"),
+            "ReferenceId": payload.get("referenceId")
+        }
+        
+        return {k: v for k, v in soap_request.items() if v is not None}
+    
+    def _to_dict(self, response: Any, wrapper: Optional[str] = None) -> Any:
+        """
+        Convert a zeep response object into plain dicts/lists
+        
+        zeep unwraps single-child response elements, so the wrapper key the
+        normalization layer expects is restored here when it is missing.
+        """
+        from zeep.helpers import serialize_object
+        
+        data = serialize_object(response, dict)
+        if wrapper and not (isinstance(data, dict) and wrapper in data):
+            return {wrapper: data}
+        return data
+    
     # ========================================================================
     # Normalization Layer - Convert SOAP XML to REST JSON
     # ========================================================================
     
-    def normalize_person_response(self, soap_response: Dict[str, Any], subject: Dict[str, Any]) -> Dict[str, Any]:
+    def normalize_person_response(self, soap_response: Dict[str, Any], subject: Dict[str, Any]) -> ScreeningResult:
         """
         Normalize SOAP person screening response to vendor-agnostic format
         
-        This is where we handle different SOAP response structures
+        This is where we handle different SOAP response structures. The result
+        is validated here, once, so routes can send it without validating again.
         """
         screening_data = soap_response.get("ScreeningResponse", {})
         
-        matches = self._parse_matches(screening_data.get("Matches", []))
+        matches = self._parse_matches(screening_data.get("Matches") or [])
         
         # Determine highest risk level
         highest_risk = RiskLevel.LOW
@@ -224,7 +297,7 @@ class BridgerSOAPClient:
             elif RiskLevel.MEDIUM in risk_levels:
                 highest_risk = RiskLevel.MEDIUM
         
-        return {
+        return ScreeningResult.model_validate({
             "screeningId": screening_data.get("ScreeningId", generate_screening_id()),
             "referenceId": screening_data.get("ReferenceId", subject.get("referenceId")),
             "status": screening_data.get("Status", "COMPLETED"),
@@ -234,9 +307,9 @@ class BridgerSOAPClient:
             "highestRiskLevel": highest_risk,
             "createdAt": get_iso_timestamp(),
             "processingTime": screening_data.get("ProcessingTime")
-        }
+        })
     
-    def normalize_entity_response(self, soap_response: Dict[str, Any], subject: Dict[str, Any]) -> Dict[str, Any]:
+    def normalize_entity_response(self, soap_response: Dict[str, Any], subject: Dict[str, Any]) -> ScreeningResult:
         """Normalize SOAP entity screening response"""
         # Same structure as person for now
         return self.normalize_person_response(soap_response, subject)
@@ -251,7 +324,7 @@ class BridgerSOAPClient:
         
         for match in soap_matches:
             # Determine risk level based on categories and score
-            categories = match.get("Categories", [])
+            categories = match.get("Categories") or []
             score = calculate_match_score(match.get("Score", 0))
             
             risk_level = self._determine_risk_level(categories, score)
@@ -0,0 +1,157 @@
+"""
+Retries for Bridger SOAP calls
+
+``call_with_retries`` tries a failed call again only when that can help: an
+HTTP 429 or 5xx from Bridger, or a connection failure. SOAP faults, other
+4xx responses and timeouts fail straight away.
+
+- A ``Retry-After`` on a 429 or 503 from Bridger sets the wait. zeep's
+  errors do not carry response headers, so ``retry_after_hook`` reads it on
+  the transport session and raises the ``TransportError`` itself. Otherwise
+  waits use decorrelated jitter: each is random between the base delay and
+  three times the previous wait, capped, so clients that failed together do
+  not retry together.
+- Waits are ``asyncio.sleep``s and are skipped when the request's budget
+  (``deadline.py``) cannot cover them.
+- A process-wide retry budget allows retries of up to a fraction
+  (``retry_budget_ratio``) of the calls made in the last 10 seconds, plus a
+  small reserve, so during an outage retries do not multiply the load on
+  Bridger.
+
+Configured through ``settings.soap_retry_attempts`` and ``settings.retry_*``.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, List, Optional
+
+from app import deadline
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+    """Allows ``ratio`` retries per call made in the last ``window`` seconds, plus ``reserve``"""
+
+    def __init__(self, ratio: float, reserve: float, window: float = 10.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.window = window
+        # [second, calls, retries] for each recent second
+        self._buckets: Deque[List[int]] = deque()
+        self.retries = 0
+        self.refused = 0
+
+    def _bucket(self) -> List[int]:
+        now = int(time.monotonic())
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def record_call(self):
+        self._bucket()[1] += 1
+
+    def try_retry(self) -> bool:
+        bucket = self._bucket()
+        calls = sum(b[1] for b in self._buckets)
+        retries = sum(b[2] for b in self._buckets)
+        if retries >= self.reserve + self.ratio * calls:
+            self.refused += 1
+            return False
+        bucket[2] += 1
+        self.retries += 1
+        return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delay in seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_hook(response, *args, **kwargs):
+    """``requests`` response hook: fail a 429 or 503 that has a ``Retry-After`` with it attached"""
+    if response.status_code in (429, 503):
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            from zeep.exceptions import TransportError
+
+            error = TransportError(
+                f"Server returned HTTP status {response.status_code}",
+                status_code=response.status_code,
+                content=response.content
+            )
+            error.retry_after = retry_after
+            raise error
+    return response
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether the same SOAP call could succeed if sent again"""
+    import requests
+    from zeep.exceptions import TransportError
+    from app.cassette import CassetteMissError
+
+    if isinstance(error, CassetteMissError):
+        return False
+    if isinstance(error, TransportError):
+        return error.status_code == 429 or error.status_code >= 500
+    # ConnectTimeout is a ConnectionError too; a read timeout is not retried
+    return isinstance(error, requests.ConnectionError)
+
+
+async def call_with_retries(
+    call: Callable[[], Awaitable[Any]],
+    operation: str,
+    attempts: Optional[int] = None
+) -> Any:
+    """Run ``call``, retrying retryable failures within the attempt limit, request budget and retry budget"""
+    budget = get_retry_budget()
+    budget.record_call()
+    attempts = settings.soap_retry_attempts if attempts is None else attempts
+    delay = settings.retry_base_delay
+    for attempt in range(1, attempts + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= attempts or not is_retryable(e):
+                raise
+            wait = getattr(e, "retry_after", None)
+            if wait is None:
+                delay = min(settings.retry_max_delay, random.uniform(settings.retry_base_delay, delay * 3))
+                wait = delay
+            left = deadline.remaining()
+            if wait > settings.retry_max_delay or (left is not None and wait >= left):
+                logger.info(f"Not retrying {operation}: a {wait:.1f} s wait does not fit")
+                raise
+            if not budget.try_retry():
+                logger.warning(f"Not retrying {operation}: retry budget exhausted")
+                raise
+            logger.info(f"{operation} failed ({e}); attempt {attempt + 1} of {attempts} in {wait:.2f} s")
+            await asyncio.sleep(wait)
+
+
+_budget: Optional[RetryBudget] = None
+
+
+def get_retry_budget() -> RetryBudget:
+    """The process-wide retry budget"""
+    global _budget
+    if _budget is None:
+        _budget = RetryBudget(settings.retry_budget_ratio, settings.retry_budget_reserve)
+    return _budget
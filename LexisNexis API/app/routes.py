@@ -2,6 +2,8 @@
 
 import logging
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel
 from typing import List
 
 from app.models import (
@@ -15,7 +17,7 @@ from app.models import (
     ScreeningListInfo
 )
 from app.providers.bridger_soap import bridger_client
-from app.exceptions import LexisNexisAPIError
+from app.exceptions import DeadlineExceededError, LexisNexisAPIError
 from app.utils import generate_screening_id, generate_monitoring_id, get_iso_timestamp
 
 logger = logging.getLogger(__name__)
@@ -23,6 +25,21 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+class ModelResponse(Response):
+    """
+    JSON response for a model that is already validated
+    
+    FastAPI validates whatever a route returns against its response_model
+    before encoding it, rebuilding every nested model. Returning a Response
+    skips that, so routes whose result is validated on construction send it
+    with this instead and keep response_model only for the OpenAPI schema.
+    """
+    media_type = "application/json"
+    
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode("utf-8")
+
+
 @router.post("/screen/person", response_model=ScreeningResult)
 async def screen_person(request: PersonScreenRequest):
     """
@@ -43,11 +60,13 @@ async def screen_person(request: PersonScreenRequest):
         # Call SOAP service
         soap_response = await bridger_client.screen_person(payload)
         
-        # Normalize SOAP response to REST format
+        # Normalize SOAP response to REST format (validated once, here)
         result = bridger_client.normalize_person_response(soap_response, payload)
         
-        return result
+        return ModelResponse(result)
         
+    except DeadlineExceededError:
+        raise
     except LexisNexisAPIError as e:
         logger.error(f"Screening error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -74,11 +93,13 @@ async def screen_entity(request: EntityScreenRequest):
         # Call SOAP service
         soap_response = await bridger_client.screen_entity(payload)
         
-        # Normalize response
+        # Normalize response (validated once, here)
         result = bridger_client.normalize_entity_response(soap_response, payload)
         
-        return result
+        return ModelResponse(result)
         
+    except DeadlineExceededError:
+        raise
     except LexisNexisAPIError as e:
         logger.error(f"Screening error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -113,6 +134,8 @@ async def screen_batch(request: BatchScreenRequest):
             "createdAt": get_iso_timestamp()
         }
         
+    except DeadlineExceededError:
+        raise
     except LexisNexisAPIError as e:
         logger.error(f"Batch screening error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,7 +3,6 @@
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
-import time
 from functools import wraps
 
 
@@ -76,29 +75,15 @@ def sanitize_input(text: Optional[str]) -> Optional[str]:
     return sanitized
 
 
-def retry_soap_call(max_retries: int = 3, backoff_factor: float = 2.0):
-    """Decorator to retry SOAP calls with exponential backoff"""
+def retry_soap_call(max_retries: int = 3):
+    """Decorator to retry an async SOAP call on retryable errors (see ``app.retry``)"""
     
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            retries = 0
-            last_exception = None
+            from app.retry import call_with_retries
             
-            while retries < max_retries:
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    retries += 1
-                    
-                    if retries >= max_retries:
-                        raise last_exception
-                    
-                    wait_time = backoff_factor ** retries
-                    time.sleep(wait_time)
-            
-            raise last_exception
+            return await call_with_retries(lambda: func(*args, **kwargs), func.__name__, max_retries)
         
         return wrapper
     return decorator
@@ -0,0 +1,164 @@
+"""
+Admission control with interactive and batch lanes
+
+Each request is classified by its ``X-Priority`` header (``interactive`` or
+``batch``) or, failing that, by route (``ADMISSION_BATCH_ROUTES``, a comma
+separated list of path prefixes); everything else is interactive.
+
+- Interactive requests are admitted immediately up to
+  ``ADMISSION_INTERACTIVE_LIMIT`` in flight per worker.
+- Batch requests run at most ``ADMISSION_BATCH_CONCURRENCY`` at a time and
+  wait in a queue of at most ``ADMISSION_BATCH_QUEUE``.
+- Beyond those limits the request is shed straight away with 503 and a
+  ``Retry-After`` estimated from recent batch latency.
+
+The lane is kept in a context variable so the FCA and Companies House rate
+budgets (``rate_limit.py``) can give interactive calls first claim on quota.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+HEADER = "X-Priority"
+
+# Never queued or shed
+EXEMPT_PATHS = ("/health", "/docs", "/redoc", "/openapi.json", "/api/admission/stats", "/api/prefetch/stats",
+                "/api/cache/stats")
+
+current_lane: ContextVar[str] = ContextVar("lane", default=INTERACTIVE)
+
+
+class Lane:
+    """In-flight and queued counts for one lane of one worker"""
+
+    def __init__(self, name: str, concurrency: int, queue_limit: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.avg_latency = 1.0
+        self._slots = asyncio.Semaphore(concurrency)
+
+    def should_shed(self) -> bool:
+        if self.in_flight < self.concurrency:
+            return False
+        return self.queued >= self.queue_limit
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead has likely drained"""
+        ahead = self.queued + self.in_flight
+        return max(1, math.ceil(ahead * self.avg_latency / max(self.concurrency, 1)))
+
+    async def __aenter__(self):
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        self.admitted += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.in_flight -= 1
+        self._slots.release()
+
+    def observe(self, seconds: float) -> None:
+        # Exponentially weighted, so Retry-After follows recent load
+        self.avg_latency = 0.8 * self.avg_latency + 0.2 * seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_latency_ms": round(self.avg_latency * 1000, 1),
+        }
+
+
+class AdmissionMiddleware:
+    """Classifies requests into lanes, queues batch work and sheds overload"""
+
+    def __init__(self, app):
+        self.app = app
+        self.batch_routes = tuple(
+            prefix.strip() for prefix in os.getenv("ADMISSION_BATCH_ROUTES", "").split(",") if prefix.strip()
+        )
+        self.lanes = {
+            # Interactive requests are never queued: past the limit they are shed
+            INTERACTIVE: Lane(INTERACTIVE, int(os.getenv("ADMISSION_INTERACTIVE_LIMIT", "200")), 0),
+            BATCH: Lane(
+                BATCH,
+                int(os.getenv("ADMISSION_BATCH_CONCURRENCY", "4")),
+                int(os.getenv("ADMISSION_BATCH_QUEUE", "50"))
+            ),
+        }
+        global _middleware
+        _middleware = self
+
+    def classify(self, scope) -> str:
+        for name, value in scope.get("headers") or []:
+            if name.decode("latin-1").lower() == HEADER.lower():
+                return BATCH if value.decode("latin-1").strip().lower() == BATCH else INTERACTIVE
+        if self.batch_routes and scope["path"].startswith(self.batch_routes):
+            return BATCH
+        return INTERACTIVE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATHS):
+            return await self.app(scope, receive, send)
+
+        lane = self.lanes[self.classify(scope)]
+        if lane.should_shed():
+            lane.shed += 1
+            return await self._reject(send, lane)
+
+        token = current_lane.set(lane.name)
+        try:
+            async with lane:
+                started = time.monotonic()
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    lane.observe(time.monotonic() - started)
+        finally:
+            current_lane.reset(token)
+
+    async def _reject(self, send, lane: Lane) -> None:
+        retry_after = lane.retry_after()
+        body = json.dumps({
+            "detail": f"Too many {lane.name} requests; retry in {retry_after} s"
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+_middleware = None
+
+
+def stats() -> Dict[str, Any]:
+    """Lane counters for this worker"""
+    if _middleware is None:
+        return {}
+    return {name: lane.snapshot() for name, lane in _middleware.lanes.items()}
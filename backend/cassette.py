@@ -0,0 +1,161 @@
+"""
+Record-and-replay cassettes for upstream HTTP traffic
+
+With ``UPSTREAM_CASSETTE_MODE=record`` every upstream exchange made by the
+FCA and Companies House clients is appended to a gzip'd JSON-lines cassette,
+including how long it took. With ``UPSTREAM_CASSETTE_MODE=replay`` the same
+exchanges are served from the cassette after sleeping for the recorded
+latency multiplied by ``UPSTREAM_CASSETTE_LATENCY_SCALE`` (``0`` replays
+instantly).
+
+``UPSTREAM_CASSETTE_PATH`` may contain ``{pid}`` so that several workers can
+record at once; in replay mode it may be a glob matching all of their files.
+"""
+
+import asyncio
+import base64
+import glob
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+# Response headers that no longer apply once the body has been decoded
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+class CassetteMissError(httpx.TransportError):
+    """Raised in replay mode when a request was never recorded"""
+
+
+def request_key(method: str, url: str, body: bytes = b"") -> str:
+    """Stable key for a request: method, URL with sorted query and a body digest"""
+    parsed = httpx.URL(url)
+    query = "&".join(sorted(str(parsed.params).split("&"))) if parsed.query else ""
+    digest = hashlib.sha1(body).hexdigest()[:12] if body else ""
+    return f"{method.upper()} {parsed.copy_with(query=None)}?{query}#{digest}"
+
+
+class Cassette:
+    """An on-disk list of recorded request/response pairs"""
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 1.0):
+        self.path = path.replace("{pid}", str(os.getpid()))
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._entries: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        if mode == "replay":
+            self._load(path.replace("{pid}", "*"))
+
+    def _load(self, pattern: str) -> None:
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            raise FileNotFoundError(f"No cassette found at {pattern}")
+        for path in paths:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def record(self, key: str, method: str, url: str, status: int,
+               headers: Dict[str, str], body: bytes, elapsed: float) -> None:
+        """Append one exchange (request secrets such as auth headers are never stored)"""
+        entry: Dict[str, Any] = {
+            "key": key, "method": method, "url": url, "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "elapsed": round(elapsed, 6)
+        }
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(body).decode("ascii")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Each append is its own gzip member, which gzip.open reads back transparently
+        with gzip.open(self.path, "at", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def lookup(self, key: str) -> Dict[str, Any]:
+        """Next recorded exchange for a key; repeated requests cycle through recordings"""
+        entries = self._entries.get(key)
+        if not entries:
+            raise CassetteMissError(f"No cassette entry for {key}")
+        entry = entries.popleft()
+        entries.append(entry)
+        return entry
+
+    @staticmethod
+    def body_of(entry: Dict[str, Any]) -> bytes:
+        if "body_b64" in entry:
+            return base64.b64decode(entry["body_b64"])
+        return entry.get("body", "").encode("utf-8")
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records to, or replays from, a cassette"""
+
+    def __init__(self, cassette: Cassette, **transport_options: Any):
+        self.cassette = cassette
+        self._inner = httpx.AsyncHTTPTransport(**transport_options) if cassette.mode == "record" else None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        key = request_key(request.method, str(request.url), body)
+
+        if self.cassette.mode == "replay":
+            entry = self.cassette.lookup(key)
+            await asyncio.sleep(entry["elapsed"] * self.cassette.latency_scale)
+            return httpx.Response(entry["status"], headers=entry["headers"],
+                                  content=Cassette.body_of(entry), request=request)
+
+        started = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        try:
+            # Reading here decodes any content-encoding, hence the dropped headers
+            content = await httpx.Response(
+                response.status_code, headers=response.headers, stream=response.stream
+            ).aread()
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - started
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        self.cassette.record(key, request.method, str(request.url), response.status_code,
+                             headers, content, elapsed)
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        if self._inner is not None:
+            await self._inner.aclose()
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The process-wide cassette, or ``None`` when cassette mode is off"""
+    global _cassette
+    mode = os.getenv("UPSTREAM_CASSETTE_MODE", "off").lower()
+    if mode == "off":
+        return None
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Invalid UPSTREAM_CASSETTE_MODE: {mode}")
+    if _cassette is None:
+        _cassette = Cassette(
+            os.getenv("UPSTREAM_CASSETTE_PATH", "cassettes/backend-{pid}.jsonl.gz"),
+            mode,
+            float(os.getenv("UPSTREAM_CASSETTE_LATENCY_SCALE", "1.0"))
+        )
+    return _cassette
+
+
+def cassette_transport(**transport_options: Any) -> Optional[CassetteTransport]:
+    """A transport for a new ``httpx.AsyncClient``, or ``None`` to use the default"""
+    cassette = get_cassette()
+    return CassetteTransport(cassette, **transport_options) if cassette else None
@@ -1,23 +1,41 @@
-import httpx
 import os
-import base64
-from dotenv import load_dotenv
-
-load_dotenv()
+from typing import Optional
 
 class CompaniesHouseClient:
     # Production endpoint for Live applications
     BASE_URL = "https://api.company-information.service.gov.uk"
+    # Document API Base URL
+    DOCUMENT_API_URL = "https://document-api.company-information.service.gov.uk"
     
     def __init__(self):
+        # dotenv is loaded here rather than at import so that importing the app stays cheap
+        from dotenv import load_dotenv
+        load_dotenv()
+
         self.api_key = os.getenv("COMPANIES_HOUSE_API_KEY")
+        # Overridable so the client can be pointed at a local stand-in (see perf/)
+        self.base_url = os.getenv("COMPANIES_HOUSE_BASE_URL", self.BASE_URL)
+        self.document_api_url = os.getenv("COMPANIES_HOUSE_DOCUMENT_URL", self.DOCUMENT_API_URL)
 
     async def get(self, endpoint: str, params: dict = None):
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
+        """GET a JSON endpoint as a compact record, from the in-process or host-shared cache when possible"""
+        from memory_cache import cached_get
+
+        return await cached_get("ch", endpoint, params, lambda: self._fetch(endpoint, params))
+
+    async def _fetch(self, endpoint: str, params: dict = None):
+        import httpx
+        import deadline
+        from cassette import cassette_transport
+        from rate_limit import get_budget, record_response
+
+        await get_budget("ch").acquire()
+        async with httpx.AsyncClient(timeout=deadline.timeout(10.0), transport=cassette_transport()) as client:
+            url = f"{self.base_url}/{endpoint.lstrip('/')}"
             # Companies House uses Basic Auth with the API key as the username and no password.
             auth = (self.api_key, "") if self.api_key else None
             response = await client.get(url, auth=auth, params=params)
+            await record_response("ch", response)
             response.raise_for_status()
             return response.json()
 
@@ -43,15 +61,18 @@ class CompaniesHouseClient:
         1. Request the document metadata to get the download URL.
         2. Follow the redirect/fetch the actual content from the download URL.
         """
-        # Document API Base URL
-        DOC_API_URL = "https://document-api.company-information.service.gov.uk"
-        
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        import httpx
+        import deadline
+        from cassette import cassette_transport
+
+        async with httpx.AsyncClient(
+            timeout=deadline.timeout(30.0), follow_redirects=True, transport=cassette_transport()
+        ) as client:
              # Basic Auth
             auth = (self.api_key, "") if self.api_key else None
             
             # Step 1: Get metadata which contains the download link
-            metadata_url = f"{DOC_API_URL}/document/{document_id}/content"
+            metadata_url = f"{self.document_api_url}/document/{document_id}/content"
             
             # The Accept: application/pdf header tells the API to return the binary PDF
             response = await client.get(
@@ -64,3 +85,14 @@ class CompaniesHouseClient:
             response.raise_for_status()
             
             return response.content
+
+
+_client: Optional[CompaniesHouseClient] = None
+
+
+def get_ch_client() -> CompaniesHouseClient:
+    """Shared CompaniesHouseClient, built on first use"""
+    global _client
+    if _client is None:
+        _client = CompaniesHouseClient()
+    return _client
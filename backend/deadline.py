@@ -0,0 +1,120 @@
+"""
+Per-request latency budgets
+
+A caller can send ``X-Request-Budget-Ms`` (or the ``budget_ms`` query
+parameter) to say how long it is prepared to wait. ``DeadlineMiddleware``
+turns that into a deadline for the request: upstream timeouts, cache waits
+and the KYC fan-out are capped by what is left of it, and once it has passed
+the request is abandoned with a 504 instead of tying up a worker for a
+client that has already given up. Calls to the D&B and LexisNexis services
+pass the remaining budget on in the same header.
+
+Requests without a budget keep the clients' own timeouts. Work that can tell
+up front it will not finish in time (a rate limit wait, say) raises
+``DeadlineExceededError``, which the app answers with the same 504.
+"""
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+HEADER = "X-Request-Budget-Ms"
+QUERY_PARAM = "budget_ms"
+
+# Upstream timeouts get this much longer than the budget so the middleware,
+# not a client timeout, decides when the request has run out of time
+GRACE = 0.05
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(Exception):
+    """The request's budget ran out, or would run out before the work could finish (504)"""
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget, or ``None`` without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def timeout(default: float) -> float:
+    """A client timeout capped by the remaining budget"""
+    left = remaining()
+    return default if left is None else min(default, left + GRACE)
+
+
+def headers() -> Dict[str, str]:
+    """Headers that pass the remaining budget on to another service"""
+    left = remaining()
+    return {} if left is None else {HEADER: str(int(left * 1000))}
+
+
+@contextmanager
+def within(seconds: float):
+    """Tighten the deadline for work started inside the block (e.g. tasks it creates)"""
+    new = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _budget_ms(scope) -> Optional[float]:
+    for name, value in scope.get("headers") or []:
+        if name.decode("latin-1").lower() == HEADER.lower():
+            return float(value)
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if QUERY_PARAM in query:
+        return float(query[QUERY_PARAM][0])
+    return None
+
+
+class DeadlineMiddleware:
+    """Sets the request deadline and answers 504 when it passes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        try:
+            budget_ms = _budget_ms(scope)
+        except ValueError:
+            budget_ms = None
+        if budget_ms is None:
+            return await self.app(scope, receive, send)
+
+        token = _deadline.set(time.monotonic() + budget_ms / 1000)
+        started = False
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(self.app(scope, receive, tracking_send), timeout=budget_ms / 1000)
+        except asyncio.TimeoutError:
+            if started:
+                # Part of the response has gone out; stopping is all we can do
+                return
+            body = json.dumps({"detail": f"Request budget of {budget_ms:g} ms exceeded"}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            _deadline.reset(token)
@@ -1,13 +1,16 @@
-import httpx
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from typing import Optional
 
 class FcaClient:
     BASE_URL = "https://register.fca.org.uk/services/V0.1"
     
     def __init__(self):
+        # dotenv is loaded here rather than at import so that importing the app stays cheap
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        # Overridable so the client can be pointed at a local stand-in (see perf/)
+        self.base_url = os.getenv("FCA_BASE_URL", self.BASE_URL)
         self.email = os.getenv("FCA_EMAIL")
         self.key = os.getenv("FCA_KEY")
         self.headers = {
@@ -17,9 +20,22 @@ class FcaClient:
         }
 
     async def get(self, endpoint: str, params: dict = None):
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            url = f"{self.BASE_URL}/{endpoint}"
+        """GET a JSON endpoint as a compact record, from the in-process or host-shared cache when possible"""
+        from memory_cache import cached_get
+
+        return await cached_get("fca", endpoint, params, lambda: self._fetch(endpoint, params))
+
+    async def _fetch(self, endpoint: str, params: dict = None):
+        import httpx
+        import deadline
+        from cassette import cassette_transport
+        from rate_limit import get_budget, record_response
+
+        await get_budget("fca").acquire()
+        async with httpx.AsyncClient(timeout=deadline.timeout(10.0), transport=cassette_transport()) as client:
+            url = f"{self.base_url}/{endpoint}"
             response = await client.get(url, headers=self.headers, params=params)
+            await record_response("fca", response)
             response.raise_for_status()
             return response.json()
 
@@ -28,7 +44,11 @@ class FcaClient:
         return await self.get("Search", params={"q": query, "type": type, "per_page": per_page})
 
     async def get_firm_details(self, frn: int):
-        return await self.get(f"Firm/{frn}")
+        from identity_links import record_fca_firm
+
+        details = await self.get(f"Firm/{frn}")
+        await record_fca_firm(frn, details)
+        return details
 
     async def get_firm_individuals(self, frn: int):
         return await self.get(f"Firm/{frn}/Individuals")
@@ -59,3 +79,14 @@ class FcaClient:
     
     async def get_individual_details(self, irn: str):
         return await self.get(f"Individuals/{irn}")
+
+
+_client: Optional[FcaClient] = None
+
+
+def get_fca_client() -> FcaClient:
+    """Shared FcaClient, built on first use"""
+    global _client
+    if _client is None:
+        _client = FcaClient()
+    return _client
@@ -0,0 +1,200 @@
+"""
+Persistent cross-reference index of FRN, company number and DUNS
+
+Finding out that FRN X is company number Y and DUNS Z used to take a name
+search against each register. Whenever a lookup confirms such a link it is
+recorded here (a local SQLite file), stored in both directions so it can be
+looked up from any identifier, and ``resolve`` follows links transitively.
+
+Links are confirmed by:
+
+- FCA firm details, which carry the firm's Companies House number
+- D&B profiles, whose registration numbers include the Companies House number
+
+Configured with ``IDENTITY_LINKS_PATH`` (``off`` disables it).
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("frn", "company_number", "duns")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    other_kind TEXT NOT NULL,
+    other_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    confirmed_at REAL NOT NULL,
+    PRIMARY KEY (kind, id, other_kind, other_id)
+) WITHOUT ROWID;
+"""
+
+# D&B code for a UK Companies House registration number
+DNB_UK_COMPANY_NUMBER = 2541
+
+
+def normalize(kind: str, value: Any) -> Optional[str]:
+    """Canonical form of an identifier, or ``None`` if it is empty or malformed"""
+    if value is None:
+        return None
+    text = str(value).strip().upper().replace(" ", "")
+    if not text:
+        return None
+    if kind == "frn":
+        return str(int(text)) if text.isdigit() else None
+    if kind == "company_number":
+        # Companies House numbers are 8 characters; digits-only ones are zero-padded
+        return text.zfill(8) if text.isdigit() else text
+    if kind == "duns":
+        digits = text.replace("-", "")
+        return digits.zfill(9) if digits.isdigit() else None
+    raise ValueError(f"Unknown identifier kind: {kind}")
+
+
+class IdentityLinks:
+    """SQLite store of confirmed links between identifiers"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # Links already written by this process, to skip repeat writes
+        self._seen: Set[Tuple[str, str, str, str]] = set()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def link(self, kind: str, value: Any, other_kind: str, other_value: Any, source: str) -> bool:
+        """Record that two identifiers belong to the same organisation; False if either is invalid"""
+        a, b = normalize(kind, value), normalize(other_kind, other_value)
+        if a is None or b is None or (kind, a) == (other_kind, b):
+            return False
+        if (kind, a, other_kind, b) in self._seen:
+            return True
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO links (kind, id, other_kind, other_id, source, confirmed_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, id, other_kind, other_id) DO UPDATE SET source = excluded.source, "
+                "confirmed_at = excluded.confirmed_at",
+                [(kind, a, other_kind, b, source, now), (other_kind, b, kind, a, source, now)]
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._seen.add((kind, a, other_kind, b))
+        return True
+
+    def _neighbours(self, kind: str, value: str) -> Iterator[Tuple[str, str, str, float]]:
+        yield from self._conn().execute(
+            "SELECT other_kind, other_id, source, confirmed_at FROM links WHERE kind = ? AND id = ?",
+            (kind, value)
+        )
+
+    def resolve(self, kind: str, value: Any, max_depth: int = 3) -> Dict[str, Any]:
+        """Every identifier reachable from one, with the links that connect them"""
+        start = normalize(kind, value)
+        identifiers: Dict[str, List[str]] = {k: [] for k in KINDS}
+        links: List[Dict[str, Any]] = []
+        if start is None:
+            return {**identifiers, "links": links}
+        identifiers[kind].append(start)
+        visited = {(kind, start)}
+        frontier = [(kind, start)]
+        for _ in range(max_depth):
+            next_frontier = []
+            for node_kind, node_id in frontier:
+                for other_kind, other_id, source, confirmed_at in self._neighbours(node_kind, node_id):
+                    if (other_kind, other_id) in visited:
+                        continue
+                    visited.add((other_kind, other_id))
+                    identifiers[other_kind].append(other_id)
+                    next_frontier.append((other_kind, other_id))
+                    links.append({
+                        "from": {node_kind: node_id},
+                        "to": {other_kind: other_id},
+                        "source": source,
+                        "confirmed_at": confirmed_at,
+                    })
+            frontier = next_frontier
+            if not frontier:
+                break
+        return {**identifiers, "links": links}
+
+
+def fca_company_number(details: Dict[str, Any]) -> Optional[str]:
+    """Companies House number from an FCA firm details response"""
+    firms = (details or {}).get("Data") or []
+    return firms[0].get("Companies House Number") if firms else None
+
+
+def dnb_company_numbers(profile: Any) -> List[str]:
+    """Companies House numbers among a D&B response's organisation identification numbers"""
+    numbers = []
+    stack = [profile]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for detail in node.get("OrganizationIdentificationNumberDetail") or []:
+                code = detail.get("@DNBCodeValue", detail.get("DNBCodeValue"))
+                if str(code) == str(DNB_UK_COMPANY_NUMBER) and detail.get("OrganizationIdentificationNumber"):
+                    numbers.append(detail["OrganizationIdentificationNumber"])
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(node)
+    return numbers
+
+
+async def record_fca_firm(frn: Any, details: Dict[str, Any]) -> None:
+    links = get_identity_links()
+    number = fca_company_number(details)
+    if links is None or not number:
+        return
+    try:
+        await asyncio.to_thread(links.link, "frn", frn, "company_number", number, "fca")
+    except sqlite3.Error as e:
+        logger.warning(f"Could not record FRN {frn} link: {e}")
+
+
+async def record_dnb_profile(duns: Any, profile: Dict[str, Any]) -> None:
+    links = get_identity_links()
+    if links is None:
+        return
+    for number in dnb_company_numbers(profile):
+        try:
+            await asyncio.to_thread(links.link, "duns", duns, "company_number", number, "dnb")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not record DUNS {duns} link: {e}")
+
+
+_links: Optional[IdentityLinks] = None
+_links_loaded = False
+
+
+def get_identity_links() -> Optional[IdentityLinks]:
+    """The identity link store, or ``None`` when ``IDENTITY_LINKS_PATH=off``"""
+    global _links, _links_loaded
+    if not _links_loaded:
+        _links_loaded = True
+        default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "identity_links.db")
+        path = os.getenv("IDENTITY_LINKS_PATH", default)
+        if path.lower() not in ("", "off", "false", "none"):
+            _links = IdentityLinks(path)
+    return _links
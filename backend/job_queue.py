@@ -0,0 +1,593 @@
+"""
+Durable job queue for bulk KYC enrichment
+
+A job is a list of items of one kind (``kyc_profile``, ``fca_firm`` ...);
+each item becomes a task. Worker processes (``job_worker.py``) lease tasks,
+keep the lease alive with heartbeats while they run, and record a result or
+an error. A task whose worker dies is leased again once the lease lapses;
+failed tasks are retried after a delay until ``max_attempts`` leases have
+been used. Jobs, tasks and results live in the store, so a run survives
+restarts of the API and of the workers.
+
+Tasks finish out of order, so each finished task is stamped with its place
+in the job's finish order (``finished``, from 1) and results are paged on
+that rather than on ``seq``: a page never skips a task that finishes later
+with a lower ``seq``.
+
+Two stores, chosen by ``JOB_QUEUE_URL``:
+
+- ``sqlite:///path/to/jobs.db`` (default ``backend/jobs.db``): one file,
+  shared by every process on the host.
+- ``redis://host:port/db``: any Redis-protocol server, shared by workers on
+  any number of hosts. Needs the ``redis`` package.
+
+Store methods are blocking; async callers run them with ``asyncio.to_thread``.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def _dumps(result: Any) -> str:
+    # Results may hold read-only mappings such as cached records (records.py)
+    return json.dumps(result, separators=(",", ":"), default=dict)
+
+
+class Task:
+    """One leased unit of work"""
+
+    def __init__(
+        self,
+        job_id: str,
+        seq: int,
+        kind: str,
+        payload: Dict[str, Any],
+        attempts: int,
+        max_attempts: int,
+        options: Optional[Dict[str, Any]] = None
+    ):
+        self.job_id = job_id
+        self.seq = seq
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.options = options or {}
+
+    @property
+    def final_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+    def __repr__(self) -> str:
+        return f"Task({self.job_id}:{self.seq} {self.kind} attempt {self.attempts}/{self.max_attempts})"
+
+
+def _job_summary(
+    job_id: str,
+    kind: str,
+    total: int,
+    succeeded: int,
+    failed: int,
+    cancelled: bool,
+    created_at: float,
+    options: Dict[str, Any]
+) -> Dict[str, Any]:
+    finished = succeeded + failed
+    if cancelled:
+        state = "cancelled"
+    elif finished >= total:
+        state = "completed"
+    else:
+        state = "running"
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "state": state,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "remaining": max(0, total - finished),
+        "created_at": created_at,
+        "options": options,
+    }
+
+
+class JobStore(ABC):
+    """Operations every job store provides"""
+
+    @abstractmethod
+    def create_job(
+        self,
+        kind: str,
+        items: List[Dict[str, Any]],
+        options: Optional[Dict[str, Any]] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> str:
+        """Store a job and queue one task per item; returns the job ID"""
+
+    @abstractmethod
+    def lease(self, worker: str, n: int, lease_seconds: float) -> List[Task]:
+        """Up to ``n`` runnable tasks, leased to ``worker``"""
+
+    @abstractmethod
+    def heartbeat(self, worker: str, lease_seconds: float) -> None:
+        """Extend the leases on every task ``worker`` holds"""
+
+    @abstractmethod
+    def complete(self, task: Task, worker: str, result: Any) -> bool:
+        """Record a task's result; False if the lease had already been lost"""
+
+    @abstractmethod
+    def fail(self, task: Task, worker: str, error: str, retry_in: Optional[float]) -> bool:
+        """Record a failure; retried after ``retry_in`` seconds unless it is None or attempts are used up"""
+
+    @abstractmethod
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job progress counts, or ``None`` for an unknown job"""
+
+    @abstractmethod
+    def results(self, job_id: str, after: int = -1, limit: int = 100) -> List[Dict[str, Any]]:
+        """Finished tasks with ``finished`` greater than ``after``, in the order they finished"""
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> bool:
+        """Stop leasing the job's remaining tasks; False for an unknown job"""
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    options TEXT NOT NULL,
+    max_attempts INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    finished INTEGER,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS tasks_runnable ON tasks (state, available_at);
+CREATE INDEX IF NOT EXISTS tasks_leases ON tasks (lease_owner) WHERE lease_owner IS NOT NULL;
+"""
+
+FINISHED_INDEX = "CREATE INDEX IF NOT EXISTS tasks_finished ON tasks (job_id, finished) WHERE finished IS NOT NULL"
+
+# A job's succeeded + failed counts are its finished tasks, so the next stamp
+# is one more; leasing and finishing are serialised by BEGIN IMMEDIATE
+NEXT_FINISHED = "(SELECT succeeded + failed + 1 FROM jobs WHERE id = ?)"
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a SQLite file; leasing is a ``BEGIN IMMEDIATE`` transaction"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        self._write(self._migrate)
+        conn.execute(FINISHED_INDEX)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _migrate(conn) -> None:
+        # Stores created before tasks carried their finish order: stamp the
+        # tasks already finished in seq order, which matches the job counts
+        if any(row[1] == "finished" for row in conn.execute("PRAGMA table_info(tasks)")):
+            return
+        conn.execute("ALTER TABLE tasks ADD COLUMN finished INTEGER")
+        conn.execute(
+            "UPDATE tasks SET finished = (SELECT COUNT(*) FROM tasks t WHERE t.job_id = tasks.job_id "
+            "AND t.seq <= tasks.seq AND t.state IN ('done', 'failed')) WHERE state IN ('done', 'failed')"
+        )
+
+    def _write(self, func, *args):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn, *args)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def create_job(self, kind, items, options=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        def insert(conn):
+            conn.execute(
+                "INSERT INTO jobs (id, kind, options, max_attempts, total, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(options or {}), max_attempts, len(items), now)
+            )
+            conn.executemany(
+                "INSERT INTO tasks (job_id, seq, payload, state, available_at) VALUES (?, ?, ?, 'pending', ?)",
+                ((job_id, seq, json.dumps(item), now) for seq, item in enumerate(items))
+            )
+
+        self._write(insert)
+        return job_id
+
+    def _reap(self, conn, now: float) -> None:
+        # Lapsed leases go back to pending, or fail if they have used every attempt
+        expired = conn.execute(
+            "SELECT t.job_id, t.seq, t.attempts >= j.max_attempts FROM tasks t JOIN jobs j ON j.id = t.job_id "
+            "WHERE t.state = 'leased' AND t.lease_expires < ?",
+            (now,)
+        ).fetchall()
+        for job_id, seq, exhausted in expired:
+            if exhausted:
+                conn.execute(
+                    "UPDATE tasks SET state = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                    f"error = 'lease expired', finished = {NEXT_FINISHED} WHERE job_id = ? AND seq = ?",
+                    (job_id, job_id, seq)
+                )
+                conn.execute("UPDATE jobs SET failed = failed + 1 WHERE id = ?", (job_id,))
+            else:
+                conn.execute(
+                    "UPDATE tasks SET state = 'pending', lease_owner = NULL, lease_expires = NULL, "
+                    "error = 'lease expired' WHERE job_id = ? AND seq = ?",
+                    (job_id, seq)
+                )
+
+    def lease(self, worker, n, lease_seconds):
+        def take(conn):
+            now = time.time()
+            self._reap(conn, now)
+            rows = conn.execute(
+                "SELECT t.job_id, t.seq, j.kind, t.payload, t.attempts, j.max_attempts, j.options "
+                "FROM tasks t JOIN jobs j ON j.id = t.job_id "
+                "WHERE t.state = 'pending' AND t.available_at <= ? AND j.cancelled = 0 "
+                "ORDER BY t.available_at LIMIT ?",
+                (now, n)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET state = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                "WHERE job_id = ? AND seq = ?",
+                ((worker, now + lease_seconds, job_id, seq) for job_id, seq, *_ in rows)
+            )
+            return [
+                Task(job_id, seq, kind, json.loads(payload), attempts + 1, max_attempts, json.loads(options))
+                for job_id, seq, kind, payload, attempts, max_attempts, options in rows
+            ]
+
+        return self._write(take)
+
+    def heartbeat(self, worker, lease_seconds):
+        self._write(lambda conn: conn.execute(
+            "UPDATE tasks SET lease_expires = ? WHERE lease_owner = ? AND state = 'leased'",
+            (time.time() + lease_seconds, worker)
+        ))
+
+    def _finish(self, conn, task: Task, worker: str, state: str, result: Any, error: Optional[str]) -> bool:
+        updated = conn.execute(
+            "UPDATE tasks SET state = ?, result = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+            f"finished = {NEXT_FINISHED} WHERE job_id = ? AND seq = ? AND state = 'leased' AND lease_owner = ?",
+            (state, None if result is None else _dumps(result), error, task.job_id, task.job_id, task.seq, worker)
+        ).rowcount
+        if updated:
+            column = "succeeded" if state == "done" else "failed"
+            conn.execute(f"UPDATE jobs SET {column} = {column} + 1 WHERE id = ?", (task.job_id,))
+        return bool(updated)
+
+    def complete(self, task, worker, result):
+        return self._write(self._finish, task, worker, "done", result, None)
+
+    def fail(self, task, worker, error, retry_in):
+        if retry_in is None or task.final_attempt:
+            return self._write(self._finish, task, worker, "failed", None, error)
+        return self._write(lambda conn: bool(conn.execute(
+            "UPDATE tasks SET state = 'pending', available_at = ?, error = ?, lease_owner = NULL, "
+            "lease_expires = NULL WHERE job_id = ? AND seq = ? AND state = 'leased' AND lease_owner = ?",
+            (time.time() + retry_in, error, task.job_id, task.seq, worker)
+        ).rowcount))
+
+    def status(self, job_id):
+        row = self._conn().execute(
+            "SELECT id, kind, total, succeeded, failed, cancelled, created_at, options FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        *fields, options = row
+        return _job_summary(*fields[:5], bool(fields[5]), fields[6], json.loads(options))
+
+    def results(self, job_id, after=-1, limit=100):
+        rows = self._conn().execute(
+            "SELECT seq, finished, state, payload, result, error, attempts FROM tasks "
+            "WHERE job_id = ? AND finished > ? ORDER BY finished LIMIT ?",
+            (job_id, after, limit)
+        )
+        return [
+            {
+                "seq": seq,
+                "finished": finished,
+                "state": state,
+                "input": json.loads(payload),
+                "result": json.loads(result) if result is not None else None,
+                "error": error,
+                "attempts": attempts,
+            }
+            for seq, finished, state, payload, result, error, attempts in rows
+        ]
+
+    def cancel(self, job_id):
+        def mark(conn):
+            if not conn.execute("UPDATE jobs SET cancelled = 1 WHERE id = ?", (job_id,)).rowcount:
+                return False
+            conn.execute("UPDATE tasks SET state = 'cancelled' WHERE job_id = ? AND state = 'pending'", (job_id,))
+            return True
+
+        return self._write(mark)
+
+
+# Takes the job's next finish-order stamp and indexes the task under it
+STAMP_FINISHED = """
+local stamp = redis.call('HINCRBY', KEYS[1], 'finished', 1)
+redis.call('ZADD', KEYS[2], stamp, ARGV[1])
+return stamp
+"""
+
+
+class RedisJobStore(JobStore):
+    """
+    Job store on a Redis-protocol server, for workers on several hosts
+
+    Runnable tasks are a list that workers ``LMOVE`` from into a per-worker
+    processing list, so a task is handed to exactly one worker. A worker's
+    heartbeat is a key with an expiry; once it lapses, any worker moves the
+    dead worker's processing list back onto the queue. Retries wait in a
+    sorted set scored by the time they become due. Finished tasks are indexed
+    per job in a sorted set scored by their place in the finish order, taken
+    from a counter on the job by the same script that adds them, so the
+    scores become visible in order.
+    """
+
+    def __init__(self, url: str, prefix: str = "kycjobs:"):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._last_reap = 0.0
+        self._stamp_finished = self.redis.register_script(STAMP_FINISHED)
+
+    def _key(self, *parts: Any) -> str:
+        return self.prefix + ":".join(str(part) for part in parts)
+
+    @staticmethod
+    def _member(job_id: str, seq: int) -> str:
+        return f"{job_id}:{seq}"
+
+    def create_job(self, kind, items, options=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        job_id = uuid.uuid4().hex
+        self.redis.hset(self._key("job", job_id), mapping={
+            "kind": kind,
+            "options": json.dumps(options or {}),
+            "max_attempts": max_attempts,
+            "total": len(items),
+            "succeeded": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "created_at": time.time(),
+        })
+        for start in range(0, len(items), 1000):
+            pipe = self.redis.pipeline(transaction=False)
+            for seq in range(start, min(start + 1000, len(items))):
+                pipe.hset(self._key("task", job_id, seq), mapping={
+                    "payload": json.dumps(items[seq]),
+                    "state": "pending",
+                    "attempts": 0,
+                })
+                pipe.rpush(self._key("pending"), self._member(job_id, seq))
+            pipe.execute()
+        return job_id
+
+    def _promote_due(self) -> None:
+        due = self.redis.zrangebyscore(self._key("delayed"), "-inf", time.time(), start=0, num=100)
+        for member in due:
+            # ZREM is the claim: only the worker that removes it requeues it
+            if self.redis.zrem(self._key("delayed"), member):
+                self.redis.rpush(self._key("pending"), member)
+
+    def _reap(self, lease_seconds: float) -> None:
+        now = time.time()
+        if now - self._last_reap < lease_seconds / 2:
+            return
+        self._last_reap = now
+        for worker in self.redis.smembers(self._key("workers")):
+            worker = worker.decode()
+            if self.redis.exists(self._key("worker", worker)):
+                continue
+            processing = self._key("processing", worker)
+            while self.redis.lmove(processing, self._key("pending"), "RIGHT", "LEFT") is not None:
+                pass
+            self.redis.srem(self._key("workers"), worker)
+
+    def _jobs(self, job_ids: Iterable[str]) -> Dict[str, Dict[bytes, bytes]]:
+        job_ids = list(set(job_ids))
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(self._key("job", job_id))
+        return dict(zip(job_ids, pipe.execute()))
+
+    def lease(self, worker, n, lease_seconds):
+        self.heartbeat(worker, lease_seconds)
+        self.redis.sadd(self._key("workers"), worker)
+        self._promote_due()
+        self._reap(lease_seconds)
+
+        processing = self._key("processing", worker)
+        claimed = []
+        for _ in range(n):
+            member = self.redis.lmove(self._key("pending"), processing, "LEFT", "RIGHT")
+            if member is None:
+                break
+            job_id, seq = member.decode().rsplit(":", 1)
+            claimed.append((member, job_id, int(seq)))
+        if not claimed:
+            return []
+
+        jobs = self._jobs(job_id for _, job_id, _ in claimed)
+        tasks = []
+        for member, job_id, seq in claimed:
+            job = jobs[job_id]
+            task_key = self._key("task", job_id, seq)
+            state = self.redis.hget(task_key, "state")
+            if not job or state in (b"done", b"failed", b"cancelled"):
+                # Already finished (e.g. requeued by a reap that raced its completion)
+                self.redis.lrem(processing, 1, member)
+                continue
+            if job[b"cancelled"] == b"1":
+                self.redis.hset(task_key, "state", "cancelled")
+                self.redis.lrem(processing, 1, member)
+                continue
+            attempts = self.redis.hincrby(task_key, "attempts", 1)
+            max_attempts = int(job[b"max_attempts"])
+            task = Task(
+                job_id, seq, job[b"kind"].decode(), json.loads(self.redis.hget(task_key, "payload")),
+                attempts, max_attempts, json.loads(job[b"options"])
+            )
+            if attempts > max_attempts:
+                # Its earlier leases all lapsed without an outcome
+                task.attempts = max_attempts
+                self.redis.hset(task_key, mapping={"state": "leased", "attempts": max_attempts})
+                self._record(task, worker, "failed", None, "lease expired")
+                continue
+            self.redis.hset(task_key, "state", "leased")
+            tasks.append(task)
+        return tasks
+
+    def heartbeat(self, worker, lease_seconds):
+        self.redis.set(self._key("worker", worker), 1, px=int(lease_seconds * 1000))
+
+    def _record(self, task: Task, worker: str, state: str, result: Any, error: Optional[str]) -> bool:
+        # Removing it from the processing list is the lease check
+        if not self.redis.lrem(self._key("processing", worker), 1, self._member(task.job_id, task.seq)):
+            return False
+        fields = {"state": state}
+        if result is not None:
+            fields["result"] = _dumps(result)
+        if error is not None:
+            fields["error"] = error
+        pipe = self.redis.pipeline()
+        pipe.hset(self._key("task", task.job_id, task.seq), mapping=fields)
+        if error is None:
+            pipe.hdel(self._key("task", task.job_id, task.seq), "error")
+        pipe.hincrby(self._key("job", task.job_id), "succeeded" if state == "done" else "failed", 1)
+        self._stamp_finished(
+            keys=[self._key("job", task.job_id), self._key("finished", task.job_id)], args=[task.seq], client=pipe
+        )
+        pipe.execute()
+        return True
+
+    def complete(self, task, worker, result):
+        return self._record(task, worker, "done", result, None)
+
+    def fail(self, task, worker, error, retry_in):
+        if retry_in is None or task.final_attempt:
+            return self._record(task, worker, "failed", None, error)
+        member = self._member(task.job_id, task.seq)
+        if not self.redis.lrem(self._key("processing", worker), 1, member):
+            return False
+        pipe = self.redis.pipeline()
+        pipe.hset(self._key("task", task.job_id, task.seq), mapping={"state": "pending", "error": error})
+        pipe.zadd(self._key("delayed"), {member: time.time() + retry_in})
+        pipe.execute()
+        return True
+
+    def status(self, job_id):
+        job = self.redis.hgetall(self._key("job", job_id))
+        if not job:
+            return None
+        return _job_summary(
+            job_id,
+            job[b"kind"].decode(),
+            int(job[b"total"]),
+            int(job[b"succeeded"]),
+            int(job[b"failed"]),
+            job[b"cancelled"] == b"1",
+            float(job[b"created_at"]),
+            json.loads(job[b"options"]),
+        )
+
+    def results(self, job_id, after=-1, limit=100):
+        finished = self.redis.zrangebyscore(
+            self._key("finished", job_id), f"({after}", "+inf", start=0, num=limit, withscores=True
+        )
+        pipe = self.redis.pipeline(transaction=False)
+        for seq, _ in finished:
+            pipe.hmget(self._key("task", job_id, int(seq)), ["state", "payload", "result", "error", "attempts"])
+        rows = []
+        for (seq, stamp), (state, payload, result, error, attempts) in zip(finished, pipe.execute()):
+            rows.append({
+                "seq": int(seq),
+                "finished": int(stamp),
+                "state": state.decode(),
+                "input": json.loads(payload),
+                "result": json.loads(result) if result is not None else None,
+                "error": error.decode() if error is not None else None,
+                "attempts": int(attempts),
+            })
+        return rows
+
+    def cancel(self, job_id):
+        if not self.redis.exists(self._key("job", job_id)):
+            return False
+        # Queued tasks are dropped as workers reach them
+        self.redis.hset(self._key("job", job_id), "cancelled", 1)
+        return True
+
+
+def open_store(url: str) -> JobStore:
+    """A job store from a ``sqlite:///path`` or ``redis://`` URL"""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisJobStore(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteJobStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported JOB_QUEUE_URL: {url}")
+
+
+def default_url() -> str:
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.db")
+    return os.getenv("JOB_QUEUE_URL", f"sqlite:///{path}")
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        _store = open_store(default_url())
+    return _store
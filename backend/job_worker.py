@@ -0,0 +1,280 @@
+"""
+Worker processes for the job queue (see ``job_queue.py``)
+
+Each process leases up to ``--concurrency`` tasks at a time, runs them with
+the same clients as the API (FCA and Companies House directly, D&B and
+LexisNexis through their services), renews its leases on a heartbeat and
+records each outcome. Run as many processes per host, and as many hosts, as
+the upstream limits allow::
+
+    python job_worker.py --processes 4 --concurrency 8
+
+Tasks run in the batch lane against the host's FCA and Companies House rate
+budgets (``rate_limit.py``), which the API's workers share: they only use
+the part of each limit interactive requests leave free, and give way while
+an interactive request on the host waits. Workers on other hosts have their
+own budgets, so set ``FCA_RATE_LIMIT`` / ``CH_RATE_LIMIT`` on each host to
+its share of the upstream limit.
+
+A task is retried with exponential backoff when it fails with a timeout, a
+connection error, a 429 or a 5xx; other 4xx responses and invalid input fail
+it straight away. On SIGTERM / SIGINT a worker stops leasing, finishes what
+it holds and exits; anything it cannot finish is leased again elsewhere once
+its lease lapses.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from admission import BATCH, current_lane
+from deadline import within
+from job_queue import JobStore, Task, default_url, open_store
+
+logger = logging.getLogger(__name__)
+
+# Seconds a task may run before it is abandoned, unless the job says otherwise
+DEFAULT_TASK_TIMEOUT = 30.0
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 300.0
+
+
+class IncompleteResult(Exception):
+    """A task produced a result worth retrying for a better one"""
+
+
+async def _kyc_profile(payload: Dict[str, Any], task: Task) -> Any:
+    import kyc
+
+    request = kyc.ProfileRequest(
+        payload.get("frn"),
+        payload.get("company_number"),
+        payload.get("duns"),
+        payload.get("name"),
+        payload.get("country", "GB"),
+        payload.get("dnb_product", "DCP_STD"),
+    )
+    profile = await kyc.build_profile(request, float(task.options.get("deadline_ms", 8000)) / 1000)
+    if not profile["complete"] and not task.final_attempt:
+        failed = [source for source, result in profile["sources"].items() if result["status"] not in ("ok", "skipped")]
+        raise IncompleteResult(f"Sources did not complete: {', '.join(failed)}")
+    return profile
+
+
+async def _fca_firm(payload: Dict[str, Any], task: Task) -> Any:
+    from fca_client import get_fca_client
+
+    return await get_fca_client().get_firm_details(int(payload["frn"]))
+
+
+async def _ch_company(payload: Dict[str, Any], task: Task) -> Any:
+    from companies_house_client import get_ch_client
+
+    client = get_ch_client()
+    number = str(payload["company_number"]).upper()
+    profile, officers, psc = await asyncio.gather(
+        client.get_company_profile(number),
+        client.get_company_officers(number),
+        client.get_company_psc(number),
+    )
+    return {"profile": profile, "officers": officers, "psc": psc}
+
+
+async def _dnb_profile(payload: Dict[str, Any], task: Task) -> Any:
+    from identity_links import record_dnb_profile
+    from service_clients import get_dnb_service
+
+    profile = await get_dnb_service().get_company_profile(str(payload["duns"]), payload.get("product_code", "DCP_STD"))
+    await record_dnb_profile(payload["duns"], profile)
+    return profile
+
+
+async def _screen_entity(payload: Dict[str, Any], task: Task) -> Any:
+    from service_clients import get_lexisnexis_service
+
+    return await get_lexisnexis_service().screen_entity(
+        payload.get("reference_id") or f"JOB-{task.job_id[:8].upper()}-{task.seq}",
+        payload["name"],
+        payload.get("country"),
+        payload.get("registration_number"),
+    )
+
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any], Task], Awaitable[Any]]] = {
+    "kyc_profile": _kyc_profile,
+    "fca_firm": _fca_firm,
+    "ch_company": _ch_company,
+    "dnb_profile": _dnb_profile,
+    "screen_entity": _screen_entity,
+}
+
+# Payload keys a task of each kind must have at least one of
+REQUIRED_FIELDS = {
+    "kyc_profile": ("frn", "company_number", "duns", "name"),
+    "fca_firm": ("frn",),
+    "ch_company": ("company_number",),
+    "dnb_profile": ("duns",),
+    "screen_entity": ("name",),
+}
+
+
+def invalid_items(kind: str, items: Any) -> Optional[str]:
+    """Why a job's items cannot be queued, or ``None`` if they can"""
+    if kind not in HANDLERS:
+        return f"Unknown job kind '{kind}'; expected one of {', '.join(HANDLERS)}"
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or not any(item.get(field) for field in REQUIRED_FIELDS[kind]):
+            return f"Item {i} needs one of: {', '.join(REQUIRED_FIELDS[kind])}"
+    return None
+
+
+def retry_delay(error: BaseException, task: Task) -> Optional[float]:
+    """Seconds to wait before retrying after ``error``, or ``None`` if retrying cannot help"""
+    import httpx
+    from service_clients import ServiceError
+
+    status = None
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    elif isinstance(error, ServiceError):
+        status = error.status_code
+    if status is not None and 400 <= status < 500 and status != 429:
+        return None
+    if isinstance(error, (KeyError, ValueError, TypeError)):
+        return None
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (task.attempts - 1))
+    return random.uniform(delay / 2, delay)
+
+
+class Worker:
+    """Leases and runs tasks for one process"""
+
+    def __init__(self, store: JobStore, concurrency: int = 8, lease_seconds: float = 60.0, poll_interval: float = 1.0):
+        self.store = store
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.running: Set[asyncio.Task] = set()
+        self.stopping = asyncio.Event()
+        self.completed = 0
+        self.failed = 0
+        # Store calls get their own threads so heartbeats never queue behind
+        # DNS lookups and other work in the default executor
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-store")
+
+    async def _store(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    async def run_task(self, task: Task) -> None:
+        current_lane.set(BATCH)
+        timeout = float(task.options.get("task_timeout", DEFAULT_TASK_TIMEOUT))
+        try:
+            with within(timeout):
+                result = await asyncio.wait_for(HANDLERS[task.kind](task.payload, task), timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            delay = retry_delay(e, task)
+            logger.warning(f"{task} failed: {error}" + ("" if delay is None else f"; retrying in {delay:.0f} s"))
+            await self._store(self.store.fail, task, self.worker_id, error, delay)
+            self.failed += 1
+            return
+        if not await self._store(self.store.complete, task, self.worker_id, result):
+            logger.warning(f"{task} finished after its lease was lost; result discarded")
+        self.completed += 1
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self._store(self.store.heartbeat, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed: {e}")
+
+    async def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} started ({self.concurrency} concurrent tasks)")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self.stopping.is_set():
+                free = self.concurrency - len(self.running)
+                tasks = []
+                if free > 0:
+                    try:
+                        tasks = await self._store(self.store.lease, self.worker_id, free, self.lease_seconds)
+                    except Exception as e:
+                        logger.warning(f"Could not lease tasks: {e}")
+                for task in tasks:
+                    running = asyncio.create_task(self.run_task(task))
+                    self.running.add(running)
+                    running.add_done_callback(self.running.discard)
+                if not tasks:
+                    # Queue empty or no free slots: wait for a slot, a stop or the next poll
+                    stop = asyncio.create_task(self.stopping.wait())
+                    await asyncio.wait(
+                        {stop, *self.running}, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    stop.cancel()
+            if self.running:
+                logger.info(f"Worker {self.worker_id} finishing {len(self.running)} tasks")
+                await asyncio.wait(self.running)
+        finally:
+            heartbeat.cancel()
+            self._executor.shutdown(wait=False)
+            logger.info(f"Worker {self.worker_id} stopped: {self.completed} completed, {self.failed} failed")
+
+
+async def _serve(queue_url: str, concurrency: int, lease_seconds: float) -> None:
+    worker = Worker(open_store(queue_url), concurrency, lease_seconds)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stopping.set)
+    await worker.run()
+
+
+def run_process(queue_url: str, concurrency: int, lease_seconds: float) -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(name)s %(message)s")
+    asyncio.run(_serve(queue_url, concurrency, lease_seconds))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run job queue workers")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=8, help="Tasks in flight per process")
+    parser.add_argument("--lease-seconds", type=float, default=60.0)
+    parser.add_argument("--queue-url", default=default_url())
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_process(args.queue_url, args.concurrency, args.lease_seconds)
+        return
+    processes = [
+        multiprocessing.Process(target=run_process, args=(args.queue_url, args.concurrency, args.lease_seconds))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Children get the same SIGINT from the terminal; SIGTERM is passed on
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes])
+    for process in processes:
+        while process.is_alive():
+            try:
+                process.join()
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    main()
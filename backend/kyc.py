@@ -0,0 +1,231 @@
+"""
+Unified KYC profile: FCA, Companies House, D&B and LexisNexis in parallel
+
+One onboarding profile used to take separate calls to every service, so its
+latency was the sum of all sources. ``build_profile`` starts every source the
+given identifiers allow at once and waits for them under a single deadline;
+each source reports its own status and latency, and a slow or failing source
+does not hold up or fail the others.
+
+Identifiers that were not given are filled in from the identity link index
+(``identity_links.py``) when it knows exactly one match, so the profile can
+fetch them directly instead of searching by name.
+
+Screening needs a name: if none is given it is taken from the Companies House
+profile or, failing that, the FCA firm details.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from deadline import remaining as budget_remaining, within
+from fca_client import get_fca_client
+from companies_house_client import get_ch_client
+from identity_links import KINDS, get_identity_links, record_dnb_profile
+from records import encode
+from service_clients import get_dnb_service, get_lexisnexis_service
+
+SOURCES = ("fca", "companies_house", "dnb", "lexisnexis")
+
+# Time kept back from the request budget to assemble and send a partial profile
+RESPONSE_MARGIN = 0.05
+
+
+def _effective_deadline(requested: float) -> float:
+    left = budget_remaining()
+    return requested if left is None else max(0.0, min(requested, left - RESPONSE_MARGIN))
+
+
+class ProfileRequest:
+    """Identifiers for one KYC profile"""
+
+    def __init__(
+        self,
+        frn: Optional[int] = None,
+        company_number: Optional[str] = None,
+        duns: Optional[str] = None,
+        name: Optional[str] = None,
+        country: str = "GB",
+        dnb_product: str = "DCP_STD"
+    ):
+        self.frn = frn
+        self.company_number = company_number.upper() if company_number else None
+        self.duns = duns
+        self.name = name
+        self.country = country
+        self.dnb_product = dnb_product
+        self.reference_id = f"KYC-{uuid.uuid4().hex[:12].upper()}"
+        # Identifiers filled in from the link index rather than given
+        self.resolved: Dict[str, str] = {}
+
+    def identifiers(self) -> Dict[str, Any]:
+        return {
+            "frn": self.frn,
+            "company_number": self.company_number,
+            "duns": self.duns,
+            "name": self.name,
+            "country": self.country,
+            "resolved": self.resolved,
+        }
+
+
+async def _fill_from_links(request: ProfileRequest) -> None:
+    links = get_identity_links()
+    if links is None:
+        return
+    for kind in KINDS:
+        value = getattr(request, kind)
+        if value is None:
+            continue
+        found = await asyncio.to_thread(links.resolve, kind, value)
+        for other in KINDS:
+            if getattr(request, other) is None and len(found[other]) == 1:
+                match = found[other][0]
+                setattr(request, other, int(match) if other == "frn" else match)
+                request.resolved[other] = match
+
+
+async def _fca(request: ProfileRequest) -> Dict[str, Any]:
+    return await get_fca_client().get_firm_details(request.frn)
+
+
+async def _companies_house(request: ProfileRequest) -> Dict[str, Any]:
+    client = get_ch_client()
+    profile, officers, psc = await asyncio.gather(
+        client.get_company_profile(request.company_number),
+        client.get_company_officers(request.company_number),
+        client.get_company_psc(request.company_number),
+    )
+    return {"profile": profile, "officers": officers, "psc": psc}
+
+
+async def _dnb(request: ProfileRequest) -> Dict[str, Any]:
+    profile = await get_dnb_service().get_company_profile(request.duns, request.dnb_product)
+    await record_dnb_profile(request.duns, profile)
+    return profile
+
+
+def _name_from(source: str, data: Dict[str, Any]) -> Optional[str]:
+    if source == "companies_house":
+        return (data.get("profile") or {}).get("company_name")
+    if source == "fca":
+        firms = data.get("Data") or []
+        return firms[0].get("Organisation Name") if firms else None
+    return None
+
+
+class _Fanout:
+    """The running source tasks for one profile"""
+
+    def __init__(self, request: ProfileRequest):
+        self.request = request
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    async def _timed(self, source: str, call: Callable[[ProfileRequest], Awaitable[Any]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            data = await call(self.request)
+            result = {"status": "ok", "data": data}
+        except Exception as e:
+            result = {"status": "error", "error": str(e) or type(e).__name__}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.results[source] = result
+        return result
+
+    async def _lexisnexis(self, request: ProfileRequest) -> Dict[str, Any]:
+        name = request.name
+        if not name:
+            # Take the registered name: Companies House first, then the FCA
+            for source in ("companies_house", "fca"):
+                task = self.tasks.get(source)
+                if task is None:
+                    continue
+                result = await asyncio.shield(task)
+                if result["status"] == "ok":
+                    name = _name_from(source, result["data"])
+                if name:
+                    break
+        if not name:
+            raise ValueError("No name to screen: pass name, or an FRN / company number that resolves")
+        return await get_lexisnexis_service().screen_entity(
+            request.reference_id, name, request.country, request.company_number
+        )
+
+    def start(self) -> None:
+        request = self.request
+        calls = {
+            "fca": _fca if request.frn else None,
+            "companies_house": _companies_house if request.company_number else None,
+            "dnb": _dnb if request.duns else None,
+            "lexisnexis": self._lexisnexis if (request.name or request.frn or request.company_number) else None,
+        }
+        for source in SOURCES:
+            call = calls[source]
+            if call is None:
+                self.results[source] = {"status": "skipped", "latency_ms": 0.0}
+            else:
+                self.tasks[source] = asyncio.create_task(self._timed(source, call))
+
+    def cancel_pending(self, deadline_ms: float) -> None:
+        for source, task in self.tasks.items():
+            if not task.done():
+                task.cancel()
+                self.results[source] = {"status": "timeout", "latency_ms": deadline_ms}
+
+    def summary(self, started: float, include_data: bool = True) -> Dict[str, Any]:
+        sources = {
+            source: self.results[source] if include_data
+            else {k: v for k, v in self.results[source].items() if k != "data"}
+            for source in SOURCES
+        }
+        return {
+            "referenceId": self.request.reference_id,
+            "identifiers": self.request.identifiers(),
+            "sources": sources,
+            "complete": all(self.results[s]["status"] in ("ok", "skipped") for s in SOURCES),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+
+async def build_profile(request: ProfileRequest, deadline: float) -> Dict[str, Any]:
+    """Merged profile once every source has answered or the deadline (seconds) has passed"""
+    started = time.perf_counter()
+    deadline = _effective_deadline(deadline)
+    await _fill_from_links(request)
+    fanout = _Fanout(request)
+    # Source tasks inherit the deadline, so sibling services are told about it
+    with within(deadline):
+        fanout.start()
+    if fanout.tasks:
+        await asyncio.wait(fanout.tasks.values(), timeout=deadline)
+    fanout.cancel_pending(deadline * 1000)
+    return fanout.summary(started)
+
+
+async def stream_profile(request: ProfileRequest, deadline: float) -> AsyncIterator[bytes]:
+    """NDJSON: one line per source as it completes, then the profile summary without the data"""
+    started = time.perf_counter()
+    deadline = _effective_deadline(deadline)
+    await _fill_from_links(request)
+    fanout = _Fanout(request)
+    # Source tasks inherit the deadline, so sibling services are told about it
+    with within(deadline):
+        fanout.start()
+    pending = set(fanout.tasks.values())
+    by_task = {task: source for source, task in fanout.tasks.items()}
+    loop_deadline = time.monotonic() + deadline
+    try:
+        while pending:
+            remaining = loop_deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = by_task[task]
+                yield encode({"source": source, **fanout.results[source]}) + b"\n"
+    finally:
+        fanout.cancel_pending(deadline * 1000)
+    yield encode({"profile": fanout.summary(started, include_data=False)}) + b"\n"
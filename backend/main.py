@@ -1,12 +1,33 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fca_client import FcaClient
-from companies_house_client import CompaniesHouseClient
-import uvicorn
+# Clients are built on first use so that a new worker can bind its port
+# without paying for httpx or dotenv up front.
+from fca_client import get_fca_client
+from companies_house_client import get_ch_client
+import prefetch
+import kyc
+import identity_links
+import job_queue
+import job_worker
+from deadline import DeadlineExceededError, DeadlineMiddleware
+import admission
+import sse
+from projection import Projection, fields_param, project
+from records import RecordResponse
 
 app = FastAPI(title="FCA Register API Wrapper")
 
+# X-Priority / ADMISSION_BATCH_ROUTES: batch requests queue, overload is shed with 503
+app.add_middleware(admission.AdmissionMiddleware)
+
+# X-Request-Budget-Ms / budget_ms: abandon the request with a 504 once it is spent
+app.add_middleware(DeadlineMiddleware)
+
 # Enable CORS for the frontend
 app.add_middleware(
     CORSMiddleware,
@@ -16,119 +37,207 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-fca_client = FcaClient()
-ch_client = CompaniesHouseClient()
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded(request: Request, exc: DeadlineExceededError):
+    """The same 504 the deadline middleware sends when a budget runs out"""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy"}
 
 @app.get("/api/search")
-async def search(q: str, type: str = "firm", per_page: int = 10):
+async def search(q: str, type: str = "firm", per_page: int = 10, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.search(q, type, per_page)
+        results = await get_fca_client().search(q, type, per_page)
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if type == "firm":
+        prefetch.schedule_firms(results)
+    return RecordResponse(project(results, fields))
+
+@app.get("/api/admission/stats")
+async def admission_stats():
+    from rate_limit import get_budget
+
+    return {
+        "lanes": admission.stats(),
+        "budgets": {
+            upstream: await asyncio.to_thread(get_budget(upstream).snapshot) for upstream in ("fca", "ch")
+        },
+    }
+
+@app.get("/api/prefetch/stats")
+async def prefetch_stats():
+    return await asyncio.to_thread(prefetch.stats)
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """This worker's in-process record cache"""
+    from memory_cache import get_memory_cache
+
+    memory = get_memory_cache()
+    return {"memory": memory.stats() if memory is not None else None}
+
 @app.get("/api/firm/{frn}")
-async def firm_details(frn: int):
+async def firm_details(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        details = await fca_client.get_firm_details(frn)
-        return details
+        details = await get_fca_client().get_firm_details(frn)
+        return RecordResponse(project(details, fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/individuals")
-async def firm_individuals(frn: int):
+async def firm_individuals(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_individuals(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_individuals(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/permissions")
-async def firm_permissions(frn: int):
+async def firm_permissions(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_permissions(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_permissions(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/address")
-async def firm_address(frn: int):
+async def firm_address(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_address(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_address(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/requirements")
-async def firm_requirements(frn: int):
+async def firm_requirements(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_requirements(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_requirements(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/regulators")
-async def firm_regulators(frn: int):
+async def firm_regulators(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_regulators(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_regulators(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/passports")
-async def firm_passports(frn: int):
+async def firm_passports(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_passports(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_passports(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/disciplinary")
-async def firm_disciplinary(frn: int):
+async def firm_disciplinary(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_disciplinary(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_disciplinary(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/waivers")
-async def firm_waivers(frn: int):
+async def firm_waivers(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_waivers(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_waivers(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/firm/{frn}/names")
-async def firm_names(frn: int):
+async def firm_names(frn: int, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        return await fca_client.get_firm_names(frn)
+        return RecordResponse(project(await get_fca_client().get_firm_names(frn), fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/firm/{frn}/stream")
+async def firm_details_stream(frn: int):
+    """Every firm section as a Server-Sent Event as soon as it arrives, then a summary"""
+    client = get_fca_client()
+    return sse.section_stream({
+        "details": lambda: client.get_firm_details(frn),
+        "individuals": lambda: client.get_firm_individuals(frn),
+        "permissions": lambda: client.get_firm_permissions(frn),
+        "address": lambda: client.get_firm_address(frn),
+        "requirements": lambda: client.get_firm_requirements(frn),
+        "regulators": lambda: client.get_firm_regulators(frn),
+        "passports": lambda: client.get_firm_passports(frn),
+        "disciplinary": lambda: client.get_firm_disciplinary(frn),
+        "waivers": lambda: client.get_firm_waivers(frn),
+        "names": lambda: client.get_firm_names(frn),
+    })
+
 # Companies House Routes
 @app.get("/api/companies/search")
-async def search_companies(q: str, per_page: int = 10):
+async def search_companies(q: str, per_page: int = 10, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        data = await ch_client.search_companies(q, per_page)
-        return data
+        data = await get_ch_client().search_companies(q, per_page)
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         print(f"Companies House Search Error: {str(e)}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    prefetch.schedule_companies(data)
+    return RecordResponse(project(data, fields))
 
 @app.get("/api/companies/{company_number}")
-async def company_details(company_number: str):
+async def company_details(company_number: str, fields: Optional[Projection] = Depends(fields_param)):
     try:
-        profile = await ch_client.get_company_profile(company_number)
-        officers = await ch_client.get_company_officers(company_number)
-        history = await ch_client.get_filing_history(company_number)
-        psc = await ch_client.get_company_psc(company_number)
-        return {
+        profile = await get_ch_client().get_company_profile(company_number)
+        officers = await get_ch_client().get_company_officers(company_number)
+        history = await get_ch_client().get_filing_history(company_number)
+        psc = await get_ch_client().get_company_psc(company_number)
+        return RecordResponse(project({
             "profile": profile,
             "officers": officers,
             "filing_history": history,
             "psc": psc
-        }
+        }, fields))
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/companies/{company_number}/stream")
+async def company_details_stream(company_number: str):
+    """Every company section as a Server-Sent Event as soon as it arrives, then a summary"""
+    client = get_ch_client()
+    return sse.section_stream({
+        "profile": lambda: client.get_company_profile(company_number),
+        "officers": lambda: client.get_company_officers(company_number),
+        "filing_history": lambda: client.get_filing_history(company_number),
+        "psc": lambda: client.get_company_psc(company_number),
+    })
+
 @app.get("/api/companies/download/{document_id}")
 async def download_document(document_id: str):
     try:
-        pdf_content = await ch_client.get_document(document_id)
+        pdf_content = await get_ch_client().get_document(document_id)
         
         # Create a generator to stream the content
         def iterfile():
@@ -139,10 +248,93 @@ async def download_document(document_id: str):
             media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename=document_{document_id}.pdf"}
         )
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         print(f"Download Error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to download document. Please check the document ID and try again.")
 
+# Unified KYC profile
+@app.get("/api/kyc/profile")
+async def kyc_profile(
+    frn: Optional[int] = None,
+    company_number: Optional[str] = None,
+    duns: Optional[str] = None,
+    name: Optional[str] = None,
+    country: str = "GB",
+    dnb_product: str = "DCP_STD",
+    deadline_ms: int = Query(8000, ge=100, le=60000),
+    stream: bool = False
+):
+    """FCA, Companies House, D&B and LexisNexis for one subject, fetched in parallel under one deadline"""
+    if not any([frn, company_number, duns, name]):
+        raise HTTPException(status_code=400, detail="Provide at least one of frn, company_number, duns or name")
+    request = kyc.ProfileRequest(frn, company_number, duns, name, country, dnb_product)
+    if stream:
+        return StreamingResponse(kyc.stream_profile(request, deadline_ms / 1000), media_type="application/x-ndjson")
+    return RecordResponse(await kyc.build_profile(request, deadline_ms / 1000))
+
+
+@app.get("/api/identity/resolve")
+async def resolve_identity(frn: Optional[int] = None, company_number: Optional[str] = None, duns: Optional[str] = None):
+    """Identifiers linked to an FRN, company number or DUNS, as confirmed by earlier lookups"""
+    given = {kind: value for kind, value in (("frn", frn), ("company_number", company_number), ("duns", duns)) if value}
+    if len(given) != 1:
+        raise HTTPException(status_code=400, detail="Provide exactly one of frn, company_number or duns")
+    links = identity_links.get_identity_links()
+    if links is None:
+        raise HTTPException(status_code=503, detail="Identity link index is disabled")
+    kind, value = given.popitem()
+    resolved = await asyncio.to_thread(links.resolve, kind, value)
+    if not resolved["links"]:
+        raise HTTPException(status_code=404, detail=f"No links recorded for {kind} {value}")
+    return resolved
+
+
+# Bulk jobs, run by job_worker.py processes
+class JobRequest(BaseModel):
+    kind: str
+    items: List[Dict[str, Any]] = Field(..., min_length=1)
+    options: Dict[str, Any] = {}
+    max_attempts: int = Field(job_queue.DEFAULT_MAX_ATTEMPTS, ge=1, le=10)
+
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(job: JobRequest):
+    """Queue one task per item; poll the returned job for progress and results"""
+    problem = job_worker.invalid_items(job.kind, job.items)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
+    store = job_queue.get_job_store()
+    job_id = await asyncio.to_thread(store.create_job, job.kind, job.items, job.options, job.max_attempts)
+    return {"job_id": job_id, "total": len(job.items)}
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    status = await asyncio.to_thread(job_queue.get_job_store().status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return status
+
+
+@app.get("/api/jobs/{job_id}/results")
+async def job_results(job_id: str, after: int = -1, limit: int = Query(100, ge=1, le=1000)):
+    """Finished tasks in the order they finished; pass ``next_after`` back as ``after`` for the next page"""
+    store = job_queue.get_job_store()
+    if await asyncio.to_thread(store.status, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    results = await asyncio.to_thread(store.results, job_id, after, limit)
+    return {"job_id": job_id, "results": results, "next_after": results[-1]["finished"] if results else after}
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    if not await asyncio.to_thread(job_queue.get_job_store().cancel, job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return await asyncio.to_thread(job_queue.get_job_store().status, job_id)
+
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,105 @@
+"""
+In-process cache of compact records in front of the host-shared cache
+
+A hit in the host-shared cache (``shared_cache.py``) still reads SQLite and
+parses JSON. Each worker also keeps recently used payloads in memory as
+compact records (``records.py``), which take about half the memory of the
+parsed dicts and share interned strings across entries. Routes encode them
+straight to JSON.
+
+Entries live for ``MEMORY_CACHE_TTL`` seconds (default 60, kept short
+because workers do not see each other's copies) and the least recently
+used are evicted beyond ``MEMORY_CACHE_MB`` (default 64; ``0`` disables
+the cache).
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from records import compact, sizeof
+
+
+class MemoryCache:
+    """LRU of compact records with a byte budget"""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, record: Any) -> None:
+        size = sizeof(record)
+        if size > self.max_bytes // 4:
+            # One payload should not flush most of the cache
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, record, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+async def cached_get(namespace: str, endpoint: str, params: Optional[dict], fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """A client GET through the in-process and host-shared caches, as a compact record"""
+    import prefetch
+    from shared_cache import cache_key, get_shared_cache
+
+    shared = get_shared_cache()
+    memory = get_memory_cache()
+    key = cache_key(namespace, endpoint, params)
+    if shared is not None:
+        await prefetch.observe(key)
+    if memory is not None:
+        record = memory.get(key)
+        if record is not None:
+            return record
+    data = await (fetch() if shared is None else shared.get_or_fetch(key, fetch))
+    record = compact(data)
+    if memory is not None:
+        memory.set(key, record)
+    return record
+
+
+_cache: Optional[MemoryCache] = None
+_cache_loaded = False
+
+
+def get_memory_cache() -> Optional[MemoryCache]:
+    """This worker's record cache, or ``None`` when ``MEMORY_CACHE_MB=0``"""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        _cache_loaded = True
+        max_mb = float(os.getenv("MEMORY_CACHE_MB", "64"))
+        if max_mb > 0:
+            _cache = MemoryCache(int(max_mb * 1024 * 1024), float(os.getenv("MEMORY_CACHE_TTL", "60")))
+    return _cache
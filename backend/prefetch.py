@@ -0,0 +1,164 @@
+"""
+Predictive prefetch of firm and company details from search results
+
+Users nearly always open one of the top few search hits, so after a search
+the top ``PREFETCH_TOP_N`` results are fetched in the background into the
+host-shared cache (see ``shared_cache.py``): firm details for an FCA search,
+and the profile, officers, filing history and PSCs for a Companies House
+search. The detail page then loads from cache.
+
+Prefetching only spends spare rate budget: a call is made only while it
+leaves ``PREFETCH_RESERVE`` (a fraction of the limit) free for interactive
+requests, and it stops for the rest of the batch once that is not the case.
+The budget is the host's (see ``rate_limit.py``), so spare means no worker
+on the host is using it.
+
+Enabled with ``PREFETCH_ENABLED=true``; requires the shared cache. Counters
+are kept in the shared cache so hits are seen whichever worker serves them.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+from contextvars import ContextVar
+from typing import Any, Dict, List, Set
+
+from admission import BATCH, current_lane
+from rate_limit import get_budget
+from shared_cache import cache_key, get_shared_cache
+
+logger = logging.getLogger(__name__)
+
+# Set while the prefetcher itself is calling the clients
+prefetching: ContextVar[bool] = ContextVar("prefetching", default=False)
+
+MARKER_PREFIX = "prefetched:"
+COUNTERS = ("issued", "hits", "skipped_cached", "skipped_budget", "failed")
+
+_tasks: Set[asyncio.Task] = set()
+
+
+def enabled() -> bool:
+    return os.getenv("PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes") and get_shared_cache() is not None
+
+
+def _top_n() -> int:
+    return int(os.getenv("PREFETCH_TOP_N", "3"))
+
+
+def _reserve() -> float:
+    return float(os.getenv("PREFETCH_RESERVE", "0.5"))
+
+
+def fca_targets(results: Dict[str, Any]) -> List[str]:
+    """FRNs of the top firms in an FCA search response"""
+    frns = []
+    for item in (results or {}).get("Data") or []:
+        frn = item.get("Reference Number")
+        if frn and str(frn).isdigit():
+            frns.append(str(frn))
+    return frns[:_top_n()]
+
+
+def ch_targets(results: Dict[str, Any]) -> List[str]:
+    """Company numbers of the top companies in a Companies House search response"""
+    numbers = [item["company_number"] for item in (results or {}).get("items") or [] if item.get("company_number")]
+    return numbers[:_top_n()]
+
+
+def _consume_marker(cache, key: str) -> None:
+    if cache.get(MARKER_PREFIX + key) is not None:
+        cache.delete(MARKER_PREFIX + key)
+        cache.incr("prefetch.hits")
+
+
+async def observe(key: str) -> None:
+    """Called for every interactive client lookup; counts hits on prefetched keys"""
+    if prefetching.get() or not enabled():
+        return
+    try:
+        await asyncio.to_thread(_consume_marker, get_shared_cache(), key)
+    except Exception as e:
+        logger.debug(f"Prefetch bookkeeping failed: {e}")
+
+
+async def _prefetch(upstream: str, endpoints: List[str], fetch) -> None:
+    cache = get_shared_cache()
+    budget = get_budget(upstream)
+    reserve = _reserve()
+    token = prefetching.set(True)
+    # Prefetch calls queue behind interactive ones for rate budget
+    current_lane.set(BATCH)
+    try:
+        for endpoint in endpoints:
+            key = cache_key(upstream, endpoint)
+            if await asyncio.to_thread(cache.get, key) is not None:
+                await asyncio.to_thread(cache.incr, "prefetch.skipped_cached")
+                continue
+            if not await asyncio.to_thread(budget.has_spare, reserve):
+                await asyncio.to_thread(cache.incr, "prefetch.skipped_budget")
+                break
+            try:
+                await fetch(endpoint)
+            except Exception as e:
+                logger.debug(f"Prefetch of {key} failed: {e}")
+                await asyncio.to_thread(cache.incr, "prefetch.failed")
+                continue
+            await asyncio.to_thread(cache.set, MARKER_PREFIX + key, b"1")
+            await asyncio.to_thread(cache.incr, "prefetch.issued")
+    finally:
+        prefetching.reset(token)
+
+
+def _schedule(upstream: str, endpoints: List[str], fetch) -> None:
+    if not endpoints:
+        return
+    # A fresh context, so the task does not inherit the search request's deadline
+    task = contextvars.Context().run(asyncio.create_task, _prefetch(upstream, endpoints, fetch))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def schedule_firms(results: Dict[str, Any]) -> None:
+    """Warm firm details for the top hits of an FCA search"""
+    if not enabled():
+        return
+    from fca_client import get_fca_client
+
+    endpoints = [f"Firm/{frn}" for frn in fca_targets(results)]
+    _schedule("fca", endpoints, get_fca_client().get)
+
+
+def schedule_companies(results: Dict[str, Any]) -> None:
+    """Warm everything ``/api/companies/{number}`` loads for the top hits of a Companies House search"""
+    if not enabled():
+        return
+    from companies_house_client import get_ch_client
+
+    endpoints = []
+    for number in ch_targets(results):
+        endpoints += [
+            f"company/{number}",
+            f"company/{number}/officers",
+            f"company/{number}/filing-history",
+            f"company/{number}/persons-with-significant-control",
+        ]
+    _schedule("ch", endpoints, get_ch_client().get)
+
+
+def stats() -> Dict[str, Any]:
+    """Host-wide prefetch counters and rate budgets"""
+    cache = get_shared_cache()
+    counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+    if enabled():
+        stored = cache.counters("prefetch.")
+        counters.update({name: stored.get(f"prefetch.{name}", 0) for name in COUNTERS})
+    issued = counters["issued"]
+    return {
+        "enabled": enabled(),
+        **counters,
+        "hit_rate": round(counters["hits"] / issued, 3) if issued else None,
+        "in_flight": len(_tasks),
+        "budgets": {upstream: get_budget(upstream).snapshot() for upstream in ("fca", "ch")},
+    }
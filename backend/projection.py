@@ -0,0 +1,151 @@
+"""
+Sparse fieldsets: ``fields=`` projection of JSON responses
+
+The FCA and Companies House payloads carry far more than a caller usually
+shows. A ``fields`` query parameter keeps only the listed paths, applied to
+the response before it is serialized:
+
+- ``fields=Data.FRN,Data.Organisation Name``: paths are dot-separated keys;
+  lists are walked implicitly, so ``Data.FRN`` keeps ``FRN`` in every
+  element of ``Data`` (``Data[].FRN`` and ``Data[*].FRN`` mean the same)
+- ``fields=items(transaction_id,date,description)``: parentheses group
+  several sub-paths under one prefix, and may nest
+- ``*`` matches any key, e.g. ``Data.*.Customer Type`` for the FCA
+  permissions object, which is keyed by permission name
+
+A path that selects an object or list keeps all of it. Keys that are not
+present are skipped. Parsed projections are cached per ``fields`` string, so
+a repeated shape costs only the walk over the data.
+"""
+
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Query
+
+WILDCARD = "*"
+
+# A projection tree: key -> subtree, where None keeps the whole value
+Tree = Optional[Dict[str, Any]]
+
+
+def _split(spec: str) -> List[str]:
+    """Top-level comma-separated terms, leaving commas inside parentheses alone"""
+    terms, depth, start = [], 0, 0
+    for i, char in enumerate(spec):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                raise ValueError("Unbalanced ')' in fields")
+        elif char == "," and depth == 0:
+            terms.append(spec[start:i])
+            start = i + 1
+    if depth:
+        raise ValueError("Unbalanced '(' in fields")
+    terms.append(spec[start:])
+    return terms
+
+
+def _segments(path: str) -> List[str]:
+    segments = []
+    for segment in path.split("."):
+        segment = segment.strip()
+        if segment.endswith("[*]"):
+            segment = segment[:-3]
+        elif segment.endswith("[]"):
+            segment = segment[:-2]
+        if not segment:
+            raise ValueError(f"Empty key in fields path '{path}'")
+        if "(" in segment or ")" in segment:
+            raise ValueError(f"Misplaced parenthesis in fields path '{path}'")
+        segments.append(segment)
+    return segments
+
+
+def _merge(tree: Dict[str, Any], segments: List[str], subtree: Tree) -> None:
+    node = tree
+    for i, key in enumerate(segments):
+        last = i == len(segments) - 1
+        if key in node and node[key] is None:
+            # Already keeping the whole value
+            return
+        if last:
+            if subtree is None:
+                node[key] = None
+            else:
+                existing = node.setdefault(key, {})
+                for sub_key, sub_tree in subtree.items():
+                    _merge(existing, [sub_key], sub_tree)
+        else:
+            node = node.setdefault(key, {})
+
+
+def _parse(spec: str) -> Dict[str, Any]:
+    tree: Dict[str, Any] = {}
+    for term in _split(spec):
+        term = term.strip()
+        if not term:
+            continue
+        subtree: Tree = None
+        if term.endswith(")"):
+            open_at = term.index("(")
+            subtree = _parse(term[open_at + 1:-1])
+            if not subtree:
+                raise ValueError(f"Empty group in fields term '{term}'")
+            term = term[:open_at]
+        _merge(tree, _segments(term), subtree)
+    return tree
+
+
+class Projection:
+    """A parsed ``fields`` expression"""
+
+    def __init__(self, spec: str, tree: Dict[str, Any]):
+        self.spec = spec
+        self.tree = tree
+
+    def __call__(self, data: Any) -> Any:
+        return _apply(data, self.tree)
+
+
+def _apply(data: Any, tree: Tree) -> Any:
+    if tree is None:
+        return data
+    if isinstance(data, (list, tuple)):
+        return [_apply(item, tree) for item in data]
+    if not isinstance(data, Mapping):
+        return data
+    if WILDCARD in tree:
+        default = tree[WILDCARD]
+        return {key: _apply(value, tree.get(key, default)) for key, value in data.items()}
+    return {key: _apply(data[key], subtree) for key, subtree in tree.items() if key in data}
+
+
+@lru_cache(maxsize=1024)
+def parse(spec: str) -> Projection:
+    """The projection for a ``fields`` string; raises ``ValueError`` if it is malformed"""
+    tree = _parse(spec)
+    if not tree:
+        raise ValueError("fields lists no paths")
+    return Projection(spec, tree)
+
+
+def project(data: Any, projection: Optional[Projection]) -> Any:
+    return data if projection is None else projection(data)
+
+
+def fields_param(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated paths to keep, e.g. Data.FRN,Data.Organisation Name or items(name,date)"
+    )
+) -> Optional[Projection]:
+    """FastAPI dependency: the request's projection, or ``None`` to return everything"""
+    if fields is None or not fields.strip():
+        return None
+    try:
+        return parse(fields.strip())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {e}")
@@ -0,0 +1,286 @@
+"""
+Rate budget tracking for the FCA and Companies House APIs
+
+The FCA Register allows 10 requests per 10 seconds and Companies House 600
+per 5 minutes. Each client acquires a slot before every upstream call (cache
+hits do not count), waiting for the window to free one rather than drawing a
+429. Interactive requests may use the whole limit and go first; batch
+requests (see ``admission.py``) may only use the share left after
+``INTERACTIVE_RESERVE``, and background work such as prefetching checks
+``has_spare`` before spending anything. Limits can be overridden with
+``FCA_RATE_LIMIT`` / ``CH_RATE_LIMIT`` as ``requests/seconds``.
+
+The limits are the account's, so the window is kept for the whole host: the
+calls in it, and the interactive calls waiting for it, live in a small SQLite
+database (WAL mode, ``RATE_LIMIT_PATH``) that every API worker and job worker
+books from. Batch calls in any process give way while an interactive call in
+any process waits. A path of ``off``, or a database error, tracks the window
+per process instead.
+
+A call whose wait would outlast the request's deadline (see ``deadline.py``)
+fails at once with ``DeadlineExceededError`` (504) rather than waiting.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from admission import INTERACTIVE, current_lane
+from deadline import DeadlineExceededError, remaining as budget_remaining
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMITS = {
+    "fca": "10/10",
+    "ch": "600/300",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    budget TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_budget_at ON calls (budget, at);
+CREATE TABLE IF NOT EXISTS pauses (
+    budget TEXT PRIMARY KEY,
+    until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS waiting (
+    id TEXT PRIMARY KEY,
+    budget TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Seconds between checks while giving way to interactive calls
+YIELD_INTERVAL = 0.01
+# An interactive call's waiting mark lapses this long after its last check,
+# so a process that dies while waiting does not hold batch calls back
+WAITING_TTL = 5.0
+
+
+class RateBudget:
+    """Sliding-window count of upstream calls against a rate limit, shared by the host's processes"""
+
+    def __init__(self, limit: int, window: float, path: Optional[str] = None, name: str = ""):
+        self.limit = limit
+        self.window = window
+        self.path = path
+        self.name = name
+        self._calls: Deque[float] = deque()
+        self._paused_until = 0.0
+        self._local = threading.local()
+        self.interactive_reserve = float(os.getenv("INTERACTIVE_RESERVE", "0.3"))
+        self._waiting = {INTERACTIVE: 0}
+        if path is not None:
+            try:
+                self._conn().executescript(SCHEMA)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared rate budget unavailable, limiting this process only: {e}")
+                self.path = None
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; transactions are managed explicitly"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0] <= now - self.window:
+            self._calls.popleft()
+
+    def _wait_for(self, count: int, oldest: Optional[float], paused_until: float, ceiling: float, now: float) -> float:
+        """Seconds until a call may go, 0 if it may go now"""
+        if paused_until > now:
+            return paused_until - now
+        if count >= ceiling:
+            return (oldest + self.window - now) if oldest is not None else YIELD_INTERVAL
+        return 0.0
+
+    def _take_shared(self, ceiling: float, now: float, waiter: Optional[str]) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if waiter is None and conn.execute(
+                "SELECT 1 FROM waiting WHERE budget = ? AND expires_at > ? LIMIT 1", (self.name, now)
+            ).fetchone():
+                conn.execute("COMMIT")
+                return YIELD_INTERVAL
+            conn.execute("DELETE FROM calls WHERE budget = ? AND at <= ?", (self.name, now - self.window))
+            count, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(at) FROM calls WHERE budget = ?", (self.name,)
+            ).fetchone()
+            row = conn.execute("SELECT until FROM pauses WHERE budget = ?", (self.name,)).fetchone()
+            wait = self._wait_for(count, oldest, row[0] if row else 0.0, ceiling, now)
+            if wait <= 0:
+                conn.execute("INSERT INTO calls (budget, at) VALUES (?, ?)", (self.name, now))
+                if waiter is not None:
+                    conn.execute("DELETE FROM waiting WHERE id = ?", (waiter,))
+            elif waiter is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO waiting (id, budget, expires_at) VALUES (?, ?, ?)",
+                    (waiter, self.name, now + WAITING_TTL)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def take(self, ceiling: float, waiter: Optional[str] = None) -> float:
+        """
+        Take a slot if fewer than ``ceiling`` calls are in the window; else the seconds to wait
+
+        ``waiter`` identifies an interactive call: while it waits, calls without
+        one give way to it.
+        """
+        now = time.time()
+        if self.path is not None:
+            try:
+                return self._take_shared(ceiling, now, waiter)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared rate budget unavailable, limiting this process only: {e}")
+        self._prune(now)
+        wait = self._wait_for(len(self._calls), self._calls[0] if self._calls else None, self._paused_until,
+                              ceiling, now)
+        if wait <= 0:
+            self._calls.append(now)
+        return wait
+
+    def _forget(self, waiter: str) -> None:
+        try:
+            self._conn().execute("DELETE FROM waiting WHERE id = ?", (waiter,))
+        except sqlite3.Error:
+            pass  # The mark lapses on its own
+
+    async def acquire(self) -> None:
+        """Wait for a slot in the window for the current lane, then take it"""
+        lane = current_lane.get()
+        ceiling = self.limit if lane == INTERACTIVE else self.limit * (1.0 - self.interactive_reserve)
+        waiter = uuid.uuid4().hex if lane == INTERACTIVE else None
+        self._waiting[lane] = self._waiting.get(lane, 0) + 1
+        # A slot taken clears the call's waiting mark in the same transaction
+        marked = taken = False
+        try:
+            while True:
+                # Other lanes give way while interactive calls are waiting
+                if lane != INTERACTIVE and self._waiting[INTERACTIVE] > 0:
+                    wait = YIELD_INTERVAL
+                elif self.path is None:
+                    wait = self.take(ceiling, waiter)
+                else:
+                    wait = await asyncio.to_thread(self.take, ceiling, waiter)
+                if wait <= 0:
+                    taken = True
+                    return
+                marked = waiter is not None
+                left = budget_remaining()
+                if left is not None and wait > left:
+                    raise DeadlineExceededError(
+                        f"Request budget exhausted: next {self.name} rate limit slot is {wait:.1f} s away"
+                    )
+                await asyncio.sleep(min(max(wait, YIELD_INTERVAL), 1.0))
+        finally:
+            self._waiting[lane] -= 1
+            if marked and not taken and self.path is not None:
+                await asyncio.to_thread(self._forget, waiter)
+
+    def pause(self, seconds: float) -> None:
+        """Treat the budget as exhausted, e.g. after the upstream answered 429"""
+        until = time.time() + seconds
+        self._paused_until = max(self._paused_until, until)
+        if self.path is not None:
+            try:
+                self._conn().execute(
+                    "INSERT INTO pauses (budget, until) VALUES (?, ?) "
+                    "ON CONFLICT(budget) DO UPDATE SET until = MAX(until, excluded.until)",
+                    (self.name, until)
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not pause the shared rate budget: {e}")
+
+    def _state(self):
+        """
+        Calls in the window and when the pause ends, host-wide where shared
+
+        Reads the shared database, so async callers run ``in_use``, ``has_spare``
+        and ``snapshot`` with ``asyncio.to_thread``.
+        """
+        now = time.time()
+        if self.path is not None:
+            try:
+                conn = self._conn()
+                count = conn.execute(
+                    "SELECT COUNT(*) FROM calls WHERE budget = ? AND at > ?", (self.name, now - self.window)
+                ).fetchone()[0]
+                row = conn.execute("SELECT until FROM pauses WHERE budget = ?", (self.name,)).fetchone()
+                return count, max(self._paused_until, row[0] if row else 0.0), now
+            except sqlite3.Error:
+                pass
+        self._prune(now)
+        return len(self._calls), self._paused_until, now
+
+    def in_use(self) -> int:
+        return self._state()[0]
+
+    def has_spare(self, reserve: float = 0.0) -> bool:
+        """True if a call now would leave ``reserve`` of the window's limit unused, host-wide"""
+        count, paused_until, now = self._state()
+        if now < paused_until:
+            return False
+        return count + 1 <= self.limit * (1.0 - reserve)
+
+    def snapshot(self) -> Dict[str, float]:
+        count, paused_until, now = self._state()
+        return {
+            "limit": self.limit,
+            "window_seconds": self.window,
+            "shared": self.path is not None,
+            "in_use": count,
+            "waiting": dict(self._waiting),
+            "paused_for": round(max(0.0, paused_until - now), 3),
+        }
+
+
+_budgets: Dict[str, RateBudget] = {}
+
+
+def _path() -> Optional[str]:
+    path = os.getenv("RATE_LIMIT_PATH", os.path.join(tempfile.gettempdir(), "kyc-backend-ratelimit.db"))
+    return None if path.lower() in ("", "off", "false", "none") else path
+
+
+def get_budget(upstream: str) -> RateBudget:
+    """The rate budget for ``fca`` or ``ch``"""
+    budget = _budgets.get(upstream)
+    if budget is None:
+        spec = os.getenv(f"{upstream.upper()}_RATE_LIMIT", DEFAULT_LIMITS[upstream])
+        limit, window = spec.split("/")
+        budget = _budgets[upstream] = RateBudget(int(limit), float(window), _path(), upstream)
+    return budget
+
+
+async def record_response(upstream: str, response) -> None:
+    """Pause the budget when the upstream answers 429, for its Retry-After"""
+    budget = get_budget(upstream)
+    if response.status_code == 429:
+        try:
+            retry_after = float(response.headers.get("Retry-After", budget.window))
+        except ValueError:
+            retry_after = budget.window
+        if budget.path is None:
+            budget.pause(retry_after)
+        else:
+            # A write to the shared database can wait on other processes: keep it off the event loop
+            await asyncio.to_thread(budget.pause, retry_after)
@@ -0,0 +1,196 @@
+"""
+Compact read-only records for cached FCA and Companies House payloads
+
+A payload from ``response.json()`` is a tree of dicts and lists, and every
+dict carries its own hash table of keys. The FCA and Companies House
+payloads repeat the same few key sets (every officer, filing and permission
+entry looks alike) and the same short strings ("Retail (Investment)",
+"active", "director") over and over. ``compact`` turns a payload into:
+
+- ``Record``: a ``__slots__`` object holding a shared ``Shape`` (the key
+  tuple, built once per distinct key set) and a tuple of values
+- tuples in place of lists
+- interned short strings, so repeats share one object
+
+A ``Record`` is a read-only ``Mapping``, so code that reads payloads with
+``[]``, ``.get`` or iteration works on it unchanged. ``encode`` writes JSON
+straight from records, using each shape's pre-encoded keys, and
+``RecordResponse`` sends it without FastAPI's ``jsonable_encoder`` pass.
+"""
+
+import sys
+from collections.abc import Mapping
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Iterator, List, Tuple
+
+from fastapi.responses import Response
+
+# Strings up to this long are interned; longer ones (descriptions, URLs) rarely repeat
+INTERN_MAX_LENGTH = 64
+
+
+class Shape:
+    """The ordered keys shared by every record with the same key set"""
+
+    __slots__ = ("keys", "index", "prefixes")
+
+    def __init__(self, keys: Tuple[str, ...]):
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
+        # '{"a":' for the first key, ',"b":' for the rest
+        self.prefixes = tuple(
+            ("{" if i == 0 else ",") + encode_basestring_ascii(key) + ":" for i, key in enumerate(keys)
+        )
+
+
+_shapes: Dict[Tuple[str, ...], Shape] = {}
+
+
+def _shape(keys: Tuple[str, ...]) -> Shape:
+    shape = _shapes.get(keys)
+    if shape is None:
+        shape = _shapes[keys] = Shape(tuple(sys.intern(key) for key in keys))
+    return shape
+
+
+class Record(Mapping):
+    """A compact, read-only JSON object"""
+
+    __slots__ = ("_shape", "_values")
+
+    def __init__(self, shape: Shape, values: Tuple[Any, ...]):
+        self._shape = shape
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._shape.index[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self._shape.index.get(key)
+        return default if i is None else self._values[i]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._shape.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._shape.keys)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def keys(self):
+        return self._shape.keys
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return zip(self._shape.keys, self._values)
+
+    def __repr__(self) -> str:
+        return f"Record({dict(self.items())!r})"
+
+
+def compact(value: Any) -> Any:
+    """A JSON payload as records, tuples and interned strings"""
+    if isinstance(value, dict):
+        return Record(_shape(tuple(value)), tuple(compact(v) for v in value.values()))
+    if isinstance(value, list):
+        return tuple(compact(v) for v in value)
+    if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+def expand(value: Any) -> Any:
+    """Plain dicts and lists again, for code that needs to modify a payload"""
+    if isinstance(value, Mapping):
+        return {key: expand(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [expand(v) for v in value]
+    return value
+
+
+def _float(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+
+def _encode(value: Any, out: List[str]) -> None:
+    if isinstance(value, str):
+        out.append(encode_basestring_ascii(value))
+    elif isinstance(value, Record):
+        if not value._values:
+            out.append("{}")
+            return
+        for prefix, v in zip(value._shape.prefixes, value._values):
+            out.append(prefix)
+            _encode(v, out)
+        out.append("}")
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            out.append("[]")
+            return
+        separator = "["
+        for v in value:
+            out.append(separator)
+            _encode(v, out)
+            separator = ","
+        out.append("]")
+    elif value is None:
+        out.append("null")
+    elif value is True:
+        out.append("true")
+    elif value is False:
+        out.append("false")
+    elif isinstance(value, int):
+        out.append(int.__repr__(value))
+    elif isinstance(value, float):
+        out.append(_float(value))
+    elif isinstance(value, Mapping):
+        if not value:
+            out.append("{}")
+            return
+        separator = "{"
+        for key, v in value.items():
+            out.append(separator + encode_basestring_ascii(str(key)) + ":")
+            _encode(v, out)
+            separator = ","
+        out.append("}")
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode(value: Any) -> bytes:
+    """JSON for records, plain dicts and lists alike (same output as ``json.dumps`` without spaces)"""
+    out: List[str] = []
+    _encode(value, out)
+    return "".join(out).encode("ascii")
+
+
+def sizeof(value: Any, _seen: set = None) -> int:
+    """Approximate bytes held by a payload, counting shared objects once"""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, Record):
+        size += sys.getsizeof(value._values) + sum(sizeof(v, seen) for v in value._values)
+    elif isinstance(value, dict):
+        size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(sizeof(v, seen) for v in value)
+    return size
+
+
+class RecordResponse(Response):
+    """JSON response encoded straight from records"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode(content)
@@ -0,0 +1,93 @@
+"""
+HTTP clients for the sibling D&B and LexisNexis services
+
+The D&B and LexisNexis wrappers are separate FastAPI apps (each with its own
+top-level ``app`` package), so the backend reaches ``DNBClient`` and the
+Bridger screening client through their REST APIs rather than importing them.
+Base URLs come from ``DNB_SERVICE_URL`` and ``LEXISNEXIS_SERVICE_URL``.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+
+class ServiceError(Exception):
+    """A sibling service answered with an error status"""
+
+    def __init__(self, service: str, status_code: int, message: str):
+        self.service = service
+        self.status_code = status_code
+        super().__init__(f"{service} returned {status_code}: {message}")
+
+
+class ServiceClient:
+    name = "service"
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    async def request(self, method: str, path: str, **kwargs) -> Any:
+        import httpx
+        import deadline
+
+        # The service gets what is left of this request's budget
+        headers = {**kwargs.pop("headers", {}), **deadline.headers()}
+        async with httpx.AsyncClient(timeout=deadline.timeout(self.timeout)) as client:
+            response = await client.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+        if response.status_code >= 400:
+            try:
+                body = response.json()
+                message = body.get("message") or body.get("detail") or response.text
+            except ValueError:
+                message = response.text
+            raise ServiceError(self.name, response.status_code, str(message))
+        return response.json()
+
+
+class DnbServiceClient(ServiceClient):
+    """D&B Direct wrapper (``D&B API``)"""
+    name = "dnb"
+
+    async def get_company_profile(self, duns: str, product_code: str = "DCP_STD") -> Dict[str, Any]:
+        return await self.request(
+            "GET", f"/api/v1/companies/{duns}/profile", params={"product_code": product_code}
+        )
+
+
+class LexisNexisServiceClient(ServiceClient):
+    """Bridger XG screening wrapper (``LexisNexis API``)"""
+    name = "lexisnexis"
+
+    async def screen_entity(
+        self,
+        reference_id: str,
+        entity_name: str,
+        country: Optional[str] = None,
+        registration_number: Optional[str] = None
+    ) -> Dict[str, Any]:
+        payload = {
+            "referenceId": reference_id,
+            "entityName": entity_name,
+            "country": country,
+            "registrationNumber": registration_number,
+        }
+        return await self.request("POST", "/api/v1/screen/entity", json=payload)
+
+
+_dnb: Optional[DnbServiceClient] = None
+_lexisnexis: Optional[LexisNexisServiceClient] = None
+
+
+def get_dnb_service() -> DnbServiceClient:
+    global _dnb
+    if _dnb is None:
+        _dnb = DnbServiceClient(os.getenv("DNB_SERVICE_URL", "http://localhost:8001"))
+    return _dnb
+
+
+def get_lexisnexis_service() -> LexisNexisServiceClient:
+    global _lexisnexis
+    if _lexisnexis is None:
+        _lexisnexis = LexisNexisServiceClient(os.getenv("LEXISNEXIS_SERVICE_URL", "http://localhost:8002"))
+    return _lexisnexis
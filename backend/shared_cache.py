@@ -0,0 +1,341 @@
+"""
+Host-local response cache shared by all workers
+
+gunicorn runs several uvicorn workers per host; an in-process cache would be
+warmed once per worker. This cache lives in a local SQLite database in WAL
+mode, so every worker on the host reads the same entries concurrently while
+writes are serialized by SQLite.
+
+- Entries expire after a TTL and the database is kept under a size limit by
+  evicting expired, then least recently used, entries.
+- Writes (value, size accounting, eviction, lease release) happen in one
+  transaction, so readers never see a partial update.
+- ``get_or_fetch`` takes a short lease on a missing key so that only one
+  worker on the host calls the upstream; the others wait for its result.
+
+Configured with ``SHARED_CACHE_PATH`` (``off`` disables it),
+``SHARED_CACHE_TTL`` (seconds) and ``SHARED_CACHE_MAX_MB``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('total_bytes', 0);
+"""
+
+# Recency is only rewritten when it is older than this, so reads rarely write
+ACCESS_RESOLUTION = 30.0
+# How often a worker waiting on another worker's fetch re-checks the cache
+POLL_INTERVAL = 0.05
+
+
+class SharedCache:
+    """SQLite-backed cache shared by every worker process on the host"""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        lease_timeout: float = 30.0
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.lease_timeout = lease_timeout
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "waited": 0}
+        self._local = threading.local()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; transactions are managed explicitly"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Synchronous primitives (run in a worker thread from async code)
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes for a key, or ``None`` if missing or expired"""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        if now - row[2] > ACCESS_RESOLUTION:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a value and release any lease on the key, atomically"""
+        if len(value) > self.max_bytes // 10:
+            logger.debug(f"Not caching {key}: {len(value)} bytes is too large")
+            self.release_lease(key)
+            return
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now + (ttl if ttl is not None else self.default_ttl), now)
+            )
+            conn.execute(
+                "UPDATE meta SET value = value + ? WHERE name = 'total_bytes'",
+                (len(value) - (old[0] if old else 0),)
+            )
+            conn.execute("DELETE FROM leases WHERE key = ?", (key,))
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, key: str) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.execute("UPDATE meta SET value = value - ? WHERE name = 'total_bytes'", (row[0],))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Add to a host-wide counter"""
+        self._conn().execute(
+            "INSERT INTO meta (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def counters(self, prefix: str) -> Dict[str, int]:
+        rows = self._conn().execute(
+            "SELECT name, value FROM meta WHERE name LIKE ?", (prefix.replace("%", "") + "%",)
+        ).fetchall()
+        return dict(rows)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Bring the cache back under 90% of its size limit (inside a write transaction)"""
+        total = conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        total -= conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ?", (now,)
+        ).fetchone()[0]
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+
+        target = self.max_bytes * 0.9
+        while total > target:
+            rows = conn.execute("SELECT key, size FROM entries ORDER BY accessed_at LIMIT 256").fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                total -= size
+                if total <= target:
+                    break
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        conn.execute("UPDATE meta SET value = ? WHERE name = 'total_bytes'", (max(total, 0),))
+
+    def try_lease(self, key: str) -> bool:
+        """Claim the right to fetch a key; fails while another owner's lease is live"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now and row[0] != self.owner:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + self.lease_timeout)
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release_lease(self, key: str) -> None:
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def lease_held(self, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM leases WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        cached = await asyncio.to_thread(self.get, key)
+        return json.loads(cached) if cached is not None else None
+
+    async def set_json(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.set, key, json.dumps(value, separators=(",", ":")).encode("utf-8"), ttl)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Return the cached JSON value for a key, fetching it at most once per host
+
+        Coroutines in this worker share one in-flight fetch; other workers wait
+        on the lease and pick the value up from the database. A cache failure
+        never fails the request: the upstream is called directly instead.
+        """
+        try:
+            cached = await self.get_json(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache read failed, bypassing: {e}")
+            return await fetch()
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The fetching request ran out of time, not this one: try again
+                return await self.get_or_fetch(key, fetch, ttl)
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fetch_once(key, fetch, ttl)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark the exception as retrieved when nobody else was waiting
+                future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def _fetch_once(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        from deadline import remaining as budget_remaining
+
+        # Wait for another worker's fetch no longer than the request's budget allows
+        left = budget_remaining()
+        wait = self.lease_timeout if left is None else min(self.lease_timeout, left)
+        deadline = time.monotonic() + wait
+        try:
+            while time.monotonic() < deadline:
+                if await asyncio.to_thread(self.try_lease, key):
+                    try:
+                        value = await fetch()
+                    except BaseException:
+                        await asyncio.to_thread(self.release_lease, key)
+                        raise
+                    await self._store(key, value, ttl)
+                    return value
+
+                # Another worker is fetching this key: wait for its result
+                self.stats["waited"] += 1
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(POLL_INTERVAL)
+                    cached = await self.get_json(key)
+                    if cached is not None:
+                        return cached
+                    if not await asyncio.to_thread(self.lease_held, key):
+                        # The owner failed or gave up; try to take over
+                        break
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache unavailable, bypassing: {e}")
+        return await fetch()
+
+    async def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Cache a fetched value; a failed write is logged, as fetching again would repeat the upstream call"""
+        try:
+            await self.set_json(key, value, ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed, not caching {key}: {e}")
+            try:
+                await asyncio.to_thread(self.release_lease, key)
+            except sqlite3.Error:
+                pass  # The lease expires on its own
+
+
+def cache_key(namespace: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key for an upstream GET: namespace, endpoint and sorted query parameters"""
+    query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()) if v is not None)
+    return f"{namespace}:{endpoint.lstrip('/')}?{query}"
+
+
+_cache: Optional[SharedCache] = None
+_cache_loaded = False
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """The host-shared cache, or ``None`` when ``SHARED_CACHE_PATH=off``"""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        _cache_loaded = True
+        path = os.getenv("SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "kyc-backend-cache.db"))
+        if path.lower() not in ("", "off", "false", "none"):
+            _cache = SharedCache(
+                path,
+                max_bytes=int(float(os.getenv("SHARED_CACHE_MAX_MB", "256")) * 1024 * 1024),
+                default_ttl=float(os.getenv("SHARED_CACHE_TTL", "300"))
+            )
+    return _cache
@@ -0,0 +1,95 @@
+"""
+Server-Sent Events for progressive firm and company pages
+
+A detail page is made of independent sections (details, permissions,
+officers, PSCs ...), each one upstream call. ``section_stream`` starts them
+all at once and sends each as a ``section`` event the moment it completes,
+so the page can render the fastest section first instead of waiting for the
+slowest. A final ``summary`` event gives every section's status and latency.
+
+::
+
+    event: section
+    data: {"section": "permissions", "status": "ok", "latency_ms": 41.2, "data": {...}}
+
+    event: summary
+    data: {"sections": {"permissions": {"status": "ok", "latency_ms": 41.2}, ...}, "complete": true, ...}
+
+A failed section is sent with ``"status": "error"`` and does not stop the
+others. With a request budget (see ``deadline.py``) sections still running
+when it is nearly spent are reported as ``timeout`` in the summary.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from fastapi.responses import StreamingResponse
+
+from deadline import remaining as budget_remaining
+from records import encode
+
+# Comment line sent while waiting so proxies do not close an idle stream
+KEEPALIVE_INTERVAL = 15.0
+
+# Time kept back from the request budget to send the summary
+RESPONSE_MARGIN = 0.05
+
+
+def event(name: str, data: Any) -> bytes:
+    return b"event: " + name.encode("ascii") + b"\ndata: " + encode(data) + b"\n\n"
+
+
+async def _timed(call: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        result = {"status": "ok", "data": await call()}
+    except Exception as e:
+        result = {"status": "error", "error": str(e) or type(e).__name__}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def stream_sections(sections: Dict[str, Callable[[], Awaitable[Any]]]) -> AsyncIterator[bytes]:
+    """One ``section`` event per section as it completes, then a ``summary`` event"""
+    started = time.perf_counter()
+    left = budget_remaining()
+    stop_at = None if left is None else time.monotonic() + max(0.0, left - RESPONSE_MARGIN)
+    tasks = {asyncio.create_task(_timed(call)): name for name, call in sections.items()}
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = KEEPALIVE_INTERVAL
+            if stop_at is not None:
+                timeout = min(timeout, stop_at - time.monotonic())
+                if timeout <= 0:
+                    break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                yield b": keep-alive\n\n"
+            for task in done:
+                name = tasks[task]
+                results[name] = task.result()
+                yield event("section", {"section": name, **results[name]})
+    finally:
+        for task in pending:
+            task.cancel()
+    for task in pending:
+        results[tasks[task]] = {"status": "timeout", "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    yield event("summary", {
+        "sections": {
+            name: {k: v for k, v in results[name].items() if k != "data"} for name in sections
+        },
+        "complete": all(result["status"] == "ok" for result in results.values()),
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+
+def section_stream(sections: Dict[str, Callable[[], Awaitable[Any]]]) -> StreamingResponse:
+    return StreamingResponse(
+        stream_sections(sections),
+        media_type="text/event-stream",
+        # No caching or proxy buffering, or events would arrive all at once
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { Search, Shield, User, Info, Loader2, HelpCircle, Hash, Building2, Users, ExternalLink, Calendar, MapPin, Activity, Download } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import logo from './assets/logo.png';
@@ -123,78 +123,117 @@ export default function App() {
     }
   };
 
-  const fetchFirmDetails = async (frn: string) => {
+  const detailStream = useRef<EventSource | null>(null);
+
+  // Each section arrives as a Server-Sent Event as soon as its upstream call
+  // completes, so the modal renders from the first one instead of the slowest
+  const streamDetails = (url: string, initial: any, apply: (firm: any, section: string, data: any) => any, failure: string) => {
+    detailStream.current?.close();
     setDetailLoading(true);
     setIsModalOpen(true);
     setActiveTab('overview');
-    try {
-      const [details, individuals, permissions, address, requirements, regulators, passports, disciplinary, waivers, names] = await Promise.all([
-        fetch(`http://localhost:8005/api/firm/${frn}`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/individuals`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/permissions`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/address`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/requirements`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/regulators`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/passports`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/disciplinary`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/waivers`).then(r => r.ok ? r.json() : null),
-        fetch(`http://localhost:8005/api/firm/${frn}/names`).then(r => r.ok ? r.json() : null)
-      ]);
-
-      // Normalize permissions: FCA API returns an object where keys are permission names, 
-      // but we need an array for mapping/searching in the UI.
-      const rawPermissions = permissions?.Data;
-      const normalizedPermissions = !rawPermissions ? [] : (
-        Array.isArray(rawPermissions) ? rawPermissions :
-          Object.entries(rawPermissions).map(([name, details]) => ({
-            'Permission Name': name,
-            'Details': details
-          }))
-      );
-
-      setSelectedFirm({
-        source: 'fca',
-        details: details?.Data?.[0] || {},
-        individuals: individuals?.Data || [],
-        permissions: normalizedPermissions,
-        address: address?.Data?.[0] || null,
-        requirements: requirements?.Data || [],
-        regulators: regulators?.Data || [],
-        passports: passports?.Data || [],
-        disciplinary: disciplinary?.Data || [],
-        waivers: waivers?.Data || [],
-        names: names?.Data || []
-      });
-    } catch (err) {
-      console.error(err);
-      setError('Failed to fetch firm details');
-    } finally {
+    setSelectedFirm(initial);
+
+    const source = new EventSource(url);
+    detailStream.current = source;
+    source.addEventListener('section', (event) => {
+      const { section, status, data } = JSON.parse((event as MessageEvent).data);
+      if (status === 'ok') {
+        setSelectedFirm((firm: any) => apply(firm, section, data));
+      }
+      setDetailLoading(false);
+    });
+    source.addEventListener('summary', (event) => {
+      source.close();
       setDetailLoading(false);
+      const summary = JSON.parse((event as MessageEvent).data);
+      if (!Object.values(summary.sections).some((s: any) => s.status === 'ok')) {
+        setError(failure);
+      }
+    });
+    source.onerror = () => {
+      // The stream broke before its summary; don't let EventSource reconnect and start over
+      source.close();
+      setDetailLoading(false);
+      setError(failure);
+    };
+  };
+
+  const closeDetails = () => {
+    detailStream.current?.close();
+    setIsModalOpen(false);
+  };
+
+  const applyFirmSection = (firm: any, section: string, data: any) => {
+    switch (section) {
+      case 'details':
+        return { ...firm, details: data?.Data?.[0] || {} };
+      case 'address':
+        return { ...firm, address: data?.Data?.[0] || null };
+      case 'permissions': {
+        // Normalize permissions: FCA API returns an object where keys are permission names,
+        // but we need an array for mapping/searching in the UI.
+        const rawPermissions = data?.Data;
+        const normalizedPermissions = !rawPermissions ? [] : (
+          Array.isArray(rawPermissions) ? rawPermissions :
+            Object.entries(rawPermissions).map(([name, details]) => ({
+              'Permission Name': name,
+              'Details': details
+            }))
+        );
+        return { ...firm, permissions: normalizedPermissions };
+      }
+      default:
+        return { ...firm, [section]: data?.Data || [] };
     }
   };
 
-  const fetchCompanyDetails = async (companyNumber: string) => {
-    setDetailLoading(true);
-    setIsModalOpen(true);
-    setActiveTab('overview');
-    try {
-      const response = await fetch(`http://localhost:8005/api/companies/${companyNumber}`);
-      const data = await response.json();
+  const applyCompanySection = (company: any, section: string, data: any) => {
+    switch (section) {
+      case 'profile':
+        return { ...company, details: data, address: data?.registered_office_address || {} };
+      case 'officers':
+        return { ...company, individuals: data?.items || [] };
+      default:
+        return { ...company, [section]: data?.items || [] };
+    }
+  };
 
-      setSelectedFirm({
+  const fetchFirmDetails = (frn: string) => {
+    streamDetails(
+      `http://localhost:8005/api/firm/${frn}/stream`,
+      {
+        source: 'fca',
+        details: {},
+        individuals: [],
+        permissions: [],
+        address: null,
+        requirements: [],
+        regulators: [],
+        passports: [],
+        disciplinary: [],
+        waivers: [],
+        names: []
+      },
+      applyFirmSection,
+      'Failed to fetch firm details'
+    );
+  };
+
+  const fetchCompanyDetails = (companyNumber: string) => {
+    streamDetails(
+      `http://localhost:8005/api/companies/${companyNumber}/stream`,
+      {
         source: 'ch',
-        details: data.profile,
-        individuals: data.officers?.items || [],
-        psc: data.psc?.items || [],
-        filing_history: data.filing_history?.items || [],
-        address: data.profile?.registered_office_address || {}
-      });
-    } catch (err) {
-      console.error(err);
-      setError('Failed to fetch company details');
-    } finally {
-      setDetailLoading(false);
-    }
+        details: {},
+        individuals: [],
+        psc: [],
+        filing_history: [],
+        address: {}
+      },
+      applyCompanySection,
+      'Failed to fetch company details'
+    );
   };
 
   return (
@@ -512,7 +551,7 @@ export default function App() {
       {/* Detail Modal */}
       <AnimatePresence>
         {isModalOpen && (
-          <div className="modal-overlay" onClick={() => setIsModalOpen(false)}>
+          <div className="modal-overlay" onClick={closeDetails}>
             <motion.div
               initial={{ scale: 0.9, opacity: 0 }}
               animate={{ scale: 1, opacity: 1 }}
@@ -965,7 +1004,7 @@ export default function App() {
                   </div>
 
                   <button
-                    onClick={() => setIsModalOpen(false)}
+                    onClick={closeDetails}
                     className="btn-primary"
                     style={{ width: '100%', padding: '14px', justifyContent: 'center', marginTop: '24px' }}
                   >
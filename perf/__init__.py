@@ -0,0 +1 @@
+"""Offline performance tooling: upstream stand-ins, load tests and benchmarks"""
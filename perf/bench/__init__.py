@@ -0,0 +1 @@
+"""Micro-benchmarks for the CPU-bound hot paths of each service"""
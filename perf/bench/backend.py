@@ -0,0 +1,30 @@
+"""
+Backend benchmarks: JSON encoding of large FCA permission payloads
+
+Measures both plain ``json.dumps`` and the path FastAPI takes when a route
+returns a dict (``jsonable_encoder`` followed by ``JSONResponse.render``).
+
+    PYTHONPATH="backend:." python -m perf.bench.backend
+"""
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from perf.bench.harness import Suite
+from perf.standins.fca import permissions_payload
+
+suite = Suite("backend")
+
+for count in (60, 600):
+    suite.bench(f"json.dumps[permissions={count}]", setup=lambda count=count: permissions_payload(122702, count))(
+        json.dumps
+    )
+    suite.bench(f"fastapi_encode[permissions={count}]", setup=lambda count=count: permissions_payload(122702, count))(
+        lambda payload: JSONResponse(content=jsonable_encoder(payload)).body
+    )
+
+
+if __name__ == "__main__":
+    suite.main()
@@ -0,0 +1,32 @@
+"""
+D&B service benchmarks: synthetic record generation for mock mode
+
+    PYTHONPATH="D&B API:." python -m perf.bench.dnb
+"""
+
+import itertools
+
+from app.synthetic import SyntheticDNB
+
+from perf.bench.harness import Suite
+
+suite = Suite("dnb")
+generator = SyntheticDNB(seed=0)
+# A new DUNS per call, so the synthetic benches measure generation rather than the company cache
+duns_numbers = itertools.count(100000000)
+
+suite.bench("mock_company_profile[known]")(lambda: generator.profile("804735132"))
+suite.bench("mock_company_profile[generic]")(lambda: generator.profile("123456789"))
+suite.bench("mock_financial_statements")(lambda: generator.financials("804735132"))
+suite.bench("mock_analytics")(lambda: generator.analytics("804735132"))
+suite.bench("mock_company_search")(lambda: generator.match("Gorman Manufacturing"))
+suite.bench("synthetic_profile[DCP_STD,unique]")(lambda: generator.profile(f"{next(duns_numbers):09d}"))
+suite.bench("synthetic_profile[DCP_PREM,unique]")(
+    lambda: generator.profile(f"{next(duns_numbers):09d}", "DCP_PREM")
+)
+suite.bench("synthetic_financials[unique]")(lambda: generator.financials(f"{next(duns_numbers):09d}"))
+suite.bench("synthetic_analytics[unique]")(lambda: generator.analytics(f"{next(duns_numbers):09d}"))
+
+
+if __name__ == "__main__":
+    suite.main()
@@ -0,0 +1,107 @@
+"""
+Minimal benchmark harness
+
+Suites register functions with ``@suite.bench(name)``. Each function is timed
+with ``timeit``-style auto-ranging and repeated, and the median time per call
+is what baselines are compared on.
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None
+
+
+@dataclass
+class Suite:
+    """A named group of benchmarks, runnable as ``python -m perf.bench.<suite>``"""
+    name: str
+    benchmarks: List[Benchmark] = field(default_factory=list)
+
+    def bench(self, name: str, setup: Optional[Callable[[], Any]] = None):
+        """
+        Register a benchmark
+
+        With ``setup``, its return value is passed to the benchmarked function
+        and setup time is excluded from the measurement.
+        """
+        def decorator(func):
+            self.benchmarks.append(Benchmark(f"{self.name}.{name}", func, setup))
+            return func
+        return decorator
+
+    def run(self, min_time: float = 0.2, repeat: int = 5, only: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        results = {}
+        for benchmark in self.benchmarks:
+            if only and only not in benchmark.name:
+                continue
+            results[benchmark.name] = measure(benchmark, min_time, repeat)
+        return results
+
+    def main(self) -> None:
+        parser = argparse.ArgumentParser(description=f"Run the {self.name} benchmarks")
+        parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+        parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per benchmark")
+        parser.add_argument("--only", default=None, help="Run benchmarks whose name contains this")
+        parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+        args = parser.parse_args()
+
+        results = self.run(args.min_time, args.repeat, args.only)
+        if args.json:
+            json.dump(results, sys.stdout)
+        else:
+            for name, result in results.items():
+                print(f"{name:<60} {format_seconds(result['median'])}/op  (min {format_seconds(result['min'])})")
+
+
+def measure(benchmark: Benchmark, min_time: float, repeat: int) -> Dict[str, float]:
+    """Median/min/stdev seconds per call over ``repeat`` auto-ranged rounds"""
+    arg = benchmark.setup() if benchmark.setup else None
+    call = (lambda: benchmark.func(arg)) if benchmark.setup else benchmark.func
+
+    # Auto-range: grow the loop count until one round takes at least min_time
+    number = 1
+    while True:
+        elapsed = _time_loop(call, number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed > min_time / 10 else 10
+
+    per_call = [_time_loop(call, number) / number for _ in range(repeat)]
+    return {
+        "median": statistics.median(per_call),
+        "min": min(per_call),
+        "stdev": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "loops": number
+    }
+
+
+def _time_loop(call: Callable[[], Any], number: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        return time.perf_counter() - started
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit:<2}"
+    return f"{seconds / 1e-9:8.2f} ns"
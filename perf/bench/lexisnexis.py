@@ -0,0 +1,83 @@
+"""
+LexisNexis service benchmarks: normalization, model validation and response encoding
+
+Run from the repository root with the service on the path (``run.py`` does
+this for you)::
+
+    PYTHONPATH="LexisNexis API:." python -m perf.bench.lexisnexis
+"""
+
+from typing import Any, Dict, List
+
+from app.models import BatchScreenRequest, ScreeningResult
+from app.providers.bridger_soap import BridgerSOAPClient
+from app.routes import ModelResponse
+
+from perf.bench.harness import Suite
+
+suite = Suite("lexisnexis")
+client = BridgerSOAPClient()
+
+CATEGORIES = [["SANCTIONS"], ["PEP"], ["PEP", "SANCTIONS"], ["ADVERSE_MEDIA"], ["LAW_ENFORCEMENT"], []]
+SUBJECT = {"referenceId": "BENCH-1", "fullName": "Bench Subject", "firstName": None, "lastName": None,
+           "dob": "1970-01-01", "nationality": "GB", "country": "GB", "address": None, "identifiers": None}
+
+
+def soap_matches(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "EntityId": f"WL-{i:06d}",
+            "Score": 50 + i % 51,
+            "Name": f"Watchlist Name {i}",
+            "Aliases": [f"Alias {i}-{j}" for j in range(i % 4)],
+            "Categories": CATEGORIES[i % len(CATEGORIES)],
+            "ListName": "OFAC SDN List",
+            "ListType": "SANCTIONS",
+            "Country": "RU",
+            "DOB": "1952-10-07",
+            "Nationality": "RU",
+            "Description": "Designated under Executive Order 14024.",
+            "LastUpdated": "2024-02-24"
+        }
+        for i in range(count)
+    ]
+
+
+def soap_response(count: int) -> Dict[str, Any]:
+    return {"ScreeningResponse": {"ScreeningId": "SCR-BENCH", "ReferenceId": "BENCH-1", "Status": "COMPLETED",
+                                  "Matches": soap_matches(count), "ProcessingTime": 1.0}}
+
+
+for size in (2, 100, 1000):
+    suite.bench(f"normalize_person_response[{size}]", setup=lambda size=size: soap_response(size))(
+        lambda response: client.normalize_person_response(response, SUBJECT)
+    )
+    suite.bench(f"parse_matches[{size}]", setup=lambda size=size: soap_matches(size))(
+        client._parse_matches
+    )
+    suite.bench(f"ScreeningResult.model_validate[{size}]",
+                setup=lambda size=size: client.normalize_person_response(soap_response(size), SUBJECT).model_dump())(
+        ScreeningResult.model_validate
+    )
+    suite.bench(f"ModelResponse[{size}]",
+                setup=lambda size=size: client.normalize_person_response(soap_response(size), SUBJECT))(
+        ModelResponse
+    )
+
+
+def batch_payload(count: int) -> Dict[str, Any]:
+    persons = [{"referenceId": f"P-{i}", "fullName": f"Person {i}", "dob": "1980-01-01", "country": "GB"}
+               for i in range(count // 2)]
+    entities = [{"referenceId": f"E-{i}", "entityName": f"Entity {i} Ltd", "country": "GB"}
+                for i in range(count - count // 2)]
+    return {"persons": persons, "entities": entities}
+
+
+for size in (100, 10_000):
+    suite.bench(f"BatchScreenRequest.model_validate[{size}]", setup=lambda size=size: batch_payload(size))(
+        BatchScreenRequest.model_validate
+    )
+
+
+if __name__ == "__main__":
+    suite.main()
@@ -0,0 +1,101 @@
+"""
+Run every benchmark suite and compare against a stored baseline
+
+    python -m perf.bench.run                      # run and compare with the default baseline
+    python -m perf.bench.run --save-baseline      # run and store the results as the baseline
+    python -m perf.bench.run --baseline before --threshold 0.05 --fail-on-regression
+
+Each suite runs in its own interpreter with its service directory on the path,
+because the D&B and LexisNexis services both use the top-level package ``app``.
+Baselines are machine specific: save them on the machine you compare on.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from perf.bench.harness import format_seconds
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+SUITES = {
+    "lexisnexis": REPO_ROOT / "LexisNexis API",
+    "dnb": REPO_ROOT / "D&B API",
+    "backend": REPO_ROOT / "backend"
+}
+
+
+def run_suite(name: str, min_time: float, repeat: int, only: Optional[str]) -> Dict[str, Dict[str, float]]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([str(SUITES[name]), str(REPO_ROOT)]),
+        # Benchmarks must never reach a real upstream
+        "USE_MOCK_DATA": "true"
+    }
+    command = [sys.executable, "-m", f"perf.bench.{name}", "--json",
+               "--min-time", str(min_time), "--repeat", str(repeat)]
+    if only:
+        command += ["--only", only]
+    output = subprocess.run(command, cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> int:
+    """Print a comparison table; return the number of regressions"""
+    regressions = 0
+    print(f"{'benchmark':<58} {'baseline':>12} {'current':>12} {'change':>8}")
+    print("-" * 94)
+    for name, result in results.items():
+        current = result["median"]
+        before = baseline.get(name, {}).get("median")
+        if before is None:
+            print(f"{name:<58} {'-':>12} {format_seconds(current):>12} {'new':>8}")
+            continue
+        change = (current - before) / before
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  improved"
+        print(f"{name:<58} {format_seconds(before):>12} {format_seconds(current):>12} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run benchmarks and compare with a baseline")
+    parser.add_argument("--suite", choices=sorted(SUITES), action="append", help="Suite(s) to run (default: all)")
+    parser.add_argument("--only", default=None, help="Run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default="default", help="Baseline name under perf/bench/baselines/")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero on any regression")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name in args.suite or SUITES:
+        results.update(run_suite(name, args.min_time, args.repeat, args.only))
+
+    baseline_path = BASELINE_DIR / f"{args.baseline}.json"
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        stored = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        stored.update(results)
+        baseline_path.write_text(json.dumps(stored, indent=2, sort_keys=True))
+        print(f"Saved {len(results)} results to {baseline_path}")
+
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    regressions = compare(results, baseline, args.threshold)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
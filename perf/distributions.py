@@ -0,0 +1,58 @@
+"""Latency distributions for the upstream stand-ins"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    A latency distribution in milliseconds
+
+    Specs are written as ``kind:arg[:arg]``:
+
+    - ``fixed:50`` - always 50 ms
+    - ``uniform:20:120`` - uniform between 20 and 120 ms
+    - ``normal:80:15`` - normal with mean 80 ms and std-dev 15 ms
+    - ``lognormal:80:0.5`` - log-normal with median 80 ms and sigma 0.5 (long tail)
+    - ``exp:60`` - exponential with mean 60 ms
+    """
+    kind: str
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "LatencyDistribution":
+        """Parse a latency spec, ``None`` or ``""`` meaning no added latency"""
+        if not spec:
+            return cls("fixed", 0.0)
+        kind, *args = spec.split(":")
+        values = [float(arg) for arg in args]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+        if kind not in expected or len(values) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds"""
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            ms = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            ms = rng.lognormvariate(math.log(max(self.a, 1e-3)), self.b)
+        else:
+            ms = rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        return max(ms, 0.0) / 1000.0
+
+
+def parse_rate_limit(spec: Optional[str]) -> Optional[Tuple[int, float]]:
+    """Parse ``"10/10"`` (requests per seconds) into ``(10, 10.0)``"""
+    if not spec or spec == "none":
+        return None
+    limit, window = spec.split("/")
+    return int(limit), float(window)
@@ -0,0 +1,102 @@
+"""
+Import-time and time-to-ready report for the three services
+
+    python -m perf.import_time             # import cost per service, top modules
+    python -m perf.import_time --ready     # also time uvicorn start until /health answers
+
+Uses ``python -X importtime`` in a fresh interpreter per service, so the
+numbers include everything a new worker pays before it can bind its port.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SERVICES = {
+    # name: (working directory, module, ASGI app, readiness path)
+    "backend": (REPO_ROOT / "backend", "main", "main:app", "/health"),
+    "dnb": (REPO_ROOT / "D&B API", "app.main", "app.main:app", "/health"),
+    "lexisnexis": (REPO_ROOT / "LexisNexis API", "app.main", "app.main:app", "/health")
+}
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# Third-party packages the services should only import on first use
+DEFERRED = ("zeep", "lxml", "requests", "httpx")
+
+
+def import_profile(cwd: Path, module: str) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """Total import seconds and (module, self us, cumulative us, depth) rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(cwd)}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), len(indent) // 2))
+    total = next(cumulative for name, _, cumulative, _ in rows if name == module) / 1e6
+    return total, rows
+
+
+def time_to_ready(cwd: Path, app: str, ready_path: str, port: int, timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until the readiness endpoint answers"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"], cwd=cwd
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}{ready_path}", timeout=0.5).status_code < 500:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                time.sleep(0.02)
+        raise RuntimeError(f"{app} not ready after {timeout} s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report service import time and time-to-ready")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--ready", action="store_true", help="Also measure uvicorn time-to-ready")
+    parser.add_argument("--port", type=int, default=18500, help="First port for --ready")
+    args = parser.parse_args()
+
+    summary: Dict[str, Dict[str, float]] = {}
+    for offset, (name, (cwd, module, app, ready_path)) in enumerate(SERVICES.items()):
+        # Run once to warm the bytecode cache so the numbers reflect a deployed worker
+        import_profile(cwd, module)
+        total, rows = import_profile(cwd, module)
+        summary[name] = {"import_s": total}
+
+        print(f"\n{name}: import {module} took {total * 1000:.0f} ms")
+        top_level = sorted((row for row in rows if row[3] == 1), key=lambda row: -row[2])[: args.top]
+        for mod, _, cumulative, _ in top_level:
+            print(f"  {cumulative / 1000:8.1f} ms  {mod}")
+        loaded = {row[0].split(".")[0] for row in rows}
+        eager = sorted(loaded.intersection(DEFERRED))
+        print(f"  eagerly imported (should be deferred): {', '.join(eager) if eager else 'none'}")
+
+        if args.ready:
+            summary[name]["ready_s"] = time_to_ready(cwd, app, ready_path, args.port + offset)
+            print(f"  time to ready: {summary[name]['ready_s'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
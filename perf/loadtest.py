@@ -0,0 +1,132 @@
+"""
+End-to-end load test against local upstream stand-ins
+
+Usage::
+
+    python -m perf.loadtest --profile perf/profiles/production.json \\
+        --workload perf/workloads/mixed.json --concurrency 20 --duration 60
+
+Starts the stand-ins and the three FastAPI services (pointed at the stand-ins),
+drives the scripted workload and prints throughput and p50/p95/p99 per route.
+Pass ``--external`` to drive services that are already running instead.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import httpx
+
+from perf.upstreams import DEFAULT_PROFILE, load_profile, service_environment
+from perf.workload import Workload, format_report, run_workload
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_WORKLOAD = Path(__file__).parent / "workloads" / "mixed.json"
+
+SERVICES = {
+    # name: (working directory, ASGI app, readiness path)
+    "backend": (REPO_ROOT / "backend", "main:app", "/openapi.json"),
+    "dnb": (REPO_ROOT / "D&B API", "app.main:app", "/health"),
+    "lexisnexis": (REPO_ROOT / "LexisNexis API", "app.main:app", "/health")
+}
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout} s")
+
+
+@contextmanager
+def running_stack(profile_path: Path, workload: Workload, workers: int) -> Iterator[None]:
+    """Start the stand-ins and services as subprocesses; stop them on exit"""
+    profile = load_profile(profile_path)
+    environments = service_environment(profile)
+    processes: List[subprocess.Popen] = []
+    # Each run starts with cold host-shared caches
+    cache_dir = tempfile.TemporaryDirectory(prefix="loadtest-cache-")
+    try:
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "perf.upstreams", "--profile", str(profile_path)], cwd=REPO_ROOT
+        ))
+        _wait_ready(f"http://127.0.0.1:{profile['fca']['port']}/_stats")
+
+        for name, (cwd, app, ready_path) in SERVICES.items():
+            base_url = workload.services[name]
+            port = httpx.URL(base_url).port
+            env: Dict[str, str] = {**os.environ, **environments[name]}
+            env["SHARED_CACHE_PATH"] = os.path.join(cache_dir.name, f"{name}.db")
+            if name == "backend":
+                # The KYC profile route calls the other two services
+                env["DNB_SERVICE_URL"] = workload.services["dnb"]
+                env["LEXISNEXIS_SERVICE_URL"] = workload.services["lexisnexis"]
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", app, "--port", str(port),
+                 "--workers", str(workers), "--log-level", "warning"],
+                cwd=cwd, env=env
+            ))
+            _wait_ready(base_url + ready_path)
+            logger.info(f"{name} ready on {base_url}")
+        yield
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        cache_dir.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the KYC services against local stand-ins")
+    parser.add_argument("--profile", type=Path, default=DEFAULT_PROFILE, help="Stand-in profile (JSON)")
+    parser.add_argument("--workload", type=Path, default=DEFAULT_WORKLOAD, help="Workload script (JSON)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run for")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests instead")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers per service")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--external", action="store_true", help="Drive already-running services")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    workload = Workload.load(args.workload)
+    duration = None if args.requests else args.duration
+
+    async def drive():
+        return await run_workload(workload, args.concurrency, duration, args.requests, seed=args.seed)
+
+    if args.external:
+        report = asyncio.run(drive())
+    else:
+        with running_stack(args.profile, workload, args.workers):
+            report = asyncio.run(drive())
+
+    print(format_report(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
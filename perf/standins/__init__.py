@@ -0,0 +1 @@
+"""Local stand-ins for the FCA, Companies House, D&B and Bridger XG upstreams"""
@@ -0,0 +1,230 @@
+"""LexisNexis Bridger XG SOAP stand-in (WSDL plus document/literal endpoint)"""
+
+import uuid
+import xml.etree.ElementTree as ET
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Request, Response
+
+from perf.standins.common import Behaviour, apply_behaviour, seeded_rng
+
+NS = "urn:bridger:screening"
+SOAP_NS = "http://schemas.xmlsoap.org/soap/envelope/"
+SERVICE_PATH = "/bridger/ScreeningService"
+
+WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+             xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:tns="{ns}"
+             targetNamespace="{ns}" name="ScreeningService">
+  <types>
+    <xsd:schema targetNamespace="{ns}" elementFormDefault="qualified">
+      <xsd:complexType name="PersonSearch"><xsd:sequence>
+        <xsd:element name="FullName" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="FirstName" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="LastName" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="DOB" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Nationality" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Country" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="ReferenceId" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="EntitySearch"><xsd:sequence>
+        <xsd:element name="EntityName" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Country" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="RegistrationNumber" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="ReferenceId" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="Match"><xsd:sequence>
+        <xsd:element name="EntityId" type="xsd:string"/>
+        <xsd:element name="Score" type="xsd:int"/>
+        <xsd:element name="Name" type="xsd:string"/>
+        <xsd:element name="Aliases" type="xsd:string" minOccurs="0" maxOccurs="unbounded"/>
+        <xsd:element name="Categories" type="xsd:string" minOccurs="0" maxOccurs="unbounded"/>
+        <xsd:element name="ListName" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="ListType" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Country" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="DOB" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Nationality" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Description" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="LastUpdated" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ScreeningResponse"><xsd:sequence>
+        <xsd:element name="ScreeningId" type="xsd:string"/>
+        <xsd:element name="ReferenceId" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Status" type="xsd:string"/>
+        <xsd:element name="Matches" type="tns:Match" minOccurs="0" maxOccurs="unbounded"/>
+        <xsd:element name="ProcessingTime" type="xsd:double" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ScreeningList"><xsd:sequence>
+        <xsd:element name="listName" type="xsd:string"/>
+        <xsd:element name="listType" type="xsd:string"/>
+        <xsd:element name="description" type="xsd:string"/>
+        <xsd:element name="country" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="lastUpdated" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:element name="RunSearch"><xsd:complexType><xsd:sequence>
+        <xsd:element name="request" type="tns:PersonSearch"/>
+      </xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="RunSearchResponse"><xsd:complexType><xsd:sequence>
+        <xsd:element name="ScreeningResponse" type="tns:ScreeningResponse"/>
+      </xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="RunEntitySearch"><xsd:complexType><xsd:sequence>
+        <xsd:element name="request" type="tns:EntitySearch"/>
+      </xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="RunEntitySearchResponse"><xsd:complexType><xsd:sequence>
+        <xsd:element name="ScreeningResponse" type="tns:ScreeningResponse"/>
+      </xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="BatchScreen"><xsd:complexType><xsd:sequence>
+        <xsd:element name="request"><xsd:complexType><xsd:sequence>
+          <xsd:element name="Persons" type="tns:PersonSearch" minOccurs="0" maxOccurs="unbounded"/>
+          <xsd:element name="Entities" type="tns:EntitySearch" minOccurs="0" maxOccurs="unbounded"/>
+        </xsd:sequence></xsd:complexType></xsd:element>
+      </xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="BatchScreenResponse"><xsd:complexType><xsd:sequence>
+        <xsd:element name="BatchScreeningResponse"><xsd:complexType><xsd:sequence>
+          <xsd:element name="BatchId" type="xsd:string"/>
+          <xsd:element name="TotalScreened" type="xsd:int"/>
+          <xsd:element name="Status" type="xsd:string"/>
+        </xsd:sequence></xsd:complexType></xsd:element>
+      </xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="GetAvailableLists"><xsd:complexType><xsd:sequence/></xsd:complexType></xsd:element>
+      <xsd:element name="GetAvailableListsResponse"><xsd:complexType><xsd:sequence>
+        <xsd:element name="List" type="tns:ScreeningList" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType></xsd:element>
+    </xsd:schema>
+  </types>
+  {messages}
+  <portType name="ScreeningPortType">{port_operations}</portType>
+  <binding name="ScreeningBinding" type="tns:ScreeningPortType">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    {binding_operations}
+  </binding>
+  <service name="ScreeningService">
+    <port name="ScreeningPort" binding="tns:ScreeningBinding">
+      <soap:address location="{location}"/>
+    </port>
+  </service>
+</definitions>
+"""
+
+OPERATIONS = ["RunSearch", "RunEntitySearch", "BatchScreen", "GetAvailableLists"]
+
+LISTS = [
+    ("OFAC SDN List", "SANCTIONS", "US Treasury Specially Designated Nationals", "US"),
+    ("EU Consolidated List", "SANCTIONS", "EU financial sanctions", "EU"),
+    ("UN Security Council List", "SANCTIONS", "UN consolidated sanctions", None),
+    ("HMT Consolidated List", "SANCTIONS", "UK financial sanctions targets", "GB"),
+    ("World-Check PEP Database", "PEP", "Politically exposed persons", None),
+    ("Adverse Media", "ADVERSE_MEDIA", "Negative news screening", None)
+]
+CATEGORIES = [["SANCTIONS"], ["PEP"], ["PEP", "SANCTIONS"], ["ADVERSE_MEDIA"], ["LAW_ENFORCEMENT"]]
+
+
+def render_wsdl(location: str) -> str:
+    """Render the WSDL with the SOAP endpoint pointing at ``location``"""
+    messages = "".join(
+        f'<message name="{op}Input"><part name="parameters" element="tns:{op}"/></message>'
+        f'<message name="{op}Output"><part name="parameters" element="tns:{op}Response"/></message>'
+        for op in OPERATIONS
+    )
+    port_operations = "".join(
+        f'<operation name="{op}"><input message="tns:{op}Input"/><output message="tns:{op}Output"/></operation>'
+        for op in OPERATIONS
+    )
+    binding_operations = "".join(
+        f'<operation name="{op}"><soap:operation soapAction="{NS}/{op}"/>'
+        f'<input><soap:body use="literal"/></input><output><soap:body use="literal"/></output></operation>'
+        for op in OPERATIONS
+    )
+    return WSDL.format(ns=NS, location=escape(location), messages=messages,
+                       port_operations=port_operations, binding_operations=binding_operations)
+
+
+def _fields(element: ET.Element) -> Dict[str, str]:
+    return {child.tag.split("}")[-1]: (child.text or "") for child in element}
+
+
+def _xml(tag: str, value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "".join(_xml(tag, item) for item in value)
+    if isinstance(value, dict):
+        return f"<tns:{tag}>" + "".join(_xml(k, v) for k, v in value.items()) + f"</tns:{tag}>"
+    return f"<tns:{tag}>{escape(str(value))}</tns:{tag}>"
+
+
+def _matches(name: str, match_rate: float, max_matches: int) -> List[Dict]:
+    """Deterministic hits for a screened name; ``match_rate`` of names get any hits"""
+    rng = seeded_rng("bridger", name.upper())
+    if rng.random() >= match_rate:
+        return []
+    return [
+        {
+            "EntityId": f"WL-{rng.randint(100000, 999999)}",
+            "Score": rng.randint(60, 100),
+            "Name": name,
+            "Aliases": [f"{name} ({i})" for i in range(rng.randint(0, 3))],
+            "Categories": rng.choice(CATEGORIES),
+            "ListName": (listing := rng.choice(LISTS))[0],
+            "ListType": listing[1],
+            "Country": listing[3],
+            "Description": "Stand-in watchlist record",
+            "LastUpdated": "2024-01-15"
+        }
+        for _ in range(rng.randint(1, max_matches))
+    ]
+
+
+def create_app(behaviour: Behaviour, match_rate: float = 0.2, max_matches: int = 5) -> FastAPI:
+    """Build the Bridger XG stand-in"""
+    app = FastAPI(title="Bridger XG stand-in")
+
+    @app.get(SERVICE_PATH)
+    async def wsdl(request: Request):
+        location = str(request.url.replace(query=""))
+        return Response(content=render_wsdl(location), media_type="text/xml")
+
+    @app.post(SERVICE_PATH)
+    async def soap(request: Request):
+        envelope = ET.fromstring(await request.body())
+        body = envelope.find(f"{{{SOAP_NS}}}Body")
+        call = body[0]
+        operation = call.tag.split("}")[-1]
+
+        if operation in ("RunSearch", "RunEntitySearch"):
+            fields = _fields(call[0])
+            name = fields.get("FullName") or fields.get("EntityName") or ""
+            result = {
+                "ScreeningId": f"SCR-{uuid.uuid4()}",
+                "ReferenceId": fields.get("ReferenceId"),
+                "Status": "COMPLETED",
+                "Matches": _matches(name, match_rate, max_matches),
+                "ProcessingTime": 0.05
+            }
+            payload = _xml("ScreeningResponse", result)
+        elif operation == "BatchScreen":
+            total = len(call[0]) if len(call) else 0
+            payload = _xml("BatchScreeningResponse", {
+                "BatchId": f"BATCH-{uuid.uuid4()}", "TotalScreened": total, "Status": "COMPLETED"
+            })
+        elif operation == "GetAvailableLists":
+            payload = "".join(
+                _xml("List", {"listName": n, "listType": t, "description": d, "country": c, "lastUpdated": "2024-01-01"})
+                for n, t, d, c in LISTS
+            )
+        else:
+            fault = (f'<soap:Fault><faultcode>soap:Client</faultcode>'
+                     f'<faultstring>Unknown operation {escape(operation)}</faultstring></soap:Fault>')
+            return Response(content=_envelope(fault), status_code=500, media_type="text/xml")
+
+        return Response(content=_envelope(f'<tns:{operation}Response>{payload}</tns:{operation}Response>'),
+                        media_type="text/xml")
+
+    # WSDL fetches happen once at client start-up and are not part of the workload
+    return apply_behaviour(app, behaviour, exempt=lambda request: request.method == "GET")
+
+
+def _envelope(body: str) -> str:
+    return (f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<soap:Envelope xmlns:soap="{SOAP_NS}" xmlns:tns="{NS}"><soap:Body>{body}</soap:Body></soap:Envelope>')
@@ -0,0 +1,105 @@
+"""Shared behaviour (latency, errors, rate limits) for the upstream stand-ins"""
+
+import asyncio
+import hashlib
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from perf.distributions import LatencyDistribution, parse_rate_limit
+
+
+class SlidingWindowLimiter:
+    """Sliding-window request limiter, e.g. FCA's 10 requests per 10 seconds"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._hits: Deque[float] = deque()
+
+    def check(self) -> Optional[float]:
+        """Record a hit; return ``None`` if allowed, else seconds until a slot frees"""
+        now = time.monotonic()
+        while self._hits and now - self._hits[0] >= self.window:
+            self._hits.popleft()
+        if len(self._hits) >= self.limit:
+            return self.window - (now - self._hits[0])
+        self._hits.append(now)
+        return None
+
+
+@dataclass
+class Behaviour:
+    """How a stand-in misbehaves: latency, injected errors and rate limits"""
+    latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution("fixed", 0.0))
+    error_rate: float = 0.0
+    error_status: int = 503
+    rate_limit: Optional[Tuple[int, float]] = None
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Behaviour":
+        """Build from a profile section (see ``perf/profiles``)"""
+        return cls(
+            latency=LatencyDistribution.parse(data.get("latency")),
+            error_rate=float(data.get("error_rate", 0.0)),
+            error_status=int(data.get("error_status", 503)),
+            rate_limit=parse_rate_limit(data.get("rate_limit")),
+            seed=data.get("seed")
+        )
+
+
+def apply_behaviour(
+    app: FastAPI,
+    behaviour: Behaviour,
+    exempt: Optional[Callable[[Request], bool]] = None
+) -> FastAPI:
+    """Wrap every route of a stand-in app with the configured behaviour"""
+    rng = random.Random(behaviour.seed)
+    limiter = SlidingWindowLimiter(*behaviour.rate_limit) if behaviour.rate_limit else None
+    stats = {"requests": 0, "rate_limited": 0, "errors": 0}
+    app.state.stats = stats
+
+    @app.middleware("http")
+    async def misbehave(request: Request, call_next):
+        if request.url.path == "/_stats" or (exempt and exempt(request)):
+            return await call_next(request)
+        stats["requests"] += 1
+
+        if limiter:
+            retry_after = limiter.check()
+            if retry_after is not None:
+                stats["rate_limited"] += 1
+                return JSONResponse(
+                    status_code=429,
+                    content={"error": "Too Many Requests"},
+                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+                )
+
+        await asyncio.sleep(behaviour.latency.sample(rng))
+
+        if behaviour.error_rate and rng.random() < behaviour.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                status_code=behaviour.error_status,
+                content={"error": "Injected upstream failure"}
+            )
+
+        return await call_next(request)
+
+    @app.get("/_stats", include_in_schema=False)
+    async def standin_stats():
+        return stats
+
+    return app
+
+
+def seeded_rng(*parts: Any) -> random.Random:
+    """Deterministic RNG for an identifier, so repeated lookups return the same record"""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
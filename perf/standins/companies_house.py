@@ -0,0 +1,140 @@
+"""Companies House public data and document API stand-in"""
+
+import base64
+
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import Response
+
+from perf.standins.common import Behaviour, apply_behaviour, seeded_rng
+
+OFFICER_ROLES = ["director", "secretary", "llp-member"]
+FILING_TYPES = [("AA", "accounts"), ("CS01", "confirmation-statement"), ("AP01", "officers"),
+                ("TM01", "officers"), ("SH01", "capital"), ("PSC01", "persons-with-significant-control")]
+
+# Smallest well-formed PDF, padded out to a realistic size per request
+PDF_HEADER = b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+
+
+def _company_name(number: str) -> str:
+    rng = seeded_rng("ch-name", number)
+    return f"{rng.choice(['ACME', 'NORTHWIND', 'CONTOSO', 'FABRIKAM', 'GLOBEX'])} " \
+           f"{rng.choice(['HOLDINGS', 'TRADING', 'SERVICES', 'GROUP'])} LIMITED"
+
+
+def create_app(behaviour: Behaviour, filings: int = 100, document_kb: int = 200) -> FastAPI:
+    """Build the Companies House stand-in (API and document API on one port)"""
+    app = FastAPI(title="Companies House stand-in")
+
+    def check_auth(request: Request) -> None:
+        auth = request.headers.get("authorization", "")
+        if not auth.startswith("Basic ") or not base64.b64decode(auth[6:]).split(b":")[0]:
+            raise HTTPException(status_code=401, detail="Invalid Authorization")
+
+    @app.get("/search/companies")
+    async def search(request: Request, q: str, items_per_page: int = 10):
+        check_auth(request)
+        rng = seeded_rng("ch-search", q.lower())
+        numbers = [f"{rng.randint(1000000, 15999999):08d}" for _ in range(items_per_page)]
+        return {
+            "kind": "search#companies",
+            "total_results": items_per_page,
+            "items_per_page": items_per_page,
+            "start_index": 0,
+            "items": [
+                {
+                    "kind": "searchresults#company",
+                    "title": _company_name(number),
+                    "company_number": number,
+                    "company_status": "active",
+                    "company_type": "ltd",
+                    "address_snippet": f"{int(number) % 300} High Street, London, EC1A 1BB",
+                    "date_of_creation": "2009-05-14",
+                    "links": {"self": f"/company/{number}"}
+                }
+                for number in numbers
+            ]
+        }
+
+    @app.get("/company/{number}")
+    async def profile(request: Request, number: str):
+        check_auth(request)
+        rng = seeded_rng("ch-profile", number)
+        return {
+            "company_name": _company_name(number),
+            "company_number": number,
+            "company_status": "active",
+            "type": "ltd",
+            "jurisdiction": "england-wales",
+            "date_of_creation": f"{rng.randint(1990, 2022)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+            "registered_office_address": {
+                "address_line_1": f"{rng.randint(1, 300)} High Street",
+                "locality": "London", "postal_code": "EC1A 1BB", "country": "United Kingdom"
+            },
+            "sic_codes": [str(rng.randint(10000, 99999)) for _ in range(rng.randint(1, 4))],
+            "accounts": {"next_due": "2025-09-30", "last_accounts": {"made_up_to": "2023-12-31", "type": "full"}},
+            "confirmation_statement": {"next_due": "2025-06-01", "last_made_up_to": "2024-05-18"},
+            "has_charges": rng.random() < 0.3,
+            "links": {"self": f"/company/{number}", "officers": f"/company/{number}/officers",
+                      "filing_history": f"/company/{number}/filing-history"}
+        }
+
+    @app.get("/company/{number}/officers")
+    async def officers(request: Request, number: str):
+        check_auth(request)
+        rng = seeded_rng("ch-officers", number)
+        items = [
+            {
+                "name": f"OFFICER {i}, Person",
+                "officer_role": rng.choice(OFFICER_ROLES),
+                "appointed_on": f"{rng.randint(1995, 2023)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+                "nationality": "British",
+                "occupation": "Director",
+                "country_of_residence": "England",
+                "address": {"address_line_1": "1 High Street", "locality": "London", "postal_code": "EC1A 1BB"},
+                "links": {"officer": {"appointments": f"/officers/{number}{i}/appointments"}}
+            }
+            for i in range(rng.randint(2, 15))
+        ]
+        return {"kind": "officer-list", "total_results": len(items), "active_count": len(items), "items": items}
+
+    @app.get("/company/{number}/filing-history")
+    async def filing_history(request: Request, number: str):
+        check_auth(request)
+        rng = seeded_rng("ch-filings", number)
+        items = []
+        for i in range(filings):
+            form, category = rng.choice(FILING_TYPES)
+            items.append({
+                "transaction_id": f"MzA{number}{i:04d}",
+                "category": category,
+                "type": form,
+                "date": f"{2024 - i // 12}-{(i % 12) + 1:02d}-15",
+                "description": f"{category}-filing",
+                "pages": rng.randint(1, 40),
+                "links": {"document_metadata": f"/document/{number}{i:04d}"}
+            })
+        return {"kind": "filing-history", "total_count": len(items), "items": items}
+
+    @app.get("/company/{number}/persons-with-significant-control")
+    async def psc(request: Request, number: str):
+        check_auth(request)
+        rng = seeded_rng("ch-psc", number)
+        items = [
+            {
+                "kind": "individual-person-with-significant-control",
+                "name": f"Mr Controller {i}",
+                "natures_of_control": ["ownership-of-shares-25-to-50-percent", "voting-rights-25-to-50-percent"],
+                "notified_on": "2016-04-06",
+                "nationality": "British"
+            }
+            for i in range(rng.randint(1, 3))
+        ]
+        return {"kind": "persons-with-significant-control#list", "active_count": len(items), "items": items}
+
+    @app.get("/document/{document_id}/content")
+    async def document(request: Request, document_id: str):
+        check_auth(request)
+        body = PDF_HEADER + b"%" + b"0" * (document_kb * 1024) + b"\n%%EOF\n"
+        return Response(content=body, media_type="application/pdf")
+
+    return apply_behaviour(app, behaviour)
@@ -0,0 +1,152 @@
+"""D&B Direct 2.0 stand-in (authentication, match, products, financials, analytics)"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Response
+
+from perf.standins.common import Behaviour, apply_behaviour, seeded_rng
+
+TOWNS = [("SAN FRANCISCO", "CA", "94110"), ("NEW YORK", "NY", "10001"), ("CHICAGO", "IL", "60601"),
+         ("AUSTIN", "TX", "73301"), ("SEATTLE", "WA", "98101"), ("LONDON", None, "EC2N 4AY")]
+
+
+def _transaction() -> Dict[str, Any]:
+    return {
+        "ApplicationTransactionID": "REST",
+        "ServiceTransactionID": str(uuid.uuid4()),
+        "TransactionTimestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
+
+
+def _success() -> Dict[str, Any]:
+    return {"ResultID": "CM000", "ResultText": "Success"}
+
+
+def _organization(duns: str, name: Optional[str] = None) -> Dict[str, Any]:
+    rng = seeded_rng("dnb-org", duns)
+    town, territory, postcode = rng.choice(TOWNS)
+    organization = {
+        "DUNSNumber": duns,
+        "OrganizationName": {"OrganizationPrimaryName": [
+            {"OrganizationName": name or f"COMPANY {duns} INC."}
+        ]},
+        "PrimaryAddress": {
+            "StreetAddressLine": [{"LineText": f"{rng.randint(1, 999)} MARKET ST"}],
+            "PrimaryTownName": town,
+            "CountryISOAlpha2Code": "GB" if territory is None else "US",
+            "PostalCode": postcode,
+            "TerritoryAbbreviatedName": territory
+        }
+    }
+    if territory is None:
+        # UK organisations carry their Companies House number (code 2541)
+        organization["RegisteredDetail"] = {"OrganizationIdentificationNumberDetail": [
+            {"OrganizationIdentificationNumber": f"{rng.randint(1000000, 15999999):08d}",
+             "@DNBCodeValue": 2541}
+        ]}
+    return organization
+
+
+def create_app(behaviour: Behaviour) -> FastAPI:
+    """Build the D&B stand-in"""
+    app = FastAPI(title="D&B Direct 2.0 stand-in")
+    tokens = set()
+
+    def check_token(authorization: Optional[str]) -> None:
+        if authorization not in tokens:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    @app.post("/Authentication/V{version}/")
+    async def authenticate(version: str, response: Response,
+                           x_dnb_user: str = Header(None), x_dnb_pwd: str = Header(None)):
+        if not x_dnb_user or not x_dnb_pwd:
+            raise HTTPException(status_code=401, detail="Invalid user credentials")
+        token = "STANDIN_" + uuid.uuid4().hex
+        tokens.add(token)
+        response.headers["Authorization"] = token
+        return {"TransactionDetail": _transaction(), "TransactionResult": _success(),
+                "AuthenticationDetail": {"Token": token}}
+
+    @app.get("/V{version}/organizations")
+    async def match(version: str, SubjectName: str, CountryISOAlpha2Code: str = "US",
+                    authorization: str = Header(None)):
+        check_token(authorization)
+        rng = seeded_rng("dnb-match", SubjectName.upper(), CountryISOAlpha2Code)
+        candidates = []
+        for rank in range(rng.randint(1, 5)):
+            duns = f"{rng.randint(100000000, 999999999)}"
+            confidence = max(10 - rank * 2, 1)
+            candidates.append({
+                "Organization": {**_organization(duns, SubjectName.upper()),
+                                 "MatchQualityInformation": {"ConfidenceCode": confidence, "MatchGradeText": "A"}},
+                "MatchGrade": "A",
+                "ConfidenceCode": confidence
+            })
+        return {"MatchResponse": {"TransactionDetail": _transaction(), "TransactionResult": _success(),
+                                  "MatchCandidate": candidates}}
+
+    @app.get("/V{version}/organizations/{duns}/products/{product_code}")
+    async def product(version: str, duns: str, product_code: str, authorization: str = Header(None)):
+        check_token(authorization)
+        rng = seeded_rng("dnb-profile", duns)
+        organization = _organization(duns)
+        organization.update({
+            "Telecommunication": [{"TelecommunicationNumber": f"{rng.randint(2000000000, 9999999999)}",
+                                   "TelecommunicationNumberType": "Telephone"}],
+            "EmployeeQuantity": rng.randint(5, 50000),
+            "OperatingStatusText": "Active",
+            "StartDate": f"{rng.randint(1950, 2020)}-01-01",
+            "BusinessDescription": "Provider of business services and solutions."
+        })
+        if product_code == "DCP_PREM":
+            revenue = round(rng.uniform(1e6, 5e9), 2)
+            organization.update({
+                "SalesRevenueAmount": revenue,
+                "FinancialStatement": [{"StatementDate": "2023-12-31", "Currency": "USD", "Revenue": revenue,
+                                        "NetIncome": round(revenue * 0.08, 2), "TotalAssets": round(revenue * 0.6, 2)}]
+            })
+        return {"OrderProductResponse": {
+            "TransactionDetail": _transaction(),
+            "TransactionResult": _success(),
+            "OrderProductResponseDetail": {"InquiryDetail": {"DUNSNumber": duns},
+                                           "Product": {"Organization": organization}}
+        }}
+
+    @app.get("/V{version}/organizations/{duns}/financials")
+    async def financials(version: str, duns: str, authorization: str = Header(None)):
+        check_token(authorization)
+        rng = seeded_rng("dnb-financials", duns)
+        statements = []
+        revenue = rng.uniform(1e6, 5e9)
+        for year in range(2023, 2018, -1):
+            statements.append({
+                "StatementDate": f"{year}-12-31", "Currency": "USD", "FiscalYear": year,
+                "BalanceSheet": {"TotalAssets": round(revenue * 0.6, 2), "TotalLiabilities": round(revenue * 0.3, 2),
+                                 "NetWorth": round(revenue * 0.3, 2)},
+                "IncomeStatement": {"Revenue": round(revenue, 2), "NetIncome": round(revenue * 0.07, 2)}
+            })
+            revenue /= rng.uniform(1.0, 1.15)
+        return {"TransactionDetail": _transaction(), "TransactionResult": _success(),
+                "DUNSNumber": duns, "FinancialStatements": statements}
+
+    @app.get("/V{version}/organizations/{duns}/analytics")
+    async def analytics(version: str, duns: str, authorization: str = Header(None)):
+        check_token(authorization)
+        rng = seeded_rng("dnb-analytics", duns)
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {
+            "TransactionDetail": _transaction(), "TransactionResult": _success(), "DUNSNumber": duns,
+            "RiskScores": [
+                {"ScoreType": "Commercial Credit Score", "ScoreValue": rng.randint(1, 100),
+                 "ScoreDate": timestamp, "RiskLevel": rng.choice(["Low", "Low-Medium", "Medium", "High"])},
+                {"ScoreType": "Financial Stress Score", "ScoreValue": rng.randint(1001, 1875),
+                 "ScoreDate": timestamp, "RiskLevel": rng.choice(["Low", "Medium", "High"])}
+            ],
+            "PredictiveIndicators": [
+                {"IndicatorType": "Payment Trend", "IndicatorValue": rng.choice(["Stable", "Improving", "Declining"])}
+            ]
+        }
+
+    return apply_behaviour(app, behaviour)
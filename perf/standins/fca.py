@@ -0,0 +1,156 @@
+"""FCA Register API stand-in (``/services/V0.1``)"""
+
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Header, HTTPException
+
+from perf.standins.common import Behaviour, apply_behaviour, seeded_rng
+
+PREFIX = "/services/V0.1"
+
+ACTIVITIES = [
+    "Accepting Deposits", "Advising on investments (except P2P agreements)",
+    "Arranging (bringing about) deals in investments", "Dealing in investments as agent",
+    "Dealing in investments as principal", "Making arrangements with a view to transactions in investments",
+    "Managing investments", "Safeguarding and administering investments",
+    "Credit broking", "Debt adjusting", "Debt counselling", "Entering into regulated mortgage contracts",
+    "Insurance distribution", "Agreeing to carry on a regulated activity"
+]
+INVESTMENT_TYPES = [
+    "Certificates representing certain securities", "Debentures", "Government and public securities",
+    "Rights to or interests in investments", "Shares", "Units", "Warrants", "Futures", "Options",
+    "Contracts for differences", "Structured deposits", "Life policy", "Non-investment insurance contract"
+]
+CUSTOMER_TYPES = ["Retail (Investment)", "Professional", "Eligible Counterparty", "Consumer"]
+COUNTRIES = ["FRANCE", "GERMANY", "IRELAND", "SPAIN", "ITALY", "NETHERLANDS", "BELGIUM", "AUSTRIA"]
+
+
+def _envelope(data: Any, message: str = "Ok. Firm found") -> Dict[str, Any]:
+    return {"Status": "FSR-API-02-01-00", "ResultInfo": None, "Message": message, "Data": data}
+
+
+def _firm_name(frn: int) -> str:
+    rng = seeded_rng("fca-name", frn)
+    return f"{rng.choice(['Ardent', 'Beacon', 'Crest', 'Delta', 'Evergreen', 'Fulcrum'])} " \
+           f"{rng.choice(['Capital', 'Insurance Services', 'Wealth', 'Brokers', 'Partners'])} Limited"
+
+
+def permissions_payload(frn: int, count: int = 60) -> Dict[str, Any]:
+    """A ``Firm/{frn}/Permissions`` response carrying ``count`` regulated activities"""
+    rng = seeded_rng("fca-permissions", frn)
+    data: Dict[str, List[Dict[str, Any]]] = {}
+    for i in range(count):
+        activity = ACTIVITIES[i % len(ACTIVITIES)]
+        if i >= len(ACTIVITIES):
+            activity = f"{activity} ({i // len(ACTIVITIES)})"
+        data[activity] = [
+            {"Customer Type": rng.sample(CUSTOMER_TYPES, rng.randint(1, len(CUSTOMER_TYPES)))},
+            {"Investment Type": rng.sample(INVESTMENT_TYPES, rng.randint(3, len(INVESTMENT_TYPES)))},
+            {"Limitation": ["Limited to arranging transactions with or for professional clients"]}
+        ]
+    return _envelope(data, "Ok. Firm permissions found")
+
+
+def create_app(behaviour: Behaviour, permissions: int = 60) -> FastAPI:
+    """
+    Build the FCA stand-in
+
+    ``permissions`` controls how many regulated activities a firm carries, which
+    is what makes the permissions payload large in production.
+    """
+    app = FastAPI(title="FCA Register stand-in")
+
+    def firm_url(frn: int, resource: str = "") -> str:
+        return f"https://register.fca.org.uk{PREFIX}/Firm/{frn}{resource}"
+
+    @app.get(PREFIX + "/Search")
+    async def search(q: str, type: str = "firm", per_page: int = 10,
+                     x_auth_email: str = Header(None), x_auth_key: str = Header(None)):
+        if not x_auth_email or not x_auth_key:
+            raise HTTPException(status_code=401, detail="Missing FCA credentials")
+        rng = seeded_rng("fca-search", q.lower())
+        frns = [rng.randint(100000, 999999) for _ in range(per_page)]
+        return {
+            "Status": "FSR-API-04-01-00",
+            "ResultInfo": {"page": "1", "per_page": str(per_page), "total_count": str(per_page)},
+            "Message": "Ok. Search successful",
+            "Data": [
+                {
+                    "URL": firm_url(frn),
+                    "Status": "Authorised",
+                    "Reference Number": str(frn),
+                    "Type of business or Individual": type.capitalize(),
+                    "Name": _firm_name(frn)
+                }
+                for frn in frns
+            ]
+        }
+
+    @app.get(PREFIX + "/Firm/{frn}")
+    async def firm(frn: int):
+        rng = seeded_rng("fca-firm", frn)
+        return _envelope([{
+            "Name": firm_url(frn, "/Names"),
+            "Individuals": firm_url(frn, "/Individuals"),
+            "Permission": firm_url(frn, "/Permissions"),
+            "Address": firm_url(frn, "/Address"),
+            "Organisation Name": _firm_name(frn),
+            "Status": "Authorised",
+            "FRN": str(frn),
+            "Business Type": "Regulated",
+            "Client Money Permission": rng.choice(["Control but not hold client money", "Hold and control client money"]),
+            "Companies House Number": f"{rng.randint(1000000, 15999999):08d}",
+            "Status Effective Date": f"{rng.randint(2001, 2023)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00+00:00",
+            "System Timestamp": "2024-01-01T00:00:00+00:00",
+            "Exceptional Info Details": []
+        }])
+
+    @app.get(PREFIX + "/Firm/{frn}/Permissions")
+    async def permissions_(frn: int):
+        return permissions_payload(frn, permissions)
+
+    @app.get(PREFIX + "/Firm/{frn}/Individuals")
+    async def individuals(frn: int):
+        rng = seeded_rng("fca-individuals", frn)
+        return _envelope([
+            {"IRN": f"{rng.choice('ABCDEFGHJK')}{rng.choice('ABCDEFGHJK')}{rng.randint(10000, 99999)}",
+             "Name": f"Person {i}", "Status": rng.choice(["Approved by regulator", "Certified / assessed by firm"]),
+             "URL": firm_url(frn, "/Individuals")}
+            for i in range(rng.randint(3, 25))
+        ], "Ok. Individuals found")
+
+    @app.get(PREFIX + "/Firm/{frn}/Address")
+    async def address(frn: int):
+        return _envelope([{
+            "Address Type": "Principal Place of Business",
+            "Address Line 1": f"{frn % 200 + 1} Bishopsgate", "Town": "London",
+            "Postcode": "EC2N 4AY", "Country": "UNITED KINGDOM", "Phone Number": "+44 2071234567"
+        }], "Ok. Firm address found")
+
+    @app.get(PREFIX + "/Firm/{frn}/Passports")
+    async def passports(frn: int):
+        rng = seeded_rng("fca-passports", frn)
+        return _envelope({"Passports": [
+            {"Country": country, "PassportDirection": "Outward",
+             "Permissions": [{"Name": directive, "InvestmentTypes": rng.sample(INVESTMENT_TYPES, 4)}
+                             for directive in ("MiFID", "IDD")]}
+            for country in COUNTRIES
+        ]}, "Ok. Passports found")
+
+    @app.get(PREFIX + "/Firm/{frn}/Regulators")
+    async def regulators(frn: int):
+        return _envelope([{"Name": "Financial Conduct Authority", "Effective Date": "2013-04-01"}])
+
+    @app.get(PREFIX + "/Firm/{frn}/{resource}")
+    async def other(frn: int, resource: str):
+        if resource not in {"Requirements", "DisciplinaryHistory", "Waivers", "Names"}:
+            raise HTTPException(status_code=404, detail="Not found")
+        if resource == "Names":
+            return _envelope([{"Current Names": [{"Name": _firm_name(frn), "Effective From": "2010-01-01"}]}])
+        return _envelope([], f"Ok. No {resource} found")
+
+    @app.get(PREFIX + "/Individuals/{irn}")
+    async def individual(irn: str):
+        return _envelope([{"Details": {"IRN": irn, "Full Name": f"Individual {irn}", "Status": "Active"}}])
+
+    return apply_behaviour(app, behaviour)
@@ -0,0 +1,566 @@
+"""
+In-memory Redis stand-in speaking RESP2 and RESP3
+
+Enough of Redis for the services' Redis backends (job queue, D&B product
+cache) to run locally and in tests without a Redis server: strings with
+expiry, counters, lists, hashes, sets, sorted sets, key scans and
+MULTI/EXEC. Commands run one at a time on the event loop, so every command
+and transaction is atomic, as in Redis.
+
+Usage::
+
+    python -m perf.standins.redis_server --port 6390
+
+then point a service at ``redis://127.0.0.1:6390/0``.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 6390
+
+
+class RedisError(Exception):
+    """Sent back to the client as a RESP error"""
+
+
+class WrongType(RedisError):
+    def __init__(self):
+        super().__init__("WRONGTYPE Operation against a key holding the wrong kind of value")
+
+
+class ScorePairs(list):
+    """``[(member, score), ...]``: nested pairs on RESP3, flattened on RESP2"""
+
+
+class SortedSet(dict):
+    """Member -> score"""
+
+
+class Store:
+    """Keyspace of one stand-in (all logical databases share it)"""
+
+    def __init__(self):
+        self.data: Dict[bytes, Any] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.commands_processed = 0
+
+    # -- keyspace helpers ---------------------------------------------------
+
+    def _alive(self, key: bytes) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+            return False
+        return key in self.data
+
+    def _get(self, key: bytes, kind: type) -> Any:
+        if not self._alive(key):
+            return None
+        value = self.data[key]
+        if type(value) is not kind:
+            raise WrongType()
+        return value
+
+    def _get_or_create(self, key: bytes, kind: type) -> Any:
+        value = self._get(key, kind)
+        if value is None:
+            value = self.data[key] = kind()
+        return value
+
+    def _drop_if_empty(self, key: bytes) -> None:
+        if key in self.data and not self.data[key]:
+            del self.data[key]
+            self.expires.pop(key, None)
+
+    def _set_expiry(self, key: bytes, seconds: float) -> None:
+        self.expires[key] = time.time() + seconds
+
+    # -- dispatch -----------------------------------------------------------
+
+    def execute(self, args: List[bytes]) -> Any:
+        self.commands_processed += 1
+        name = args[0].decode().upper()
+        handler: Optional[Callable] = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise RedisError(f"ERR unknown command '{name}'")
+        try:
+            return handler(*args[1:])
+        except TypeError:
+            raise RedisError(f"ERR wrong number of arguments for '{name.lower()}' command")
+
+    # -- connection and server ----------------------------------------------
+
+    def cmd_ping(self, message: bytes = None):
+        return message if message is not None else "PONG"
+
+    def cmd_echo(self, message: bytes):
+        return message
+
+    def cmd_hello(self, protover: bytes = b"2", *args):
+        # Handled per connection in RedisStandin.handle; this is the reply body
+        return {b"server": b"redis", b"version": b"7.2.0", b"proto": int(protover), b"mode": b"standalone"}
+
+    def cmd_select(self, index: bytes):
+        return "OK"
+
+    def cmd_client(self, *args):
+        return "OK"
+
+    def cmd_info(self, *args):
+        return f"# Server\r\nredis_version:7.2.0-standin\r\ntotal_commands_processed:{self.commands_processed}\r\n".encode()
+
+    def cmd_dbsize(self):
+        return sum(1 for key in list(self.data) if self._alive(key))
+
+    def cmd_flushdb(self, *args):
+        self.data.clear()
+        self.expires.clear()
+        return "OK"
+
+    cmd_flushall = cmd_flushdb
+
+    # -- keys ---------------------------------------------------------------
+
+    def cmd_del(self, *keys: bytes):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                removed += 1
+        return removed
+
+    cmd_unlink = cmd_del
+
+    def cmd_exists(self, *keys: bytes):
+        return sum(1 for key in keys if self._alive(key))
+
+    def cmd_expire(self, key: bytes, seconds: bytes):
+        if not self._alive(key):
+            return 0
+        self._set_expiry(key, int(seconds))
+        return 1
+
+    def cmd_pexpire(self, key: bytes, millis: bytes):
+        if not self._alive(key):
+            return 0
+        self._set_expiry(key, int(millis) / 1000)
+        return 1
+
+    def cmd_ttl(self, key: bytes):
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else max(0, round(deadline - time.time()))
+
+    def cmd_pttl(self, key: bytes):
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else max(0, int((deadline - time.time()) * 1000))
+
+    def cmd_keys(self, pattern: bytes):
+        return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    def cmd_type(self, key: bytes):
+        if not self._alive(key):
+            return "none"
+        kinds = {bytes: "string", list: "list", dict: "hash", set: "set", SortedSet: "zset"}
+        return kinds[type(self.data[key])]
+
+    def cmd_scan(self, cursor: bytes, *options: bytes):
+        pattern = b"*"
+        opts = [o.upper() for o in options[::2]]
+        if b"MATCH" in opts:
+            pattern = options[opts.index(b"MATCH") * 2 + 1]
+        # One pass returns everything; cursor 0 ends the iteration
+        return [b"0", self.cmd_keys(pattern)]
+
+    # -- strings ------------------------------------------------------------
+
+    def cmd_get(self, key: bytes):
+        return self._get(key, bytes)
+
+    def cmd_mget(self, *keys: bytes):
+        return [self.data[key] if self._alive(key) and type(self.data[key]) is bytes else None for key in keys]
+
+    def cmd_set(self, key: bytes, value: bytes, *options: bytes):
+        opts = [o.upper() for o in options]
+        exists = self._alive(key)
+        if (b"NX" in opts and exists) or (b"XX" in opts and not exists):
+            return None
+        keep_ttl = b"KEEPTTL" in opts
+        self.data[key] = value
+        if not keep_ttl:
+            self.expires.pop(key, None)
+        for flag, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+            if flag in opts:
+                self._set_expiry(key, int(options[opts.index(flag) + 1]) * scale)
+        return "OK"
+
+    def cmd_setex(self, key: bytes, seconds: bytes, value: bytes):
+        return self.cmd_set(key, value, b"EX", seconds)
+
+    def cmd_psetex(self, key: bytes, millis: bytes, value: bytes):
+        return self.cmd_set(key, value, b"PX", millis)
+
+    def cmd_incrby(self, key: bytes, amount: bytes):
+        current = self._get(key, bytes)
+        try:
+            value = int(current or 0) + int(amount)
+        except ValueError:
+            raise RedisError("ERR value is not an integer or out of range")
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_incr(self, key: bytes):
+        return self.cmd_incrby(key, b"1")
+
+    def cmd_decr(self, key: bytes):
+        return self.cmd_incrby(key, b"-1")
+
+    # -- lists --------------------------------------------------------------
+
+    def cmd_lpush(self, key: bytes, *values: bytes):
+        items = self._get_or_create(key, list)
+        for value in values:
+            items.insert(0, value)
+        return len(items)
+
+    def cmd_rpush(self, key: bytes, *values: bytes):
+        items = self._get_or_create(key, list)
+        items.extend(values)
+        return len(items)
+
+    def _pop(self, key: bytes, count: Optional[bytes], left: bool):
+        items = self._get(key, list)
+        if not items:
+            return None
+        n = 1 if count is None else int(count)
+        popped = [items.pop(0 if left else -1) for _ in range(min(n, len(items)))]
+        self._drop_if_empty(key)
+        return popped[0] if count is None else popped
+
+    def cmd_lpop(self, key: bytes, count: bytes = None):
+        return self._pop(key, count, left=True)
+
+    def cmd_rpop(self, key: bytes, count: bytes = None):
+        return self._pop(key, count, left=False)
+
+    def cmd_llen(self, key: bytes):
+        return len(self._get(key, list) or [])
+
+    def cmd_lrange(self, key: bytes, start: bytes, stop: bytes):
+        items = self._get(key, list) or []
+        start_i, stop_i = int(start), int(stop)
+        if stop_i < 0:
+            stop_i += len(items)
+        return items[start_i if start_i >= 0 else max(0, len(items) + start_i):stop_i + 1]
+
+    def cmd_lrem(self, key: bytes, count: bytes, value: bytes):
+        items = self._get(key, list)
+        if not items:
+            return 0
+        n = int(count)
+        indexes = [i for i, item in enumerate(items) if item == value]
+        if n < 0:
+            indexes = indexes[::-1][:-n]
+        elif n > 0:
+            indexes = indexes[:n]
+        for i in sorted(indexes, reverse=True):
+            del items[i]
+        self._drop_if_empty(key)
+        return len(indexes)
+
+    def cmd_lmove(self, source: bytes, destination: bytes, wherefrom: bytes, whereto: bytes):
+        value = self._pop(source, None, left=wherefrom.upper() == b"LEFT")
+        if value is None:
+            return None
+        target = self._get_or_create(destination, list)
+        if whereto.upper() == b"LEFT":
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+    # -- hashes -------------------------------------------------------------
+
+    def cmd_hset(self, key: bytes, *pairs: bytes):
+        if not pairs or len(pairs) % 2:
+            raise TypeError
+        fields = self._get_or_create(key, dict)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in fields
+            fields[field] = value
+        return added
+
+    cmd_hmset = cmd_hset
+
+    def cmd_hsetnx(self, key: bytes, field: bytes, value: bytes):
+        fields = self._get_or_create(key, dict)
+        if field in fields:
+            return 0
+        fields[field] = value
+        return 1
+
+    def cmd_hget(self, key: bytes, field: bytes):
+        return (self._get(key, dict) or {}).get(field)
+
+    def cmd_hmget(self, key: bytes, *fields: bytes):
+        values = self._get(key, dict) or {}
+        return [values.get(field) for field in fields]
+
+    def cmd_hgetall(self, key: bytes):
+        return dict(self._get(key, dict) or {})
+
+    def cmd_hdel(self, key: bytes, *fields: bytes):
+        values = self._get(key, dict)
+        if not values:
+            return 0
+        removed = sum(1 for field in fields if values.pop(field, None) is not None)
+        self._drop_if_empty(key)
+        return removed
+
+    def cmd_hlen(self, key: bytes):
+        return len(self._get(key, dict) or {})
+
+    def cmd_hincrby(self, key: bytes, field: bytes, amount: bytes):
+        fields = self._get_or_create(key, dict)
+        value = int(fields.get(field, b"0")) + int(amount)
+        fields[field] = str(value).encode()
+        return value
+
+    # -- sets ---------------------------------------------------------------
+
+    def cmd_sadd(self, key: bytes, *members: bytes):
+        members_set = self._get_or_create(key, set)
+        before = len(members_set)
+        members_set.update(members)
+        return len(members_set) - before
+
+    def cmd_srem(self, key: bytes, *members: bytes):
+        members_set = self._get(key, set)
+        if not members_set:
+            return 0
+        removed = sum(1 for member in members if member in members_set)
+        members_set.difference_update(members)
+        self._drop_if_empty(key)
+        return removed
+
+    def cmd_smembers(self, key: bytes):
+        return set(self._get(key, set) or set())
+
+    def cmd_sismember(self, key: bytes, member: bytes):
+        return int(member in (self._get(key, set) or set()))
+
+    def cmd_scard(self, key: bytes):
+        return len(self._get(key, set) or set())
+
+    # -- sorted sets ------------------------------------------------------------
+
+    def cmd_zadd(self, key: bytes, *args: bytes):
+        flags = set()
+        args = list(args)
+        while args and args[0].upper() in (b"NX", b"XX", b"GT", b"LT", b"CH"):
+            flags.add(args.pop(0).upper())
+        scores = self._get_or_create(key, SortedSet)
+        changed = added = 0
+        for score, member in zip(args[::2], args[1::2]):
+            exists = member in scores
+            if (b"NX" in flags and exists) or (b"XX" in flags and not exists):
+                continue
+            value = float(score)
+            if exists and ((b"GT" in flags and value <= scores[member]) or (b"LT" in flags and value >= scores[member])):
+                continue
+            changed += not exists or scores[member] != value
+            added += not exists
+            scores[member] = value
+        self._drop_if_empty(key)
+        return changed if b"CH" in flags else added
+
+    def cmd_zrem(self, key: bytes, *members: bytes):
+        scores = self._get(key, SortedSet)
+        if not scores:
+            return 0
+        removed = sum(1 for member in members if scores.pop(member, None) is not None)
+        self._drop_if_empty(key)
+        return removed
+
+    def cmd_zscore(self, key: bytes, member: bytes):
+        score = (self._get(key, SortedSet) or {}).get(member)
+        return score
+
+    def cmd_zcard(self, key: bytes):
+        return len(self._get(key, SortedSet) or {})
+
+    @staticmethod
+    def _bound(value: bytes) -> Tuple[float, bool]:
+        text = value.decode()
+        exclusive = text.startswith("(")
+        text = text.lstrip("(")
+        if text in ("-inf", "+inf", "inf"):
+            return float(text if text != "+inf" else "inf"), exclusive
+        return float(text), exclusive
+
+    def cmd_zrangebyscore(self, key: bytes, low: bytes, high: bytes, *options: bytes):
+        (lo, lo_ex), (hi, hi_ex) = self._bound(low), self._bound(high)
+        items = sorted((self._get(key, SortedSet) or {}).items(), key=lambda item: (item[1], item[0]))
+        selected = [
+            (member, score) for member, score in items
+            if (score > lo if lo_ex else score >= lo) and (score < hi if hi_ex else score <= hi)
+        ]
+        opts = [o.upper() for o in options]
+        if b"LIMIT" in opts:
+            i = opts.index(b"LIMIT")
+            offset, count = int(options[i + 1]), int(options[i + 2])
+            selected = selected[offset:] if count < 0 else selected[offset:offset + count]
+        if b"WITHSCORES" in opts:
+            return ScorePairs(selected)
+        return [member for member, _ in selected]
+
+
+# -- wire protocol -------------------------------------------------------------
+
+def encode(value: Any, resp3: bool = False) -> bytes:
+    if value is None:
+        return b"_\r\n" if resp3 else b"$-1\r\n"
+    if isinstance(value, RedisError):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, bool):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, float):
+        return f",{value!r}\r\n".encode() if resp3 else encode(repr(value).encode())
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, ScorePairs) and not resp3:
+        return encode([item for pair in value for item in pair])
+    if isinstance(value, dict):
+        if not resp3:
+            return encode([item for pair in value.items() for item in pair])
+        return b"%%%d\r\n" % len(value) + b"".join(
+            encode(k, resp3) + encode(v, resp3) for k, v in value.items()
+        )
+    if isinstance(value, set):
+        return (b"~" if resp3 else b"*") + b"%d\r\n" % len(value) + b"".join(encode(item, resp3) for item in value)
+    if isinstance(value, (list, tuple)):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item, resp3) for item in value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command, e.g. from telnet or redis-cli -x
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        length = int(header[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+class RedisStandin:
+    """The stand-in server; ``store`` can be inspected directly in tests"""
+
+    def __init__(self):
+        self.store = Store()
+        self.server: Optional[asyncio.base_events.Server] = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        queued: Optional[List[List[bytes]]] = None
+        resp3 = False
+        try:
+            while True:
+                args = await read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                name = args[0].upper()
+                if name == b"HELLO":
+                    try:
+                        reply = self.store.execute(args)
+                        resp3 = reply[b"proto"] == 3
+                    except (RedisError, ValueError):
+                        reply = RedisError("NOPROTO unsupported protocol version")
+                elif name == b"MULTI":
+                    queued = []
+                    reply: Any = "OK"
+                elif name == b"EXEC":
+                    if queued is None:
+                        reply = RedisError("ERR EXEC without MULTI")
+                    else:
+                        reply = []
+                        for command in queued:
+                            try:
+                                reply.append(self.store.execute(command))
+                            except RedisError as e:
+                                reply.append(e)
+                        queued = None
+                elif name == b"DISCARD":
+                    queued = None
+                    reply = "OK"
+                elif name in (b"WATCH", b"UNWATCH"):
+                    reply = "OK"
+                elif name == b"QUIT":
+                    writer.write(encode("OK"))
+                    break
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "QUEUED"
+                else:
+                    try:
+                        reply = self.store.execute(args)
+                    except RedisError as e:
+                        reply = e
+                writer.write(encode(reply, resp3))
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+        self.server = await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+async def serve(host: str, port: int) -> None:
+    standin = RedisStandin()
+    await standin.start(host, port)
+    logger.info(f"Redis stand-in listening on redis://{host}:{port}/0")
+    async with standin.server:
+        await standin.server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Run the four upstream stand-ins locally
+
+Usage::
+
+    python -m perf.upstreams --profile perf/profiles/production.json
+
+Each stand-in listens on its own port (see the profile) and the services are
+pointed at them through the environment variables returned by
+``service_environment``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict
+
+import uvicorn
+
+from perf.standins import bridger, companies_house, dnb, fca
+from perf.standins.common import Behaviour
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = Path(__file__).parent / "profiles" / "production.json"
+DEFAULT_PORTS = {"fca": 9001, "companies_house": 9002, "dnb": 9003, "bridger": 9004}
+
+
+def load_profile(path: Path = DEFAULT_PROFILE) -> Dict[str, Dict[str, Any]]:
+    """Load a stand-in profile, filling in default ports"""
+    profile = json.loads(Path(path).read_text())
+    for name, port in DEFAULT_PORTS.items():
+        profile.setdefault(name, {}).setdefault("port", port)
+    return profile
+
+
+def build_apps(profile: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Create the stand-in ASGI apps described by a profile"""
+    return {
+        "fca": fca.create_app(
+            Behaviour.from_dict(profile["fca"]),
+            permissions=profile["fca"].get("permissions", 60)
+        ),
+        "companies_house": companies_house.create_app(
+            Behaviour.from_dict(profile["companies_house"]),
+            filings=profile["companies_house"].get("filings", 100),
+            document_kb=profile["companies_house"].get("document_kb", 200)
+        ),
+        "dnb": dnb.create_app(Behaviour.from_dict(profile["dnb"])),
+        "bridger": bridger.create_app(
+            Behaviour.from_dict(profile["bridger"]),
+            match_rate=profile["bridger"].get("match_rate", 0.2),
+            max_matches=profile["bridger"].get("max_matches", 5)
+        )
+    }
+
+
+def service_environment(profile: Dict[str, Dict[str, Any]], host: str = "127.0.0.1") -> Dict[str, Dict[str, str]]:
+    """Environment variables that point each service at the stand-ins"""
+    def url(name: str) -> str:
+        return f"http://{host}:{profile[name]['port']}"
+
+    return {
+        "backend": {
+            "FCA_BASE_URL": f"{url('fca')}{fca.PREFIX}",
+            "FCA_EMAIL": "loadtest@example.com",
+            "FCA_KEY": "loadtest",
+            "COMPANIES_HOUSE_BASE_URL": url("companies_house"),
+            "COMPANIES_HOUSE_DOCUMENT_URL": url("companies_house"),
+            "COMPANIES_HOUSE_API_KEY": "loadtest"
+        },
+        "dnb": {
+            "USE_MOCK_DATA": "false",
+            "DNB_API_BASE_URL": url("dnb"),
+            "DNB_USERNAME": "loadtest",
+            "DNB_PASSWORD": "loadtest"
+        },
+        "lexisnexis": {
+            "USE_MOCK_DATA": "false",
+            "BRIDGER_WSDL": f"{url('bridger')}{bridger.SERVICE_PATH}?wsdl",
+            "BRIDGER_USERNAME": "loadtest",
+            "BRIDGER_PASSWORD": "loadtest"
+        }
+    }
+
+
+async def serve(profile: Dict[str, Dict[str, Any]], host: str = "127.0.0.1") -> None:
+    """Serve every stand-in until cancelled"""
+    servers = []
+    for name, app in build_apps(profile).items():
+        logger.info(f"{name} stand-in on http://{host}:{profile[name]['port']}")
+        servers.append(uvicorn.Server(uvicorn.Config(app, host=host, port=profile[name]["port"], log_level="warning")))
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run local FCA, Companies House, D&B and Bridger stand-ins")
+    parser.add_argument("--profile", type=Path, default=DEFAULT_PROFILE, help="Stand-in profile (JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    profile = load_profile(args.profile)
+    for service, env in service_environment(profile, args.host).items():
+        logger.info(f"{service} environment: " + " ".join(f"{k}={v}" for k, v in env.items()))
+    asyncio.run(serve(profile, args.host))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Scripted workload driver and latency report
+
+A workload file (see ``perf/workloads``) lists weighted request templates per
+service. Placeholders such as ``{frn}`` are filled from the ``variables``
+section and ``{n}`` is a running request counter.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+@dataclass
+class Step:
+    """One weighted request template"""
+    service: str
+    method: str
+    route: str
+    weight: float = 1.0
+    json_body: Optional[Any] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.service} {self.route.split('?')[0]}"
+
+
+@dataclass
+class Workload:
+    """A parsed workload file"""
+    services: Dict[str, str]
+    variables: Dict[str, List[Any]]
+    steps: List[Step]
+
+    @classmethod
+    def load(cls, path: Path) -> "Workload":
+        data = json.loads(Path(path).read_text())
+        steps = [
+            Step(
+                service=step["service"],
+                method=step.get("method", "GET").upper(),
+                route=step["route"],
+                weight=float(step.get("weight", 1.0)),
+                json_body=step.get("json"),
+                headers=step.get("headers", {})
+            )
+            for step in data["steps"]
+        ]
+        return cls(services=data.get("services", {}), variables=data.get("variables", {}), steps=steps)
+
+
+@dataclass
+class Sample:
+    label: str
+    status: int
+    latency: float
+
+
+def _fill(template: Any, values: Dict[str, Any]) -> Any:
+    """Substitute placeholders in strings nested anywhere in a template"""
+    if isinstance(template, str):
+        return PLACEHOLDER.sub(lambda m: str(values.get(m.group(1), m.group(0))), template)
+    if isinstance(template, list):
+        return [_fill(item, values) for item in template]
+    if isinstance(template, dict):
+        return {key: _fill(value, values) for key, value in template.items()}
+    return template
+
+
+async def run_workload(
+    workload: Workload,
+    concurrency: int = 20,
+    duration: Optional[float] = 60.0,
+    total_requests: Optional[int] = None,
+    timeout: float = 30.0,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Drive the services and return a report (see ``build_report``)"""
+    rng = random.Random(seed)
+    weights = [step.weight for step in workload.steps]
+    samples: List[Sample] = []
+    counter = 0
+    deadline = time.monotonic() + duration if duration else None
+
+    def next_request():
+        nonlocal counter
+        if total_requests is not None and counter >= total_requests:
+            return None
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        counter += 1
+        step = rng.choices(workload.steps, weights)[0]
+        values = {name: rng.choice(options) for name, options in workload.variables.items()}
+        values["n"] = counter
+        return step, _fill(step.route, values), _fill(step.json_body, values)
+
+    async def worker(client: httpx.AsyncClient):
+        while (request := next_request()) is not None:
+            step, route, body = request
+            url = workload.services[step.service].rstrip("/") + route
+            started = time.perf_counter()
+            try:
+                response = await client.request(step.method, url, json=body, headers=step.headers)
+                # Streamed endpoints are only complete once the body is read
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            samples.append(Sample(step.label, status, time.perf_counter() - started))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return build_report(samples, time.perf_counter() - started)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def build_report(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Throughput and p50/p95/p99 per route plus an overall row"""
+    by_label: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_label[sample.label].append(sample)
+
+    def summarize(group: List[Sample]) -> Dict[str, Any]:
+        latencies = sorted(s.latency for s in group)
+        statuses: Dict[str, int] = defaultdict(int)
+        for s in group:
+            statuses[str(s.status)] += 1
+        return {
+            "requests": len(group),
+            "errors": sum(1 for s in group if s.status == 0 or s.status >= 400),
+            "throughput_rps": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "statuses": dict(statuses)
+        }
+
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize(samples),
+        "routes": {label: summarize(group) for label, group in sorted(by_label.items())}
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a fixed-width table"""
+    header = f"{'route':<58} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    lines = [header, "-" * len(header)]
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for label, row in rows:
+        lines.append(
+            f"{label[:58]:<58} {row['requests']:>7} {row['errors']:>5} {row['throughput_rps']:>8} "
+            f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}"
+        )
+    lines.append(f"elapsed: {report['elapsed_s']} s")
+    return "\n".join(lines)